@@ -0,0 +1,4 @@
+"""
+性能基准测试模块
+包含基准测试用例、测试数据和渲染目标
+"""
@@ -0,0 +1,279 @@
+"""
+性能基准测试
+测量数据加载、聚合计算和各页面无界面渲染的耗时，结果输出为JSON，可与基线对比
+
+用法:
+    python -m benchmarks.bench_suite run --scales small medium --output bench_results.json
+    python -m benchmarks.bench_suite run --baseline baseline.json --threshold 0.15
+    python -m benchmarks.bench_suite compare baseline.json bench_results.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import streamlit as st
+from streamlit import logger as st_logger
+
+from benchmarks.fixtures import SCALES, get_fixture_files, get_month_key
+from config.menu_config import ROUTES
+from core.session_snapshot import session_snapshot
+from utils.data_loader import data_loader
+from utils.validation import data_validator
+from utils.workbook_sniffer import workbook_sniffer
+
+RENDER_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'render_app.py')
+RENDER_TIMEOUT = 600
+DEFAULT_THRESHOLD = 0.15
+
+
+class BenchmarkSuite:
+    """性能基准测试类"""
+
+    def __init__(self, repeat: int = 5):
+        self.repeat = repeat
+        self.results: List[Dict[str, Any]] = []
+
+    def _record(self, name: str, scale: str, timings_ms: List[float], **extra):
+        """保存一项测试结果"""
+        result = {
+            'name': name,
+            'scale': scale,
+            'repeat': len(timings_ms),
+            'median_ms': round(statistics.median(timings_ms), 3),
+            'mean_ms': round(statistics.mean(timings_ms), 3),
+            'min_ms': round(min(timings_ms), 3),
+            'max_ms': round(max(timings_ms), 3),
+        }
+        result.update(extra)
+        self.results.append(result)
+        print(f"  {name:<52} {result['median_ms']:>10.1f} ms (min {result['min_ms']:.1f}, max {result['max_ms']:.1f})")
+
+    def time_call(self, name: str, scale: str, func: Callable, warmup: int = 1, **extra):
+        """多次调用函数并记录耗时（先预热）"""
+        for _ in range(warmup):
+            func()
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        self._record(name, scale, timings, **extra)
+
+    def run_data_benchmarks(self, scale: str, files: List[str]):
+        """数据加载和聚合计算"""
+        from pages import sales, overall_trends, employee_details, department_details
+
+        latest_file = files[-1]
+        self.time_call('workbook_sniffer.sniff', scale, lambda: workbook_sniffer.sniff(latest_file),
+                       file_size=os.path.getsize(latest_file))
+        self.time_call('load_excel_data', scale, lambda: data_loader.load_excel_data(latest_file),
+                       warmup=0, file_size=os.path.getsize(latest_file))
+
+        # 加载全部月份作为历史数据
+        history_files = {}
+        for path in files:
+            score_df, sales_df, department_sales_df, ranking_df, error = data_loader.load_excel_data(path)
+            history_files[get_month_key(path)] = {
+                'file_name': os.path.basename(path),
+                'sales_df': sales_df,
+                'department_sales_df': department_sales_df
+            }
+
+        # 会话快照：保存全部数据表，以及刷新页面后不解析 Excel 直接恢复
+        snapshot_state = {
+            'file_name': os.path.basename(latest_file),
+            'data': {'score_df': (score_df, 'bench'), 'sales_df': (sales_df, 'bench'),
+                     'department_sales_df': (department_sales_df, 'bench'), 'ranking_df': (ranking_df, 'bench')},
+            'history': history_files, 'history_version': 'bench', 'pages': {}, 'widgets': {},
+        }
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            self.time_call('session_snapshot.write', scale,
+                           lambda: session_snapshot.write(session_snapshot.new_token(), snapshot_state, snapshot_dir),
+                           months=len(history_files))
+            token = session_snapshot.new_token()
+            session_snapshot.write(token, snapshot_state, snapshot_dir)
+            self.time_call('session_snapshot.read', scale, lambda: session_snapshot.read(token, snapshot_dir),
+                           months=len(history_files))
+
+        rows = len(sales_df)
+        self.time_call('get_leaderboard_data', scale, lambda: data_loader.get_leaderboard_data(score_df), rows=rows)
+        self.time_call('data_validator.validate_sheet', scale,
+                       lambda: data_validator.validate_sheet(sales_df, '销售回款数据统计'), rows=rows)
+        self.time_call('sales.compute_weekly_totals', scale, lambda: sales.compute_weekly_totals(sales_df), rows=rows)
+
+        # 总体趋势增长率
+        trend_df = pd.DataFrame({
+            '月份': list(history_files.keys()),
+            '总销售额(万元)': [info['sales_df']['本月销售额'].iloc[-1] / 10000 for info in history_files.values()],
+            '总回款额(万元)': [info['sales_df']['本月回款合计'].iloc[-1] / 10000 for info in history_files.values()],
+            '总逾期未收回额(万元)': [info['sales_df']['月末逾期未收回额'].iloc[-1] / 10000 for info in history_files.values()],
+        })
+        self.time_call('overall_trends.calculate_growth_rate', scale,
+                       lambda: overall_trends.calculate_growth_rate(trend_df))
+
+        # 员工历史数据准备和增长率（全部员工）
+        employees = [name for name in sales_df['员工姓名'].dropna().unique() if name != '合计']
+        self.time_call('employee_details.prepare_employee_data', scale,
+                       lambda: employee_details.prepare_employee_data(history_files, employees), rows=len(employees))
+        employee_df = employee_details.sort_employee_data(
+            pd.DataFrame(employee_details.prepare_employee_data(history_files, employees)))
+        self.time_call('employee_details.calculate_employee_growth_rate', scale,
+                       lambda: employee_details.calculate_employee_growth_rate(employee_df), rows=len(employee_df))
+
+        # 部门历史数据准备和增长率（全部部门）
+        departments = [name for name in department_sales_df['部门'].dropna().unique() if name != '合计']
+        self.time_call('department_details.prepare_department_data', scale,
+                       lambda: department_details.prepare_department_data(history_files, departments),
+                       rows=len(departments))
+        department_df = department_details.sort_department_data(
+            pd.DataFrame(department_details.prepare_department_data(history_files, departments)))
+        self.time_call('department_details.calculate_department_growth_rate', scale,
+                       lambda: department_details.calculate_department_growth_rate(department_df),
+                       rows=len(department_df))
+
+    def run_render_benchmarks(self, scale: str, files: List[str], routes: Optional[List[str]] = None):
+        """各页面端到端无界面渲染"""
+        from streamlit.testing.v1 import AppTest
+
+        for route in routes or list(ROUTES):
+            at = AppTest.from_file(RENDER_APP, default_timeout=RENDER_TIMEOUT)
+            at.session_state['bench_files'] = files
+            at.session_state['bench_route'] = route
+
+            # 首次运行包含数据加载，不计入渲染耗时
+            at.run()
+            if at.exception:
+                print(f"  render.{route:<45} 渲染出错: {at.exception[0].message}")
+                continue
+
+            timings = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                at.run()
+                timings.append((time.perf_counter() - start) * 1000)
+            self._record(f'render.{route}', scale, timings)
+
+    def run(self, scales: List[str], skip_render: bool = False, routes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """运行全部基准测试"""
+        for scale in scales:
+            print(f"[{scale}] 准备测试数据 ({SCALES[scale]['employees']} 名员工)")
+            files = get_fixture_files(scale)
+            self.run_data_benchmarks(scale, files)
+            if not skip_render:
+                self.run_render_benchmarks(scale, files, routes)
+
+        return {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'pandas': pd.__version__,
+                'streamlit': st.__version__,
+                'repeat': self.repeat,
+                'scales': {scale: SCALES[scale] for scale in scales},
+            },
+            'results': self.results
+        }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    对比两次测试结果
+
+    Args:
+        baseline: 基线结果
+        current: 当前结果
+        threshold: 回退阈值（中位数耗时增加超过该比例视为回退）
+
+    Returns:
+        对比明细列表，每项包含基线/当前中位数耗时、变化比例和是否回退
+    """
+    baseline_map = {(item['name'], item['scale']): item for item in baseline.get('results', [])}
+    comparison = []
+    for item in current.get('results', []):
+        base = baseline_map.get((item['name'], item['scale']))
+        if base is None or base['median_ms'] <= 0:
+            continue
+        change = item['median_ms'] / base['median_ms'] - 1
+        comparison.append({
+            'name': item['name'],
+            'scale': item['scale'],
+            'baseline_ms': base['median_ms'],
+            'current_ms': item['median_ms'],
+            'change': round(change, 4),
+            'regression': change > threshold
+        })
+    return comparison
+
+
+def print_comparison(comparison: List[Dict[str, Any]], threshold: float) -> int:
+    """打印对比结果，返回回退项数量"""
+    print(f"\n{'测试项':<48} {'规模':<8} {'基线(ms)':>10} {'当前(ms)':>10} {'变化':>8}")
+    for item in comparison:
+        flag = '  ⚠️ 回退' if item['regression'] else ''
+        print(f"{item['name']:<48} {item['scale']:<8} {item['baseline_ms']:>10.1f} "
+              f"{item['current_ms']:>10.1f} {item['change']:>+8.1%}{flag}")
+    regressions = sum(item['regression'] for item in comparison)
+    print(f"\n共 {len(comparison)} 项，{regressions} 项耗时增加超过 {threshold:.0%}")
+    return regressions
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    """读取JSON结果文件"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="销售回款统计系统性能基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="运行基准测试")
+    run_parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=list(SCALES),
+                            help="测试数据规模（默认 small medium）")
+    run_parser.add_argument('--repeat', type=int, default=5, help="每项重复次数（默认 5）")
+    run_parser.add_argument('--routes', nargs='+', choices=list(ROUTES), help="只测试指定页面的渲染")
+    run_parser.add_argument('--skip-render', action='store_true', help="跳过页面渲染测试")
+    run_parser.add_argument('--output', default='bench_results.json', help="结果输出文件（默认 bench_results.json）")
+    run_parser.add_argument('--baseline', help="运行后与该基线结果对比")
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="回退阈值（默认 0.15）")
+
+    compare_parser = subparsers.add_parser('compare', help="对比两次测试结果")
+    compare_parser.add_argument('baseline', help="基线结果文件")
+    compare_parser.add_argument('current', help="当前结果文件")
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="回退阈值（默认 0.15）")
+
+    args = parser.parse_args()
+    st_logger.set_log_level('error')
+
+    if args.command == 'compare':
+        regressions = print_comparison(
+            compare_results(load_json(args.baseline), load_json(args.current), args.threshold), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    suite = BenchmarkSuite(repeat=args.repeat)
+    results = suite.run(args.scales, skip_render=args.skip_render, routes=args.routes)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {args.output}")
+
+    if args.baseline:
+        regressions = print_comparison(
+            compare_results(load_json(args.baseline), results, args.threshold), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
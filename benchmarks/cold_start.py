@@ -0,0 +1,174 @@
+"""
+冷启动导入耗时测量
+在全新子进程中以 -X importtime 导入应用入口和主页，输出各模块导入耗时并检查预算
+
+用法:
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --repeat 5 --top 30 --output cold_start.json
+    python -m benchmarks.cold_start --budget benchmarks/cold_start_budget.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cold_start_budget.json')
+DEFAULT_IMPORT = "import main, pages.home"
+
+# -X importtime 输出格式: "import time: self [us] | cumulative | imported package"
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    解析 -X importtime 输出
+
+    Args:
+        output: 子进程标准错误输出
+
+    Returns:
+        模块列表，每项包含模块名、自身耗时、累计耗时（毫秒）和嵌套层级
+    """
+    modules = []
+    for line in output.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(indent) - 1) // 2
+            })
+    return modules
+
+
+def measure_once(import_statement: str) -> List[Dict[str, Any]]:
+    """在全新子进程中执行导入语句并返回各模块导入耗时"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', import_statement],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入失败:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure(import_statement: str, repeat: int = 3) -> Dict[str, Any]:
+    """
+    多次测量冷启动导入耗时，取中位数
+
+    第一次运行用于生成字节码缓存，不计入结果。
+
+    Returns:
+        总耗时和各模块（自身、累计）耗时的中位数
+    """
+    measure_once(import_statement)
+    runs = [measure_once(import_statement) for _ in range(repeat)]
+
+    modules: Dict[str, Dict[str, List[float]]] = {}
+    totals = []
+    for run in runs:
+        # 顶层模块的累计耗时之和即为总导入耗时
+        totals.append(sum(item['cumulative_ms'] for item in run if item['depth'] == 0))
+        for item in run:
+            entry = modules.setdefault(item['module'], {'self_ms': [], 'cumulative_ms': [], 'depth': item['depth']})
+            entry['self_ms'].append(item['self_ms'])
+            entry['cumulative_ms'].append(item['cumulative_ms'])
+
+    return {
+        'import_statement': import_statement,
+        'repeat': repeat,
+        'total_ms': round(statistics.median(totals), 1),
+        'modules': {
+            name: {
+                'self_ms': round(statistics.median(entry['self_ms']), 2),
+                'cumulative_ms': round(statistics.median(entry['cumulative_ms']), 2),
+                'depth': entry['depth']
+            }
+            for name, entry in modules.items()
+        }
+    }
+
+
+def check_budget(report: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    """
+    检查测量结果是否超出预算
+
+    Args:
+        report: 测量结果
+        budget: 预算配置（总耗时、各模块累计耗时上限、禁止在启动时导入的模块）
+
+    Returns:
+        超出预算的说明列表，为空表示全部满足
+    """
+    violations = []
+    if 'total_ms' in budget and report['total_ms'] > budget['total_ms']:
+        violations.append(f"总导入耗时 {report['total_ms']:.1f} ms 超出预算 {budget['total_ms']} ms")
+
+    for name, limit in budget.get('modules_ms', {}).items():
+        module = report['modules'].get(name)
+        if module and module['cumulative_ms'] > limit:
+            violations.append(f"{name} 累计导入耗时 {module['cumulative_ms']:.1f} ms 超出预算 {limit} ms")
+
+    for name in budget.get('forbidden_modules', []):
+        if name in report['modules']:
+            violations.append(f"{name} 不应在启动时导入（请改为延迟导入）")
+
+    return violations
+
+
+def print_report(report: Dict[str, Any], top: int):
+    """打印导入耗时明细"""
+    print(f"\n{report['import_statement']}  总导入耗时 {report['total_ms']:.1f} ms（{report['repeat']} 次中位数）")
+
+    print(f"\n累计耗时最高的顶层模块:")
+    top_level = sorted(((name, item) for name, item in report['modules'].items() if item['depth'] == 0),
+                       key=lambda pair: pair[1]['cumulative_ms'], reverse=True)
+    for name, item in top_level[:top]:
+        print(f"  {name:<50} {item['cumulative_ms']:>10.1f} ms")
+
+    print(f"\n自身耗时最高的模块:")
+    by_self = sorted(report['modules'].items(), key=lambda pair: pair[1]['self_ms'], reverse=True)
+    for name, item in by_self[:top]:
+        print(f"  {name:<50} {item['self_ms']:>10.1f} ms（累计 {item['cumulative_ms']:.1f} ms）")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="销售回款统计系统冷启动导入耗时测量")
+    parser.add_argument('--repeat', type=int, default=3, help="测量次数（默认 3）")
+    parser.add_argument('--top', type=int, default=20, help="显示耗时最高的模块数（默认 20）")
+    parser.add_argument('--budget', default=DEFAULT_BUDGET, help="预算配置文件（默认 benchmarks/cold_start_budget.json）")
+    parser.add_argument('--output', help="结果输出文件（JSON）")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding='utf-8') as f:
+        budget = json.load(f)
+
+    report = measure(budget.get('import_statement', DEFAULT_IMPORT), repeat=args.repeat)
+    print_report(report, args.top)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+
+    violations = check_budget(report, budget)
+    if violations:
+        print("\n⚠️ 超出冷启动预算:")
+        for violation in violations:
+            print(f"  - {violation}")
+        sys.exit(1)
+    print("\n✅ 冷启动导入耗时在预算内")
+
+
+if __name__ == "__main__":
+    main()
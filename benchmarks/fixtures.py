@@ -0,0 +1,57 @@
+"""
+基准测试数据
+按规模生成并缓存可复现的测试数据文件
+"""
+
+import glob
+import os
+from typing import Dict, List
+
+from utils.workbook_generator import WorkbookGenerator
+
+# 测试数据规模（小规模约为当前人数，中等为10倍，大规模为100倍）
+SCALES: Dict[str, Dict[str, int]] = {
+    'small': {'employees': 50, 'teams': 8, 'departments': 5},
+    'medium': {'employees': 500, 'teams': 40, 'departments': 12},
+    'large': {'employees': 5000, 'teams': 200, 'departments': 30},
+}
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.fixtures')
+FIXTURE_SEED = 20240101
+FIXTURE_MONTHS = 3
+FIXTURE_WEEKS = 4
+FIXTURE_START = (2024, 1)
+
+
+def get_fixture_files(scale: str) -> List[str]:
+    """
+    获取某规模的测试数据文件（按月份排序），不存在时生成
+
+    Args:
+        scale: 规模名称（small / medium / large）
+
+    Returns:
+        文件路径列表
+    """
+    if scale not in SCALES:
+        raise ValueError(f"未知的数据规模: {scale}，可选: {', '.join(SCALES)}")
+
+    scale_dir = os.path.join(FIXTURE_DIR, f"{scale}_seed{FIXTURE_SEED}")
+    files = glob.glob(os.path.join(scale_dir, '*.xlsx'))
+    if len(files) == FIXTURE_MONTHS:
+        return sorted(files, key=get_month_key_sort)
+
+    generator = WorkbookGenerator(weeks=FIXTURE_WEEKS, seed=FIXTURE_SEED, **SCALES[scale])
+    return generator.generate(scale_dir, *FIXTURE_START, months=FIXTURE_MONTHS)
+
+
+def get_month_key(path: str) -> str:
+    """从文件名提取月份标识，如 2024年1月"""
+    name = os.path.basename(path)
+    return name.replace('员工销售回款统计_', '').replace('.xlsx', '')
+
+
+def get_month_key_sort(path: str) -> tuple:
+    """月份排序键"""
+    year, month = get_month_key(path).rstrip('月').split('年')
+    return int(year), int(month)
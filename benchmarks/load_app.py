@@ -0,0 +1,88 @@
+"""
+负载测试渲染目标
+由负载测试启动的 streamlit run 服务运行，每个 WebSocket 会话的每次运行执行查询参数中指定的一个用户操作
+
+环境变量:
+    SAC_LOAD_FILES: 测试数据文件列表（按月份排序，以 os.pathsep 分隔）
+
+查询参数:
+    step: 本次运行的操作 - upload（上传当月文件）、history（上传历史文件）或页面名称
+
+上传操作与主页、历史对比页一样经过解析队列（排队、临时文件、子进程解析），
+页面完整渲染后输出 LOAD_STEP_MARKER 标记，负载测试据此判断本次运行是否成功。
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+
+from benchmarks.fixtures import get_month_key
+from benchmarks.load_test import LOAD_FILES_ENV, LOAD_STEP_MARKER
+from core.ingestion import ingestion_scheduler
+from core.page_manager import page_manager
+from core.state_manager import state_manager
+from utils.data_loader import data_loader
+
+
+class _LoadUpload(io.BytesIO):
+    """模拟浏览器上传的文件对象（与 Streamlit 的 UploadedFile 一样带有 name、size、file_id）"""
+
+    def __init__(self, path: str, file_id: str):
+        with open(path, 'rb') as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+        self.size = len(self.getbuffer())
+        self.file_id = file_id
+
+
+def _next_upload_id(prefix: str) -> str:
+    """每次上传生成新的文件标识（与浏览器重新选择文件一致，不复用上一次的解析任务）"""
+    count = st.session_state.get('load_upload_count', 0) + 1
+    st.session_state.load_upload_count = count
+    return f"{prefix}-{count}"
+
+
+state_manager._initialize_state()
+files = [path for path in os.environ.get(LOAD_FILES_ENV, '').split(os.pathsep) if path]
+step = st.query_params.get('step', 'home')
+
+if step == 'upload':
+    # 与主页上传流程一致：通过解析队列加载当月文件并保存到会话
+    uploaded_file = _LoadUpload(files[-1], _next_upload_id('upload'))
+    score_df, sales_df, department_sales_df, ranking_df, error = ingestion_scheduler.load_with_progress(
+        uploaded_file, key="load_upload")
+    if error:
+        raise RuntimeError(error)
+    state_manager.set_data('score_df', score_df)
+    state_manager.set_data('sales_df', sales_df)
+    state_manager.set_data('department_sales_df', department_sales_df)
+    state_manager.set_data('ranking_df', ranking_df)
+    state_manager.set_file_name(uploaded_file.name)
+    step = 'home'
+elif step == 'history':
+    # 与历史对比页上传流程一致：内容相同的文件跳过，其余通过解析队列加载
+    for path in files:
+        uploaded_file = _LoadUpload(path, _next_upload_id('history'))
+        content_hash = data_loader.compute_content_hash(uploaded_file)
+        if state_manager.find_history_by_hash(content_hash) is not None:
+            continue
+        score_df, sales_df, department_sales_df, ranking_df, error = ingestion_scheduler.load_with_progress(
+            uploaded_file, key=f"load_history_{content_hash}")
+        if error:
+            raise RuntimeError(error)
+        state_manager.add_history_file(get_month_key(path), {
+            'file_name': uploaded_file.name,
+            'content_hash': content_hash,
+            'sales_df': sales_df,
+            'department_sales_df': department_sales_df
+        })
+    step = 'history_compare'
+
+st.session_state.current_page = step
+page_manager.initialize_from_session()
+page_manager.render_current_page()
+st.caption(f"{LOAD_STEP_MARKER}{step}")
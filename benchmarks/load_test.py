@@ -0,0 +1,374 @@
+"""
+并发会话负载测试
+启动一个真实的 streamlit run 服务，用多个 WebSocket 会话按真实操作路径访问应用，
+统计重新运行延迟和服务进程的内存占用
+
+所有会话运行在同一个服务进程中，共享 st.cache_data / st.cache_resource 缓存、解析队列和上传临时目录，
+与生产部署一致。本进程只负责发送重新运行请求并等待运行结束，不参与页面渲染。
+
+一次运行出现以下任一情况计为出错：页面输出了异常、没有输出运行完成标记（脚本线程中途失败或页面提前停止）、
+超时没有收到运行结束消息、连接断开。
+
+用法:
+    python -m benchmarks.load_test --sessions 20 --scale medium --iterations 2 --output load_results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.fixtures import SCALES, get_fixture_files
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOAD_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_app.py')
+RUN_TIMEOUT = 600
+SERVER_START_TIMEOUT = 60
+
+# 负载测试服务的测试数据文件环境变量，以及每次运行结束时页面输出的完成标记
+LOAD_FILES_ENV = "SAC_LOAD_FILES"
+LOAD_STEP_MARKER = "load-step-done:"
+
+# 月末高峰期典型操作路径：上传当月文件 → 红黑榜 → 销售统计 → 排名 → 历史对比
+NAVIGATION_PATH = [
+    'upload', 'leaderboard', 'scores', 'sales', 'ranking', 'department_sales',
+    'history', 'overall_trends', 'employee_details', 'department_details'
+]
+
+
+def _read_proc_status_kb(pid: int, field: str) -> float:
+    """读取 /proc/<pid>/status 中的内存字段（KB）"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith(f'{field}:'):
+                    return float(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0.0
+
+
+def get_rss_kb(pid: int) -> float:
+    """获取进程的常驻内存（KB）"""
+    return _read_proc_status_kb(pid, 'VmRSS')
+
+
+def get_peak_rss_kb(pid: int) -> float:
+    """获取进程的峰值常驻内存（KB）"""
+    return _read_proc_status_kb(pid, 'VmHWM')
+
+
+def _find_free_port() -> int:
+    """获取一个空闲的本地端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class LoadServer:
+    """负载测试用的 streamlit run 服务（子进程）"""
+
+    def __init__(self, files: List[str], port: Optional[int] = None):
+        self.files = files
+        self.port = port or _find_free_port()
+        self.process: Optional[subprocess.Popen] = None
+        self.log_path = os.path.join(tempfile.gettempdir(), f"sac_load_server_{self.port}.log")
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def start(self):
+        """启动服务并等待健康检查通过"""
+        env = dict(os.environ, **{LOAD_FILES_ENV: os.pathsep.join(self.files)})
+        command = [
+            sys.executable, '-m', 'streamlit', 'run', LOAD_APP,
+            '--server.headless', 'true',
+            '--server.address', '127.0.0.1',
+            '--server.port', str(self.port),
+            '--server.fileWatcherType', 'none',
+            '--browser.gatherUsageStats', 'false',
+        ]
+        with open(self.log_path, 'wb') as log:
+            self.process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+        health_url = f"http://127.0.0.1:{self.port}/_stcore/health"
+        deadline = time.time() + SERVER_START_TIMEOUT
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"负载测试服务启动失败，详见 {self.log_path}")
+            try:
+                with urllib.request.urlopen(health_url, timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"负载测试服务 {SERVER_START_TIMEOUT} 秒内未就绪，详见 {self.log_path}")
+
+    def stop(self):
+        """停止服务"""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class LoadSession:
+    """一个模拟浏览器会话：通过 WebSocket 发送重新运行请求并等待运行结束"""
+
+    def __init__(self, ws):
+        self.ws = ws
+
+    @staticmethod
+    def connect(url: str):
+        """建立到服务的 WebSocket 连接（上下文管理器）"""
+        from websockets.sync.client import connect
+
+        return connect(url, subprotocols=['streamlit'], max_size=None, open_timeout=SERVER_START_TIMEOUT)
+
+    def rerun(self, step: str, timeout: float = RUN_TIMEOUT) -> Optional[str]:
+        """
+        以 ?step=<操作> 重新运行一次页面
+
+        Returns:
+            出错信息；运行成功并输出了完成标记时返回None
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back_msg = BackMsg()
+        back_msg.rerun_script.query_string = f"step={step}"
+        self.ws.send(back_msg.SerializeToString())
+
+        exceptions = []
+        marker_seen = False
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return f"{timeout:.0f} 秒内没有运行结束"
+            try:
+                data = self.ws.recv(timeout=remaining)
+            except TimeoutError:
+                return f"{timeout:.0f} 秒内没有运行结束"
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            msg_type = msg.WhichOneof('type')
+
+            if msg_type == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception':
+                    exceptions.append(f"{element.exception.type}: {element.exception.message}")
+                elif element_type == 'markdown' and element.markdown.body.startswith(LOAD_STEP_MARKER):
+                    marker_seen = True
+            elif msg_type == 'session_event' and msg.session_event.WhichOneof('type') == 'script_compilation_exception':
+                exceptions.append(msg.session_event.script_compilation_exception.message)
+            elif msg_type == 'script_finished':
+                if msg.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    # 页面内部触发了重新运行（st.rerun），继续等待新一轮运行结束
+                    continue
+                if exceptions:
+                    return exceptions[0]
+                if not marker_seen:
+                    return "运行结束但页面没有渲染完成（未输出完成标记）"
+                return None
+
+
+class LoadTest:
+    """并发会话负载测试类"""
+
+    def __init__(self, sessions: int, files: List[str], iterations: int = 1,
+                 think_time: float = 0.0, ramp_up: float = 0.0, seed: int = 0):
+        """
+        Args:
+            sessions: 并发会话数
+            files: 测试数据文件列表
+            iterations: 每个会话重复操作路径的次数
+            think_time: 每步操作之间的最大随机等待时间（秒）
+            ramp_up: 所有会话在该时间内（秒）依次启动
+            seed: 等待时间的随机种子
+        """
+        self.sessions = sessions
+        self.files = files
+        self.iterations = iterations
+        self.think_time = think_time
+        self.ramp_up = ramp_up
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._release = threading.Event()
+        self.timings: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+
+    def _record(self, index: int, iteration: int, step: str, latency_ms: float, error: Optional[str]):
+        """记录一次运行结果"""
+        with self._lock:
+            self.timings.append({'session': index, 'iteration': iteration, 'step': step,
+                                 'latency_ms': latency_ms, 'error': error})
+            if error:
+                self.errors.append(f"会话{index} {step}: {error}")
+
+    def _run_session(self, index: int, url: str, start_barrier: threading.Barrier,
+                     finished: threading.Event):
+        """单个会话按操作路径依次运行，结束后保持连接直到统计完内存"""
+        rng = random.Random(self.seed + index)
+        try:
+            start_barrier.wait()
+            if self.ramp_up:
+                time.sleep(self.ramp_up * index / max(1, self.sessions))
+
+            with LoadSession.connect(url) as ws:
+                session = LoadSession(ws)
+                for iteration in range(self.iterations):
+                    for step in NAVIGATION_PATH:
+                        start = time.perf_counter()
+                        try:
+                            error = session.rerun(step)
+                        except Exception as e:
+                            error = f"{type(e).__name__}: {e}"
+                        self._record(index, iteration, step, (time.perf_counter() - start) * 1000, error)
+
+                        if self.think_time:
+                            time.sleep(rng.uniform(0, self.think_time))
+
+                finished.set()
+                self._release.wait()
+        except Exception as e:
+            self._record(index, 0, 'connect', 0.0, f"{type(e).__name__}: {e}")
+        finally:
+            finished.set()
+
+    def run(self) -> Dict[str, Any]:
+        """启动服务、运行负载测试并返回统计结果"""
+        server = LoadServer(self.files)
+        server.start()
+        try:
+            pid = server.process.pid
+            baseline_rss = get_rss_kb(pid)
+            barrier = threading.Barrier(self.sessions)
+            finished = [threading.Event() for _ in range(self.sessions)]
+            threads = [threading.Thread(target=self._run_session, args=(i, server.url, barrier, finished[i]),
+                                        daemon=True)
+                       for i in range(self.sessions)]
+
+            wall_start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for event in finished:
+                event.wait()
+            wall_s = time.perf_counter() - wall_start
+
+            # 所有会话仍保持连接时的服务进程内存占用
+            final_rss = get_rss_kb(pid)
+            peak_rss = get_peak_rss_kb(pid)
+            self._release.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            server.stop()
+
+        report = self._summarize(wall_s, baseline_rss, final_rss, peak_rss)
+        report['server_log'] = server.log_path
+        return report
+
+    @staticmethod
+    def _percentiles(latencies: List[float]) -> Dict[str, float]:
+        """计算延迟分位数"""
+        values = np.asarray(latencies)
+        return {
+            'count': int(values.size),
+            'p50_ms': round(float(np.percentile(values, 50)), 1),
+            'p95_ms': round(float(np.percentile(values, 95)), 1),
+            'p99_ms': round(float(np.percentile(values, 99)), 1),
+            'max_ms': round(float(values.max()), 1),
+        }
+
+    def _summarize(self, wall_s: float, baseline_rss: float, final_rss: float, peak_rss: float) -> Dict[str, Any]:
+        """汇总延迟和内存统计"""
+        ok_timings = [t for t in self.timings if not t['error']]
+        by_step = {}
+        for step in NAVIGATION_PATH:
+            latencies = [t['latency_ms'] for t in ok_timings if t['step'] == step]
+            if latencies:
+                by_step[step] = self._percentiles(latencies)
+
+        return {
+            'sessions': self.sessions,
+            'iterations': self.iterations,
+            'wall_s': round(wall_s, 2),
+            'reruns': len(self.timings),
+            'throughput_rps': round(len(self.timings) / wall_s, 2) if wall_s else 0,
+            'overall': self._percentiles([t['latency_ms'] for t in ok_timings]) if ok_timings else {},
+            'by_step': by_step,
+            'memory': {
+                'baseline_rss_mb': round(baseline_rss / 1024, 1),
+                'final_rss_mb': round(final_rss / 1024, 1),
+                'peak_rss_mb': round(peak_rss / 1024, 1),
+                'per_session_mb': round((final_rss - baseline_rss) / 1024 / self.sessions, 2),
+            },
+            'error_count': len(self.errors),
+            'errors': self.errors[:50],
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    """打印负载测试报告"""
+    print(f"\n会话数 {report['sessions']} ｜ 重新运行 {report['reruns']} 次 ｜ 总耗时 {report['wall_s']} s ｜ "
+          f"吞吐 {report['throughput_rps']} 次/秒")
+    print(f"\n{'操作':<20} {'次数':>6} {'P50(ms)':>10} {'P95(ms)':>10} {'P99(ms)':>10} {'最大(ms)':>10}")
+    rows = list(report['by_step'].items()) + [('全部', report['overall'])]
+    for step, stats in rows:
+        if stats:
+            print(f"{step:<20} {stats['count']:>6} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} "
+                  f"{stats['p99_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+    memory = report['memory']
+    print(f"\n服务进程内存：初始 {memory['baseline_rss_mb']} MB ｜ 结束 {memory['final_rss_mb']} MB ｜ "
+          f"峰值 {memory['peak_rss_mb']} MB ｜ 每会话约 {memory['per_session_mb']} MB")
+    if report['errors']:
+        print(f"\n出错 {report['error_count']} 次，例如：{report['errors'][0]}")
+        print(f"服务日志: {report['server_log']}")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="销售回款统计系统并发会话负载测试")
+    parser.add_argument('--sessions', type=int, default=10, help="并发会话数（默认 10）")
+    parser.add_argument('--scale', default='small', choices=list(SCALES), help="测试数据规模（默认 small）")
+    parser.add_argument('--iterations', type=int, default=1, help="每个会话重复操作路径的次数（默认 1）")
+    parser.add_argument('--think-time', type=float, default=0.0, help="操作间最大随机等待时间，秒（默认 0）")
+    parser.add_argument('--ramp-up', type=float, default=0.0, help="会话依次启动的总时长，秒（默认 0）")
+    parser.add_argument('--output', help="结果输出文件（JSON）")
+    args = parser.parse_args()
+
+    files = get_fixture_files(args.scale)
+
+    load_test = LoadTest(args.sessions, files, iterations=args.iterations,
+                         think_time=args.think_time, ramp_up=args.ramp_up)
+    report = load_test.run()
+    report['scale'] = args.scale
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
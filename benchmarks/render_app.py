@@ -0,0 +1,46 @@
+"""
+基准测试渲染目标
+由 Streamlit AppTest 加载，渲染 session_state 中指定的页面
+
+会话状态参数:
+    bench_files: 测试数据文件列表（按月份排序，最后一个作为当前数据，全部作为历史数据）
+    bench_route: 要渲染的页面
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+
+from benchmarks.fixtures import get_month_key
+from core.page_manager import page_manager
+from core.state_manager import state_manager
+from utils.data_loader import data_loader
+
+state_manager._initialize_state()
+
+# 首次运行时加载数据，后续运行复用会话中的数据
+if not st.session_state.get('bench_loaded'):
+    files = st.session_state.get('bench_files', [])
+    for path in files:
+        score_df, sales_df, department_sales_df, ranking_df, error = data_loader.load_excel_data(path)
+        if error:
+            raise RuntimeError(error)
+        state_manager.add_history_file(get_month_key(path), {
+            'file_name': os.path.basename(path),
+            'sales_df': sales_df,
+            'department_sales_df': department_sales_df
+        })
+    if files:
+        state_manager.set_data('score_df', score_df)
+        state_manager.set_data('sales_df', sales_df)
+        state_manager.set_data('department_sales_df', department_sales_df)
+        state_manager.set_data('ranking_df', ranking_df)
+        state_manager.set_file_name(os.path.basename(files[-1]))
+    st.session_state.bench_loaded = True
+
+st.session_state.current_page = st.session_state.get('bench_route', 'home')
+page_manager.initialize_from_session()
+page_manager.render_current_page()
@@ -0,0 +1,138 @@
+"""
+图表组件
+统一处理大数据量下的排名柱状图截断与折线图曲线数量控制
+"""
+
+import pandas as pd
+import streamlit as st
+from typing import Tuple, List
+from config.display_config import (
+    RANKING_MAX_BARS, RANKING_TOP_N, RANKING_BOTTOM_N,
+    CHART_MAX_SERIES, CHART_WEBGL_MIN_SERIES,
+    TREND_POINT_BUDGETS, DEFAULT_TREND_POINT_BUDGET, TREND_VIEWPORT_MIN_MONTHS
+)
+
+OTHERS_FLAG_COLUMN = '_is_others'
+
+
+class Charts:
+    """图表组件类"""
+
+    @staticmethod
+    def select_top_bottom(df: pd.DataFrame, value_col: str, label_col: str,
+                          top_n: int = RANKING_TOP_N, bottom_n: int = RANKING_BOTTOM_N,
+                          max_bars: int = RANKING_MAX_BARS,
+                          others_label: str = "其余{count}人(平均)") -> Tuple[pd.DataFrame, int]:
+        """
+        截取排名数据的前N名和后N名，中间部分合并为一条平均值记录
+
+        Args:
+            df: 已按数值降序排列的数据
+            value_col: 数值列
+            label_col: 名称列
+            top_n: 保留的前N名
+            bottom_n: 保留的后N名
+            max_bars: 不超过该数量时不做截取
+            others_label: 合并记录的名称模板（{count}为合并的数量）
+
+        Returns:
+            (显示数据, 合并的数量) - 显示数据包含 _is_others 标记列和原始名次列 _rank
+        """
+        result = df.reset_index(drop=True).copy()
+        result['_rank'] = range(len(result))
+        result[OTHERS_FLAG_COLUMN] = False
+
+        if len(result) <= max_bars or len(result) <= top_n + bottom_n:
+            return result, 0
+
+        middle = result.iloc[top_n:len(result) - bottom_n]
+        others = pd.DataFrame({
+            label_col: [others_label.format(count=len(middle))],
+            value_col: [middle[value_col].mean()],
+            '_rank': [-1],
+            OTHERS_FLAG_COLUMN: [True]
+        })
+        display_df = pd.concat(
+            [result.iloc[:top_n], others, result.iloc[len(result) - bottom_n:]],
+            ignore_index=True
+        )
+        return display_df, len(middle)
+
+    @staticmethod
+    def render_expand_toggle(total_count: int, key: str, unit: str = "人",
+                             max_bars: int = RANKING_MAX_BARS) -> bool:
+        """
+        数量超过阈值时显示"展开全部"开关
+
+        Returns:
+            是否展开显示全部数据
+        """
+        if total_count <= max_bars:
+            return True
+        return st.checkbox(f"显示全部 {total_count} {unit}", key=key)
+
+    @staticmethod
+    def limit_series(df: pd.DataFrame, series_col: str, value_col: str, key: str,
+                     max_series: int = CHART_MAX_SERIES) -> pd.DataFrame:
+        """
+        限制折线图的曲线数量
+
+        曲线数量超过上限时默认只保留合计值最大的若干条，用户可勾选展开全部。
+
+        Args:
+            df: 长格式数据
+            series_col: 区分曲线的列（如员工、部门）
+            value_col: 数值列
+            key: 展开开关的唯一标识
+            max_series: 默认显示的最大曲线数
+
+        Returns:
+            用于绘图的数据
+        """
+        series_count = df[series_col].nunique()
+        if series_count <= max_series:
+            return df
+        if st.checkbox(f"显示全部 {series_count} 条曲线（默认显示合计最高的 {max_series} 条）", key=key):
+            return df
+        top_series = df.groupby(series_col, observed=True)[value_col].sum().nlargest(max_series).index
+        return df[df[series_col].isin(top_series)]
+
+    @staticmethod
+    def get_line_render_mode(df: pd.DataFrame, series_col: str,
+                             min_series: int = CHART_WEBGL_MIN_SERIES) -> str:
+        """曲线数量较多时使用 WebGL 渲染"""
+        return 'webgl' if df[series_col].nunique() > min_series else 'auto'
+
+    @staticmethod
+    def get_point_budget(chart_name: str) -> int:
+        """获取趋势图的数据点预算"""
+        return TREND_POINT_BUDGETS.get(chart_name, DEFAULT_TREND_POINT_BUDGET)
+
+    @staticmethod
+    def select_month_range(sorted_months: List[str], key: str,
+                           min_months: int = TREND_VIEWPORT_MIN_MONTHS) -> List[str]:
+        """
+        月份较多时显示趋势图的时间范围选择
+
+        Args:
+            sorted_months: 已按时间排序的月份列表
+            key: 控件唯一标识
+            min_months: 月份数量超过该值时才显示选择控件
+
+        Returns:
+            选中范围内的月份列表
+        """
+        if len(sorted_months) <= min_months:
+            return list(sorted_months)
+        start, end = st.select_slider(
+            "趋势图时间范围",
+            options=list(sorted_months),
+            value=(sorted_months[0], sorted_months[-1]),
+            key=key
+        )
+        start_idx, end_idx = sorted_months.index(start), sorted_months.index(end)
+        return list(sorted_months[start_idx:end_idx + 1])
+
+
+# 全局图表组件实例
+charts = Charts()
@@ -0,0 +1,239 @@
+"""
+数据表格组件
+统一处理带环比增长率着色的数据表显示
+"""
+
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Optional, List, Dict, Any, Callable
+from config.display_config import (
+    STYLER_MAX_CELLS, GROWTH_POSITIVE_STYLE, GROWTH_NEGATIVE_STYLE,
+    GROWTH_POSITIVE_MARK, GROWTH_NEGATIVE_MARK, GROWTH_FORMAT, TABLE_PAGE_SIZE
+)
+
+DEFAULT_SORT_LABEL = "默认顺序"
+
+
+class DataTable:
+    """数据表格组件类"""
+
+    @staticmethod
+    def get_growth_columns(df: pd.DataFrame) -> List[str]:
+        """获取数据表中的环比增长率列"""
+        return [col for col in df.columns if '环比增长率' in str(col)]
+
+    @staticmethod
+    def compute_growth_masks(values) -> tuple:
+        """
+        根据增长率数值预先计算正负掩码
+
+        Args:
+            values: 增长率数值（Series或数组，缺失值为NaN）
+
+        Returns:
+            (positive_mask, negative_mask) - 大于0为正，小于等于0为负，缺失值均为False
+        """
+        numeric = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+        valid = ~np.isnan(numeric)
+        positive = valid & (numeric > 0)
+        negative = valid & ~positive
+        return positive, negative
+
+    @staticmethod
+    def render_growth_table(df: pd.DataFrame, growth_columns: Optional[List[str]] = None,
+                            column_config: Optional[Dict[str, Any]] = None,
+                            growth_format: str = GROWTH_FORMAT,
+                            max_styler_cells: int = STYLER_MAX_CELLS):
+        """
+        显示带环比增长率着色的数据表
+
+        小表格使用 Styler 按预计算的正负掩码整体着色；大表格不再生成 Styler，
+        增长率列保持数值并使用原生列格式，颜色标记放在其后单独的窄列，避免逐单元格回调和HTML渲染。
+
+        Args:
+            df: 要显示的数据（增长率列为数值，单位为百分比）
+            growth_columns: 增长率列（默认自动识别列名包含"环比增长率"的列）
+            column_config: 其他列的显示配置
+            growth_format: 增长率显示格式（printf 风格）
+            max_styler_cells: 使用 Styler 的最大单元格数
+        """
+        display_df = df.reset_index(drop=True)
+        if growth_columns is None:
+            growth_columns = DataTable.get_growth_columns(display_df)
+        growth_columns = [col for col in growth_columns if col in display_df.columns]
+        config = dict(column_config or {})
+
+        if display_df.size <= max_styler_cells:
+            css = pd.DataFrame('', index=display_df.index, columns=growth_columns)
+            for col in growth_columns:
+                positive, negative = DataTable.compute_growth_masks(display_df[col])
+                css[col] = np.where(positive, GROWTH_POSITIVE_STYLE,
+                                    np.where(negative, GROWTH_NEGATIVE_STYLE, ''))
+                config.setdefault(col, st.column_config.NumberColumn(col, format=growth_format))
+
+            styled_df = display_df.style
+            if growth_columns:
+                styled_df = styled_df.apply(lambda _: css, axis=None, subset=growth_columns)
+            st.dataframe(styled_df, use_container_width=True, hide_index=True, column_config=config)
+            return
+
+        # 大表格：增长率列保持数值（点击表头按数值排序），颜色标记放在紧随其后的窄文本列
+        for col in growth_columns:
+            values = pd.to_numeric(display_df[col], errors='coerce')
+            positive, negative = DataTable.compute_growth_masks(values)
+            mark_col = f"{col}_标记"
+            display_df[col] = values
+            display_df.insert(display_df.columns.get_loc(col) + 1, mark_col,
+                              np.where(positive, GROWTH_POSITIVE_MARK,
+                                       np.where(negative, GROWTH_NEGATIVE_MARK, '')))
+            config.setdefault(col, st.column_config.NumberColumn(col, format=growth_format))
+            config.setdefault(mark_col, st.column_config.TextColumn(" ", width="small"))
+
+        st.dataframe(display_df, use_container_width=True, hide_index=True, column_config=config)
+
+    @staticmethod
+    def _frame_token(df: pd.DataFrame) -> tuple:
+        """计算数据表的内容标识，用于判断服务端缓存是否失效"""
+        content_hash = int(pd.util.hash_pandas_object(df, index=False).sum()) if len(df) else 0
+        return (df.shape, tuple(map(str, df.columns)), content_hash)
+
+    @staticmethod
+    def _get_table_cache(df: pd.DataFrame, key: str) -> Dict[str, Any]:
+        """获取表格的服务端缓存（排序键、筛选值），数据变化时重建"""
+        cache_key = f"{key}_table_cache"
+        token = DataTable._frame_token(df)
+        cache = st.session_state.get(cache_key)
+        if cache is None or cache.get('token') != token:
+            cache = {'token': token, 'sort_keys': {}, 'filter_values': {}, 'csv': None}
+            st.session_state[cache_key] = cache
+        return cache
+
+    @staticmethod
+    def _get_sort_order(df: pd.DataFrame, cache: Dict[str, Any], column: str,
+                        sort_key_funcs: Optional[Dict[str, Callable]] = None) -> np.ndarray:
+        """获取（并缓存）某列的升序行号排列"""
+        if column not in cache['sort_keys']:
+            values = df[column]
+            if sort_key_funcs and column in sort_key_funcs:
+                values = sort_key_funcs[column](values)
+            cache['sort_keys'][column] = np.asarray(
+                pd.Series(values).reset_index(drop=True).argsort(kind='stable'))
+        return cache['sort_keys'][column]
+
+    @staticmethod
+    def _get_filter_values(df: pd.DataFrame, cache: Dict[str, Any], column: str) -> pd.Series:
+        """获取（并缓存）筛选列的小写字符串值"""
+        if column not in cache['filter_values']:
+            cache['filter_values'][column] = df[column].astype(str).str.lower().reset_index(drop=True)
+        return cache['filter_values'][column]
+
+    @staticmethod
+    def render_paginated_table(df: pd.DataFrame, key: str, page_size: int = TABLE_PAGE_SIZE,
+                               sort_columns: Optional[List[str]] = None,
+                               filter_column: Optional[str] = None,
+                               summary_columns: Optional[List[str]] = None,
+                               sort_key_funcs: Optional[Dict[str, Callable]] = None,
+                               growth_columns: Optional[List[str]] = None,
+                               column_config: Optional[Dict[str, Any]] = None,
+                               growth_format: str = GROWTH_FORMAT):
+        """
+        显示服务端分页、排序和筛选的数据表
+
+        完整数据保留在服务端，排序键按列预先计算并缓存，每次只把当前页的数据
+        和汇总统计发送到浏览器。行数不超过每页行数时直接显示完整表格。
+
+        Args:
+            df: 完整数据
+            key: 组件唯一标识（用于控件key和服务端缓存）
+            page_size: 每页行数
+            sort_columns: 可排序的列（默认全部列）
+            filter_column: 支持关键字筛选的列
+            summary_columns: 显示汇总统计（合计、平均）的数值列
+            sort_key_funcs: 自定义排序键，列名 -> 将该列转换为可排序值的函数
+            growth_columns: 增长率列（着色显示）
+            column_config: 列显示配置
+            growth_format: 增长率显示格式
+        """
+        total_rows = len(df)
+        if total_rows <= page_size:
+            DataTable.render_growth_table(df, growth_columns=growth_columns,
+                                          column_config=column_config, growth_format=growth_format)
+            return
+
+        df = df.reset_index(drop=True)
+        cache = DataTable._get_table_cache(df, key)
+        sort_columns = sort_columns or list(df.columns)
+
+        # 控件区域：排序、筛选
+        control_cols = st.columns([2, 1, 2])
+        with control_cols[0]:
+            sort_column = st.selectbox("排序", [DEFAULT_SORT_LABEL] + list(sort_columns), key=f"{key}_sort_column")
+        with control_cols[1]:
+            descending = st.checkbox("降序", key=f"{key}_sort_desc")
+        keyword = ""
+        if filter_column:
+            with control_cols[2]:
+                keyword = st.text_input(f"筛选{filter_column}", key=f"{key}_filter").strip().lower()
+
+        # 服务端排序和筛选，只操作行号
+        if sort_column == DEFAULT_SORT_LABEL:
+            order = np.arange(total_rows)
+        else:
+            order = DataTable._get_sort_order(df, cache, sort_column, sort_key_funcs)
+        if descending:
+            order = order[::-1]
+
+        mask = None
+        if keyword and filter_column:
+            filter_values = DataTable._get_filter_values(df, cache, filter_column)
+            mask = filter_values.str.contains(keyword, regex=False).to_numpy()
+            order = order[mask[order]]
+
+        filtered_rows = len(order)
+        page_count = max(1, math.ceil(filtered_rows / page_size))
+
+        # 筛选后页数减少时，修正超出范围的页码
+        page_key = f"{key}_page"
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        page = st.number_input(f"页码（共 {page_count} 页）", min_value=1, max_value=page_count,
+                               step=1, key=page_key)
+
+        # 汇总统计（基于筛选后的完整数据）
+        summary_parts = [f"共 {filtered_rows} 条记录" + (f"（总计 {total_rows} 条）" if mask is not None else "")]
+        for col in summary_columns or []:
+            if col in df.columns:
+                values = pd.to_numeric(df[col], errors='coerce')
+                if mask is not None:
+                    values = values[mask]
+                summary_parts.append(f"{col} 合计 {values.sum():,.2f} · 平均 {values.mean():,.2f}")
+        st.caption(" ｜ ".join(summary_parts))
+
+        start = (int(page) - 1) * page_size
+        window_df = df.iloc[order[start:start + page_size]]
+        DataTable.render_growth_table(window_df, growth_columns=growth_columns,
+                                      column_config=column_config, growth_format=growth_format)
+
+    @staticmethod
+    def render_csv_download(df: pd.DataFrame, label: str, file_name: str, key: str):
+        """
+        显示CSV下载按钮
+
+        编码后的CSV缓存在服务端，数据未变化时不重复生成。
+        """
+        cache = DataTable._get_table_cache(df, key)
+        if cache['csv'] is None:
+            cache['csv'] = df.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            label=label,
+            data=cache['csv'],
+            file_name=file_name,
+            mime="text/csv",
+            key=key
+        )
+
+
+# 全局数据表格组件实例
+data_table = DataTable()
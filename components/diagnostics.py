@@ -0,0 +1,106 @@
+"""
+诊断面板组件
+管理员可查看各页面、各片段的性能埋点汇总
+"""
+
+import hmac
+import os
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+
+from config.diagnostics_config import (
+    ADMIN_TOKEN_ENV, ADMIN_QUERY_PARAM, LATENCY_BUDGET_MS, PERF_LOG_ENV, TRACEMALLOC_MAX_SPANS
+)
+from core.instrumentation import instrumentation
+
+
+class Diagnostics:
+    """诊断面板组件类"""
+    
+    @staticmethod
+    def is_admin() -> bool:
+        """
+        检查当前访问者是否为管理员
+        
+        需要同时设置环境变量 SAC_ADMIN_TOKEN，并在地址中携带 ?admin=<口令>
+        """
+        token = os.environ.get(ADMIN_TOKEN_ENV)
+        if not token:
+            return False
+        provided = st.query_params.get(ADMIN_QUERY_PARAM)
+        return bool(provided) and hmac.compare_digest(str(provided), token)
+    
+    @staticmethod
+    def render_panel(latency_budget_ms: float = LATENCY_BUDGET_MS):
+        """显示性能诊断面板（仅管理员可见）"""
+        if not Diagnostics.is_admin():
+            return
+        
+        with st.expander("🛠️ 性能诊断", expanded=False):
+            col_info, col_trace, col_clear = st.columns([3, 1, 1])
+            
+            tracing = tracemalloc.is_tracing()
+            with col_info:
+                log_path = os.environ.get(PERF_LOG_ENV)
+                st.caption(f"延迟预算 {latency_budget_ms:.0f} ms ｜ "
+                           f"日志文件：{log_path if log_path else f'未配置（设置 {PERF_LOG_ENV} 启用）'}")
+                budget = instrumentation.get_tracing_budget()
+                if tracing:
+                    remaining = f"，再记录 {budget} 个片段后自动停止" if budget is not None else ""
+                    st.caption(f"⚠️ 内存追踪进行中：对整个服务进程生效，所有会话都会变慢{remaining}")
+                else:
+                    st.caption(f"⚠️ 内存追踪对整个服务进程生效，所有会话都会变慢，"
+                               f"启用后记录 {TRACEMALLOC_MAX_SPANS} 个片段自动停止")
+            
+            with col_trace:
+                if st.button("停止内存追踪" if tracing else "启用内存追踪（全局）", key="diag_toggle_tracemalloc",
+                             use_container_width=True):
+                    if tracing:
+                        instrumentation.stop_tracing()
+                    else:
+                        instrumentation.start_tracing()
+                    st.rerun()
+            
+            with col_clear:
+                if st.button("清空记录", key="diag_clear_records", use_container_width=True):
+                    instrumentation.clear()
+                    st.rerun()
+            
+            summary = instrumentation.summarize()
+            if summary.empty:
+                st.info("暂无埋点记录")
+                return
+            
+            # 超出延迟预算的片段
+            breaches = summary[summary['耗时P95'] > latency_budget_ms]
+            if not breaches.empty:
+                st.warning(f"⚠️ {len(breaches)} 个片段的 P95 耗时超出预算")
+            
+            st.markdown("#### 片段汇总（毫秒）")
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+            
+            # 每次上传解析的峰值内存
+            uploads = [record for record in instrumentation.get_records() if record['span'] == 'ingestion.parse']
+            if uploads:
+                st.markdown("#### 上传解析内存（MB）")
+                upload_df = pd.DataFrame([{
+                    '时间': pd.to_datetime(record['timestamp'], unit='s'),
+                    '文件': record['tags'].get('file_name'),
+                    '文件大小': record['tags'].get('file_size_mb'),
+                    '解析方式': record['tags'].get('mode'),
+                    '峰值内存': record['tags'].get('peak_rss_mb'),
+                    '内存增长': record['tags'].get('rss_growth_mb'),
+                    '耗时(ms)': record['wall_ms'],
+                } for record in uploads[-20:][::-1]])
+                st.dataframe(upload_df, use_container_width=True, hide_index=True)
+
+            st.markdown("#### 最近记录")
+            recent = pd.DataFrame(instrumentation.get_records()[-50:][::-1])
+            recent['timestamp'] = pd.to_datetime(recent['timestamp'], unit='s')
+            st.dataframe(recent, use_container_width=True, hide_index=True)
+
+
+# 全局诊断面板组件实例
+diagnostics = Diagnostics()
@@ -0,0 +1,105 @@
+"""
+列使用配置文件
+声明每个页面使用的工作表列，导入时只读取所有页面用到的列，其余列不加载
+"""
+
+# 周数据列（第N周销售额、第N周回款合计等），按正则匹配
+WEEKLY_COLUMN_PATTERN = r'^第\d+周'
+
+# 积分构成类别
+SCORE_CATEGORY_COLUMNS = ['销售额目标分', '回款额目标分', '超期账款追回分',
+                          '销售排名分', '回款排名分',
+                          '销售进步分', '回款进步分', '基础分', '小组加分']
+
+# 各页面使用的列 - 页面 -> 工作表 -> {columns: 列名, patterns: 列名正则}
+ROUTE_COLUMN_USAGE = {
+    "leaderboard": {
+        "员工积分数据": {"columns": ['员工姓名', '队名', '统计月份', '个人总积分', '加权小组总分']},
+        "销售回款数据统计": {"columns": ['员工姓名', '本月销售额', '本月回款合计']},
+    },
+    "scores": {
+        "员工积分数据": {"columns": ['员工姓名', '队名', '个人总积分', '加权小组总分'] + SCORE_CATEGORY_COLUMNS},
+    },
+    "sales": {
+        "销售回款数据统计": {
+            "columns": ['员工姓名', '队名', '本月销售任务', '本月回款任务', '销售业绩完成进度', '回款业绩完成进度',
+                        '本月销售额', '本月回未超期款', '本月回超期款', '本月回款合计', '月末逾期未收回额',
+                        '上月销售额', '上月销售额参考', '上月回款额', '上月回款额参考'],
+            "patterns": [WEEKLY_COLUMN_PATTERN]
+        },
+    },
+    "department_sales": {
+        "部门销售回款统计": {
+            "columns": ['部门', '本月销售额', '本月回未超期款', '本月回超期款', '月末逾期未收回额'],
+            "patterns": [WEEKLY_COLUMN_PATTERN]
+        },
+    },
+    "ranking": {
+        "销售回款超期账款排名": {"columns": ['排名类型', '排名', '姓名', '员工姓名', '金额']},
+    },
+    "history_compare": {
+        "员工积分数据": {"columns": ['统计月份']},
+        "销售回款数据统计": {"columns": ['统计月份']},
+    },
+    "overall_trends": {
+        "销售回款数据统计": {"columns": ['员工姓名', '本月销售额', '本月回款合计', '月末逾期未收回额']},
+    },
+    "employee_details": {
+        "销售回款数据统计": {"columns": ['员工姓名', '本月销售额', '本月回款合计', '月末逾期未收回额']},
+    },
+    "department_details": {
+        "部门销售回款统计": {"columns": ['部门', '本月销售额', '本月回未超期款', '本月回超期款', '月末逾期未收回额']},
+    },
+}
+
+# 数据加载、校验和导航状态使用的公共列（主页数据摘要、数据校验、月份识别）
+COMMON_COLUMN_USAGE = {
+    "员工积分数据": {"columns": ['员工姓名', '队名', '统计月份', '个人总积分', '加权小组总分']},
+    "销售回款数据统计": {"columns": ['员工姓名', '统计月份', '本月销售额', '本月回款合计', '上月销售额', '上月回款额']},
+    "部门销售回款统计": {"columns": ['部门', '统计月份']},
+    "销售回款超期账款排名": {"columns": ['排名类型']},
+}
+
+# 额外保留的列 - 工作表 -> 列名（如需在导出或新功能中使用页面未声明的列，在此添加）
+EXTRA_COLUMNS = {}
+
+# 列裁剪开关环境变量 - 设置为 0 时读取全部列
+COLUMN_PRUNING_ENV = "SAC_PRUNE_COLUMNS"
+
+# 转换为分类类型的文本列（取值重复较多，且页面中频繁按值筛选）
+CATEGORICAL_COLUMNS = ['员工姓名', '姓名', '队名', '部门', '排名类型', '统计月份']
+
+# 金额/分数列 - 按列名正则匹配，统一转换为 float64，无法识别的单元格置空并记录
+NUMERIC_COLUMN_PATTERNS = [r'额', r'款', r'任务$', r'积分$', r'总分$', r'分$']
+
+# 数值列中无法识别的单元格最多记录的示例数
+COERCION_SAMPLE_LIMIT = 5
+
+# 列名别名 - 工作表 -> 标准列名 -> 可能的列名（按优先级），导入时统一重命名为标准列名，
+# 兼容旧版工作簿的列名
+COLUMN_ALIASES = {
+    "销售回款数据统计": {
+        "上月销售额": ['上月销售额', '上月销售额参考'],
+        "上月回款额": ['上月回款额', '上月回款额参考'],
+    },
+    "部门销售回款统计": {
+        "部门": ['部门', '部门名称'],
+    },
+    "销售回款超期账款排名": {
+        "姓名": ['姓名', '员工姓名'],
+        "金额": ['金额', '金额(元)'],
+    },
+}
+
+# 派生列 - 工作表 -> [{name: 列名, sum: 求和的来源列}]，文件中缺少该列且来源列齐全时导入时计算；
+# 列名中的 {week} 按数据中出现的周次展开
+DERIVED_COLUMNS = {
+    "销售回款数据统计": [
+        {"name": '本月回款合计', "sum": ['本月回未超期款', '本月回超期款']},
+        {"name": '第{week}周回款合计', "sum": ['第{week}周回未超期款', '第{week}周回超期款']},
+    ],
+    "部门销售回款统计": [
+        {"name": '月总回款额', "sum": ['本月回未超期款', '本月回超期款']},
+        {"name": '第{week}周总回款额', "sum": ['第{week}周回未超期款', '第{week}周回超期款']},
+    ],
+}
@@ -0,0 +1,39 @@
+"""
+诊断配置文件
+定义性能埋点、诊断面板的开关与阈值
+"""
+
+# 性能记录环境变量 - 设置为文件路径时将每条埋点记录以 JSON Lines 格式追加写入
+PERF_LOG_ENV = "SAC_PERF_LOG"
+
+# 内存中保留的埋点记录数量（环形缓冲区）
+PERF_MAX_RECORDS = 5000
+
+# 诊断面板启用的内存追踪（tracemalloc）对整个服务进程生效，所有会话都会变慢，
+# 记录该数量的片段后自动停止
+TRACEMALLOC_MAX_SPANS = 200
+
+# 页面渲染延迟预算（毫秒），诊断面板中超出预算的记录会被标记
+LATENCY_BUDGET_MS = 1000
+
+# 管理员口令环境变量 - 未设置时诊断面板不可用
+ADMIN_TOKEN_ENV = "SAC_ADMIN_TOKEN"
+
+# 管理员口令查询参数，如 ?admin=<口令>
+ADMIN_QUERY_PARAM = "admin"
+
+# 性能剖析环境变量 - 设置为 1 时每次重新运行都进行 cProfile 和 tracemalloc 剖析
+PROFILE_ENV = "SAC_PROFILE"
+
+# 性能剖析查询参数 - 管理员访问 ?admin=<口令>&profile=1 时仅剖析本次重新运行
+PROFILE_QUERY_PARAM = "profile"
+
+# 剖析报告输出目录环境变量及默认目录
+PROFILE_DIR_ENV = "SAC_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+
+# 剖析报告中显示的函数和内存分配条目数
+PROFILE_TOP_N = 20
+
+# tracemalloc 记录的调用栈深度
+PROFILE_TRACEMALLOC_FRAMES = 10
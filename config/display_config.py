@@ -0,0 +1,53 @@
+"""
+显示配置文件
+定义表格、图表渲染的样式与性能阈值
+"""
+
+# 表格配置 - 单元格总数不超过该值时使用 pandas Styler 着色，超过则改用原生列格式
+STYLER_MAX_CELLS = 2000
+
+# 环比增长率着色样式（Styler 模式）
+GROWTH_POSITIVE_STYLE = "color: green; font-weight: bold"
+GROWTH_NEGATIVE_STYLE = "color: red; font-weight: bold"
+
+# 环比增长率标记（原生列格式模式，大表格使用）
+GROWTH_POSITIVE_MARK = "🟢"
+GROWTH_NEGATIVE_MARK = "🔴"
+
+# 环比增长率默认显示格式（printf 风格）
+GROWTH_FORMAT = "%.1f%%"
+
+# 金额列的原生列格式 - printf 风格不支持千分位分隔，使用 Streamlit 的 accounting 预设（千分位、两位小数），
+# 与页面中 '¥ {:,.2f}' 格式的金额一致；货币单位写在列标题中
+MONEY_COLUMN_FORMAT = "accounting"
+
+# 分页表格配置 - 行数超过每页行数时启用服务端分页、排序与筛选
+TABLE_PAGE_SIZE = 50
+
+# 排名柱状图配置 - 人数超过阈值时只显示前N名、后N名，中间合并为"其余(平均)"柱
+RANKING_MAX_BARS = 30
+RANKING_TOP_N = 15
+RANKING_BOTTOM_N = 5
+RANKING_OTHERS_COLOR = "#8E8E93"
+
+# 柱状图超过该数量时不再逐柱显示数值标签（改为悬停显示）
+BAR_TEXT_MAX_BARS = 60
+
+# 折线图配置 - 曲线数量超过上限时默认只显示合计值最大的若干条，可手动展开
+CHART_MAX_SERIES = 12
+# 曲线数量超过该值时使用 WebGL 渲染
+CHART_WEBGL_MIN_SERIES = 10
+
+# 趋势图降采样配置 - 每张图的数据点预算，超过预算时使用 LTTB 算法降采样
+TREND_POINT_BUDGETS = {
+    'overall_sales': 400,
+    'overall_payment': 400,
+    'overall_overdue': 400,
+    'employee_sales': 2000,
+    'employee_payment': 2000,
+    'employee_overdue': 2000,
+}
+DEFAULT_TREND_POINT_BUDGET = 1000
+
+# 月份数量超过该值时显示趋势图的时间范围选择
+TREND_VIEWPORT_MIN_MONTHS = 12
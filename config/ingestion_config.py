@@ -0,0 +1,89 @@
+"""
+数据导入配置文件
+定义上传文件解析队列的并发数、队列长度和资源限制
+"""
+
+# 并发解析数量环境变量 - Excel 解析主要在 Python 中执行并持有 GIL，
+# 默认只用1个工作线程，避免多个大文件同时解析拖慢其他用户的页面
+INGEST_WORKERS_ENV = "SAC_INGEST_WORKERS"
+DEFAULT_INGEST_WORKERS = 1
+
+# 等待解析的任务数上限，队列已满时拒绝新的上传
+INGEST_QUEUE_MAX = 8
+
+# 单个任务的解析时间上限（秒），在工作表之间检查
+INGEST_TIMEOUT_S = 180
+
+# 单个任务的内存上限（MB），提交时按文件大小估算；进程内解析且只有一个解析线程时，解析过程中还按进程常驻内存增长检查
+# （沙箱模式由子进程的 SANDBOX_MEMORY_LIMIT_MB 限制）
+INGEST_JOB_MEMORY_LIMIT_MB = 1536
+
+# 所有正在解析任务的估算内存总预算（MB），超出时后续任务排队等待
+INGEST_MEMORY_BUDGET_MB = 2048
+
+# xlsx 解析为 DataFrame 时的内存膨胀系数估算（内存占用约为文件大小的倍数）
+INGEST_MEMORY_FACTOR = 20
+
+# 页面轮询任务状态的间隔（秒）
+INGEST_POLL_INTERVAL = 0.25
+
+# 已完成任务在进程中保留的时间（秒），超时后清理
+INGEST_RESULT_TTL_S = 600
+
+# 解析模式环境变量：
+#   sandbox - 在资源受限的子进程中解析（需要 resource 模块，仅 Linux/macOS）
+#   inprocess - 在当前进程中解析
+#   auto（默认） - 支持时使用 sandbox，否则使用 inprocess
+PARSE_MODE_ENV = "SAC_PARSE_MODE"
+DEFAULT_PARSE_MODE = "auto"
+
+# 子进程地址空间上限（MB，RLIMIT_AS），包含 pandas/openpyxl 等库本身的占用
+SANDBOX_MEMORY_LIMIT_MB = 1536
+
+# 子进程 CPU 时间上限（秒，RLIMIT_CPU），墙钟超时使用 INGEST_TIMEOUT_S
+SANDBOX_CPU_LIMIT_S = 120
+
+# 预先启动解析子进程的开关环境变量 - 默认保持一个已导入解析库、等待请求的子进程（每个子进程只解析一个文件），
+# 省去每次上传启动解释器和导入 pandas/openpyxl 的时间；设置为 0 时每次解析再启动子进程
+SANDBOX_PREFORK_ENV = "SAC_SANDBOX_PREFORK"
+
+# 增量导入开关环境变量 - 同一月份的工作簿新增周数据时只读取新增的周列和月度汇总列，设置为 0 时总是完整解析
+INCREMENTAL_INGEST_ENV = "SAC_INCREMENTAL_INGEST"
+
+# 按周分列的工作表及其名称列（用于对齐新旧两个版本的行）
+WEEKLY_SHEET_KEYS = {
+    "销售回款数据统计": '员工姓名',
+    "部门销售回款统计": '部门',
+}
+
+# 修订对比 - 同一月份重新上传时界面中最多列出的修改单元格数（统计数量不受限制）
+REVISION_DIFF_CELL_LIMIT = 5000
+
+# 修订记录 - 会话中保留的最近上传修订记录条数
+REVISION_LOG_LIMIT = 20
+
+# 上传暂存目录环境变量 - 上传的文件在提交解析前写入该目录下的临时文件，解析器直接读取文件，
+# 不再复制内存中的上传内容；未设置时使用系统临时目录
+UPLOAD_SPOOL_DIR_ENV = "SAC_SPOOL_DIR"
+
+# 暂存文件名前缀（用于清理进程异常退出后残留的暂存文件）
+UPLOAD_SPOOL_PREFIX = "sac_upload_"
+
+# 残留暂存文件的保留时间（秒），超过后在下次暂存时删除
+UPLOAD_SPOOL_STALE_S = 24 * 3600
+
+# 数据目录环境变量 - 自动加载并监视该目录中的工作簿，默认为当前工作目录
+DATA_DIR_ENV = "SAC_DATA_DIR"
+DEFAULT_DATA_DIR = "."
+
+# 自动加载的工作簿文件名模式（有多个时使用最新放入的文件）
+DATA_FILE_PATTERN = "员工销售回款统计_*.xlsx"
+
+# 数据目录监视开关环境变量 - 设置为 0 时只在启动时自动加载一次，不在后台检查新文件
+DATA_WATCH_ENV = "SAC_DATA_WATCH"
+
+# 后台扫描数据目录的间隔（秒），页面也按该间隔检查是否有新发布的数据
+DATA_WATCH_INTERVAL_S = 10
+
+# 文件大小和修改时间保持不变的时间（秒）超过该值才开始解析，避免读取正在复制的文件
+DATA_WATCH_SETTLE_S = 2
@@ -156,4 +156,9 @@ DATA_REQUIREMENTS = {
     "overall_trends": [],  # 总体趋势需要历史数据（通过state_manager获取）
     "employee_details": [],  # 员工详情需要历史数据（通过state_manager获取）
     "department_details": []  # 部门详情需要历史数据（通过state_manager获取）
-} 
\ No newline at end of file
+} 
+# 页面预加载配置 - 主页渲染后在后台线程预先导入数据已就绪的页面模块
+WARMUP_ENABLED = True
+
+# 预加载时是否调用页面模块的 warm_up(data, versions) 预先计算缓存的聚合结果
+WARMUP_PRECOMPUTE = True
@@ -0,0 +1,30 @@
+"""
+会话快照配置文件
+定义会话快照的开关、存储目录、恢复令牌和需要保存的界面选择
+"""
+
+# 会话快照开关环境变量 - 默认关闭（快照把上传的业务数据写入服务器磁盘），设置为 1 时保存并恢复会话快照
+SNAPSHOT_ENV = "SAC_SESSION_SNAPSHOT"
+
+# 快照存储目录环境变量及默认目录（每个恢复令牌一个子目录）
+SNAPSHOT_DIR_ENV = "SAC_SNAPSHOT_DIR"
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+
+# 恢复令牌查询参数，如 ?session=<令牌>；刷新页面或重新连接后按令牌恢复数据
+SNAPSHOT_QUERY_PARAM = "session"
+
+# 快照保留时间（秒），超过后在下次保存时删除
+SNAPSHOT_TTL_S = 7 * 24 * 3600
+
+# 快照格式版本，格式变化时旧快照不再恢复
+SNAPSHOT_FORMAT_VERSION = 2
+
+# 数据表文件的 Parquet 压缩方式
+SNAPSHOT_COMPRESSION = "zstd"
+
+# 需要保存的页面状态
+SNAPSHOT_PAGE_KEYS = ['current_page', 'page_stack']
+
+# 需要保存的界面选择 - 按控件 key 正则匹配（趋势图时间范围、展开开关、数据表排序/筛选/页码）
+SNAPSHOT_WIDGET_KEY_PATTERNS = [r'_trend_range$', r'_expand', r'_sort_column$', r'_sort_desc$', r'_filter$',
+                                r'_table(_.+)?_page$']
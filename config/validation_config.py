@@ -0,0 +1,63 @@
+"""
+数据校验配置文件
+定义导入时各工作表的必需列、金额列、合计行和周度/月度汇总关系
+"""
+
+# 各工作表的必需列，缺少时为错误
+REQUIRED_COLUMNS = {
+    "员工积分数据": ['员工姓名', '队名', '个人总积分', '加权小组总分'],
+    "销售回款数据统计": ['员工姓名', '本月销售额', '本月回款合计'],
+    "部门销售回款统计": ['部门', '本月销售额'],
+    "销售回款超期账款排名": ['排名类型', '排名', '姓名', '金额'],
+}
+
+# 各工作表中不能重复的名称列（排名表在同一排名类型内不能重复）
+UNIQUE_COLUMNS = {
+    "员工积分数据": ['员工姓名'],
+    "销售回款数据统计": ['员工姓名'],
+    "部门销售回款统计": ['部门'],
+    "销售回款超期账款排名": ['排名类型', '姓名'],
+}
+
+# 合计行 - 工作表 -> 标记合计行的列，该列值为 TOTAL_ROW_LABEL 的行应等于其余行之和
+TOTAL_ROW_COLUMNS = {
+    "销售回款数据统计": '员工姓名',
+    "部门销售回款统计": '部门',
+}
+TOTAL_ROW_LABEL = '合计'
+
+# 金额列 - 按列名正则匹配，不能为负数，合计行按这些列核对
+AMOUNT_COLUMN_PATTERNS = [r'销售额$', r'回款额$', r'款$', r'回款合计$', r'逾期未收回额$', r'任务$', r'^金额$']
+
+# 周度/月度汇总关系 - 工作表 -> 月度列 -> 周度列模板，月度列应等于各周之和
+WEEKLY_SUM_COLUMNS = {
+    "销售回款数据统计": {
+        '本月销售额': '第{week}周销售额',
+        '本月回未超期款': '第{week}周回未超期款',
+        '本月回超期款': '第{week}周回超期款',
+        '本月回款合计': '第{week}周回款合计',
+    },
+    "部门销售回款统计": {
+        '本月销售额': '第{week}周销售额',
+        '本月回未超期款': '第{week}周回未超期款',
+        '本月回超期款': '第{week}周回超期款',
+    },
+}
+
+# 金额核对允许的误差（元），以及相对误差
+AMOUNT_TOLERANCE = 1.0
+AMOUNT_RELATIVE_TOLERANCE = 1e-6
+
+# 每个问题最多记录的行号数
+ISSUE_ROW_LIMIT = 10
+
+# 校验项名称
+CHECK_LABELS = {
+    "required_columns": "必需列",
+    "missing_values": "数据完整性",
+    "numeric_type": "数值类型",
+    "negative_amount": "负数金额",
+    "duplicate_name": "名称重复",
+    "total_row": "合计行",
+    "weekly_sum": "周度汇总",
+}
@@ -0,0 +1,226 @@
+"""
+数据目录监视
+后台线程定期扫描数据目录中的工作簿，发现新放入或被修改的文件后在后台解析一次，
+并原子地发布为新的数据集版本；使用自动加载数据的会话随后切换到新版本，无需任何人重新上传
+"""
+
+import glob
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Any, Tuple
+
+import streamlit as st
+
+from config.ingestion_config import (
+    DATA_DIR_ENV, DEFAULT_DATA_DIR, DATA_FILE_PATTERN, DATA_WATCH_ENV, DATA_WATCH_INTERVAL_S,
+    DATA_WATCH_SETTLE_S, INGEST_TIMEOUT_S
+)
+from core.state_manager import state_manager
+from utils.sandbox_parser import sandbox_parser
+
+logger = logging.getLogger(__name__)
+
+DATA_KEYS = ['score_df', 'sales_df', 'department_sales_df', 'ranking_df']
+
+# 已发布数据集的版本前缀，会话中的数据版本以此开头表示数据来自数据目录
+WATCH_VERSION_PREFIX = "watch-"
+
+
+class DataWatcher:
+    """数据目录监视器类（进程内共享一个后台线程）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._worker = None
+        self._published: Optional[Dict[str, Any]] = None
+        self._pending: Optional[Tuple[tuple, float]] = None
+        self._failed_signature: Optional[tuple] = None
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """是否在后台监视数据目录"""
+        return os.environ.get(DATA_WATCH_ENV, '1') != '0'
+
+    @staticmethod
+    def get_data_dir() -> str:
+        """获取数据目录"""
+        return os.environ.get(DATA_DIR_ENV, DEFAULT_DATA_DIR)
+
+    @staticmethod
+    def find_latest() -> Optional[Tuple[str, tuple]]:
+        """
+        查找数据目录中最新放入的工作簿（按 ctime，与原有的自动检测一致）
+
+        Returns:
+            (文件路径, 文件签名 (绝对路径, 大小, 修改时间, 状态变更时间))；没有工作簿时返回None
+        """
+        candidates = []
+        for path in glob.glob(os.path.join(DataWatcher.get_data_dir(), DATA_FILE_PATTERN)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            candidates.append((stat.st_ctime_ns, path, stat))
+        if not candidates:
+            return None
+        _, path, stat = max(candidates)
+        return path, (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+
+    def get_latest(self) -> Optional[Dict[str, Any]]:
+        """
+        获取最新发布的数据集
+
+        Returns:
+            {'version', 'file_name', 'path', 'signature', 'frames': {数据键: 数据表}, 'published_at'}；
+            尚未发布时返回None
+        """
+        with self._lock:
+            return self._published
+
+    def _load(self, path: str, signature: tuple) -> bool:
+        """解析工作簿并发布为新版本，解析失败的文件在修改前不再重试"""
+        result = sandbox_parser.load_excel_data(path, timeout=INGEST_TIMEOUT_S)
+        if result[4]:
+            self._failed_signature = signature
+            self.last_error = f"{os.path.basename(path)}: {result[4]}"
+            logger.warning("数据目录中的文件解析失败: %s", self.last_error)
+            return False
+
+        dataset = {
+            'version': f"{WATCH_VERSION_PREFIX}{uuid.uuid4().hex}",
+            'file_name': os.path.basename(path),
+            'path': path,
+            'signature': signature,
+            'frames': dict(zip(DATA_KEYS, result[:4])),
+            'published_at': time.time(),
+        }
+        # 整体替换引用，会话读取到的总是同一版本的完整数据
+        with self._lock:
+            self._published = dataset
+        self._failed_signature = None
+        self.last_error = None
+        return True
+
+    def check(self, settle: bool = True) -> bool:
+        """
+        扫描一次数据目录，发现新的或被修改的工作簿时解析并发布
+
+        Args:
+            settle: 是否等待文件稳定（两次扫描之间大小和修改时间不变且超过 DATA_WATCH_SETTLE_S）
+
+        Returns:
+            是否发布了新版本
+        """
+        with self._load_lock:
+            latest = self.find_latest()
+            if latest is None:
+                self._pending = None
+                return False
+            path, signature = latest
+            published = self.get_latest()
+            if (published is not None and published['signature'] == signature) or signature == self._failed_signature:
+                self._pending = None
+                return False
+
+            # 正在复制的文件大小和修改时间还在变化，保持不变一段时间后再解析
+            if settle:
+                if self._pending is None or self._pending[0] != signature:
+                    self._pending = (signature, time.time())
+                    return False
+                if time.time() - self._pending[1] < DATA_WATCH_SETTLE_S:
+                    return False
+            self._pending = None
+            return self._load(path, signature)
+
+    def ensure_started(self, initial_load: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        启动数据目录监视（每次页面运行时调用）
+
+        尚未发布任何版本时在当前运行中同步加载一次（与原有的自动加载一致），之后由后台线程检查更新。
+
+        Args:
+            initial_load: 尚未发布版本时是否同步加载；已有数据（如上传了文件）的会话传入 False，
+                不在该会话的页面运行中扫描目录和解析文件，只由后台线程扫描
+
+        Returns:
+            最新发布的数据集，没有时返回None
+        """
+        if initial_load and self.get_latest() is None:
+            self.check(settle=False)
+
+        if self.is_enabled():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._worker_loop, name="data-watcher", daemon=True)
+                    self._worker.start()
+        return self.get_latest()
+
+    def _worker_loop(self):
+        """后台线程：定期扫描数据目录"""
+        while True:
+            time.sleep(DATA_WATCH_INTERVAL_S)
+            try:
+                self.check()
+            except Exception as e:
+                logger.warning("扫描数据目录出错: %s", e)
+
+    @staticmethod
+    def get_adopted_version() -> Optional[str]:
+        """
+        获取当前会话使用的数据目录数据集版本
+
+        Returns:
+            数据集版本；会话中的数据不是（或不全是）来自数据目录时返回None（如用户上传了文件）
+        """
+        versions = {state_manager.get_data_version(key).split(':')[0] for key in DATA_KEYS}
+        if len(versions) != 1:
+            return None
+        version = versions.pop()
+        return version if version.startswith(WATCH_VERSION_PREFIX) else None
+
+    @staticmethod
+    def should_adopt(dataset: Dict[str, Any]) -> bool:
+        """当前会话是否应切换到该数据集：尚未加载任何数据，或正在使用数据目录中较早的版本"""
+        if not state_manager.is_data_loaded():
+            return state_manager.get_file_name() is None
+        adopted = DataWatcher.get_adopted_version()
+        return adopted is not None and adopted != dataset['version']
+
+    @staticmethod
+    def adopt(dataset: Dict[str, Any]):
+        """
+        将数据集写入当前会话
+
+        所有会话使用同一版本时数据版本相同，按数据版本缓存的聚合结果在会话之间共享。
+        """
+        for key in DATA_KEYS:
+            state_manager.set_data(key, dataset['frames'][key])
+            state_manager.set_data_version(key, f"{dataset['version']}:{key}")
+        state_manager.set_file_name(dataset['file_name'])
+
+    def render_update_check(self):
+        """
+        在页面中定期检查新发布的数据（Streamlit 支持 st.fragment 时每 DATA_WATCH_INTERVAL_S 秒运行一次），
+        当前会话使用数据目录中的数据且有新版本时重新运行整个页面；不支持时在下次操作页面时切换
+        """
+        fragment = getattr(st, 'fragment', None)
+        if fragment is None or not self.is_enabled():
+            return
+        fragment(run_every=DATA_WATCH_INTERVAL_S)(_poll_data_updates)()
+
+
+def _poll_data_updates():
+    """定时片段：有新发布的数据且当前会话在使用数据目录中的数据时重新运行页面"""
+    dataset = data_watcher.get_latest()
+    adopted = DataWatcher.get_adopted_version()
+    if dataset is not None and adopted is not None and adopted != dataset['version']:
+        st.rerun(scope="app")
+
+
+# 全局数据目录监视器实例
+data_watcher = DataWatcher()
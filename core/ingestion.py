@@ -0,0 +1,368 @@
+"""
+数据导入调度器
+进程内共享的上传文件解析队列：限制并发解析数量，显示排队位置和进度，
+对每个任务施加时间和内存限制，并取消已关闭会话的任务
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Optional, Dict, Any, Tuple, Callable
+
+import streamlit as st
+
+from config.ingestion_config import (
+    INGEST_WORKERS_ENV, DEFAULT_INGEST_WORKERS, INGEST_QUEUE_MAX, INGEST_TIMEOUT_S,
+    INGEST_JOB_MEMORY_LIMIT_MB, INGEST_MEMORY_BUDGET_MB, INGEST_MEMORY_FACTOR,
+    INGEST_POLL_INTERVAL, INGEST_RESULT_TTL_S
+)
+from core.instrumentation import instrumentation
+from utils.sandbox_parser import sandbox_parser
+from utils.upload_spool import upload_spool
+
+# 任务状态
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = {STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED}
+
+
+class IngestionAborted(Exception):
+    """解析任务被中止（超时、超出内存或会话已关闭）"""
+
+
+def get_rss_mb() -> float:
+    """获取当前进程的常驻内存（MB），无法获取时返回0"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+def get_session_id() -> Optional[str]:
+    """获取当前会话标识（不在 Streamlit 运行环境中时返回None）"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+
+def is_session_active(session_id: Optional[str]) -> bool:
+    """检查会话是否仍然连接（无法判断时视为仍然连接）"""
+    if session_id is None:
+        return True
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return True
+        return Runtime.instance().is_active_session(session_id)
+    except Exception:
+        return True
+
+
+class IngestionJob:
+    """单个文件解析任务"""
+
+    def __init__(self, file_obj, file_name: str, file_size: int, session_id: Optional[str],
+                 loader: Optional[Callable] = None):
+        self.job_id = uuid.uuid4().hex
+        self.file_obj = file_obj
+        self.spool_path: Optional[str] = None
+        self.loader = loader
+        self.file_name = file_name
+        self.file_size = file_size
+        self.session_id = session_id
+        self.estimated_mb = file_size / 1024 / 1024 * INGEST_MEMORY_FACTOR
+        self.status = STATUS_QUEUED
+        self.progress = 0.0
+        self.message = "排队中"
+        self.result: Optional[Tuple] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+class IngestionScheduler:
+    """数据导入调度器类（进程内共享）"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: int = INGEST_QUEUE_MAX):
+        if max_workers is None:
+            try:
+                max_workers = int(os.environ.get(INGEST_WORKERS_ENV, DEFAULT_INGEST_WORKERS))
+            except ValueError:
+                max_workers = DEFAULT_INGEST_WORKERS
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self._condition = threading.Condition()
+        self._pending: deque = deque()
+        self._running: Dict[str, IngestionJob] = {}
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._workers = []
+
+    def submit(self, file_obj, file_name: str, file_size: int,
+               loader: Optional[Callable] = None) -> Tuple[Optional[IngestionJob], Optional[str]]:
+        """
+        提交解析任务
+
+        上传的文件对象先写入暂存文件，任务只持有暂存文件路径，解析器按路径读取，任务结束后删除暂存文件。
+
+        Args:
+            file_obj: 文件路径或上传的文件对象
+            file_name: 文件名
+            file_size: 文件大小（字节）
+            loader: 自定义加载函数 loader(file_obj, progress_callback, stats, timeout)，返回None时改为完整解析（如增量导入）；
+                stats 为解析统计字典（见 SandboxParser.load_excel_data），timeout 为任务剩余的墙钟时间（秒）
+
+        Returns:
+            (job, error_message) - 被拒绝时 job 为None
+        """
+        job = IngestionJob(file_obj, file_name, file_size, get_session_id(), loader)
+        if job.estimated_mb > INGEST_JOB_MEMORY_LIMIT_MB:
+            return None, f"文件过大，预计解析需要约 {job.estimated_mb:.0f} MB 内存，超出单个文件上限 {INGEST_JOB_MEMORY_LIMIT_MB} MB"
+
+        if not isinstance(file_obj, (str, os.PathLike)):
+            try:
+                job.spool_path = upload_spool.spool(file_obj)
+            except OSError as e:
+                return None, f"暂存上传文件失败: {e}"
+            job.file_obj = job.spool_path
+
+        with self._condition:
+            self._cleanup_finished()
+            if len(self._pending) >= self.max_queue:
+                upload_spool.release(job.spool_path)
+                return None, f"当前上传排队人数过多（{len(self._pending)} 个文件等待中），请稍后再试"
+            self._pending.append(job)
+            self._jobs[job.job_id] = job
+            self._ensure_workers()
+            self._condition.notify_all()
+        return job, None
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """按任务标识获取任务"""
+        return self._jobs.get(job_id)
+
+    def get_position(self, job: IngestionJob) -> int:
+        """获取任务的排队位置（从1开始，未在排队时返回0）"""
+        with self._condition:
+            for index, pending in enumerate(self._pending):
+                if pending is job:
+                    return index + 1
+        return 0
+
+    def cancel(self, job: IngestionJob):
+        """取消任务（排队中的任务立即移除，正在解析的任务在下一个工作表前中止）"""
+        with self._condition:
+            job.cancel_requested = True
+            if job.status == STATUS_QUEUED and job in self._pending:
+                self._pending.remove(job)
+                self._finish(job, STATUS_CANCELLED, "已取消")
+            self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取队列状态"""
+        with self._condition:
+            return {
+                'workers': self.max_workers,
+                'running': len(self._running),
+                'queued': len(self._pending),
+                'running_memory_mb': round(sum(job.estimated_mb for job in self._running.values()), 1)
+            }
+
+    def _ensure_workers(self):
+        """启动工作线程（调用时需持有锁）"""
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._worker_loop, name=f"ingestion-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _next_job(self) -> IngestionJob:
+        """取出下一个可执行的任务：跳过已关闭会话的任务，内存预算不足时等待"""
+        with self._condition:
+            while True:
+                for job in list(self._pending):
+                    if not is_session_active(job.session_id):
+                        self._pending.remove(job)
+                        self._finish(job, STATUS_CANCELLED, "会话已关闭，任务已取消")
+
+                if self._pending:
+                    job = self._pending[0]
+                    running_mb = sum(item.estimated_mb for item in self._running.values())
+                    if not self._running or running_mb + job.estimated_mb <= INGEST_MEMORY_BUDGET_MB:
+                        self._pending.popleft()
+                        job.status = STATUS_RUNNING
+                        job.started_at = time.time()
+                        job.message = "开始解析"
+                        self._running[job.job_id] = job
+                        return job
+                self._condition.wait(timeout=1.0)
+
+    def _worker_loop(self):
+        """工作线程：依次执行任务"""
+        while True:
+            job = self._next_job()
+            try:
+                self._run_job(job)
+            finally:
+                with self._condition:
+                    self._running.pop(job.job_id, None)
+                    self._condition.notify_all()
+
+    def _run_job(self, job: IngestionJob):
+        """
+        执行解析任务，在每个工作表之间检查取消、会话、时间和内存限制
+
+        内存限制（INGEST_JOB_MEMORY_LIMIT_MB）按本进程常驻内存的增长检查，只在进程内解析且只有一个解析线程时生效：
+        沙箱模式下解析在子进程中进行，由子进程的 RLIMIT_AS 限制内存；多个解析线程并发时，
+        本进程的内存增长无法区分属于哪个任务，按其检查会因其他任务或会话占用内存而误判小文件超限。
+
+        解析的峰值内存记录到性能埋点（ingestion.parse 片段的 peak_rss_mb 标签）：沙箱模式为子进程的峰值常驻内存，
+        进程内解析为各工作表之间采样到的本进程常驻内存最大值。
+        """
+        rss_start = get_rss_mb()
+        rss_peak = {'value': rss_start}
+        abort_reason = {}
+        check_rss = sandbox_parser.get_mode() == 'inprocess' and self.max_workers == 1
+
+        def on_progress(progress: float, message: str):
+            job.progress = progress
+            job.message = message
+            rss = get_rss_mb()
+            rss_peak['value'] = max(rss_peak['value'], rss)
+            reason = None
+            if job.cancel_requested:
+                reason = (STATUS_CANCELLED, "已取消")
+            elif not is_session_active(job.session_id):
+                reason = (STATUS_CANCELLED, "会话已关闭，任务已取消")
+            elif time.time() - job.started_at > INGEST_TIMEOUT_S:
+                reason = (STATUS_FAILED, f"解析超时（超过 {INGEST_TIMEOUT_S} 秒）")
+            elif check_rss and rss_start and rss - rss_start > INGEST_JOB_MEMORY_LIMIT_MB:
+                reason = (STATUS_FAILED, f"解析占用内存超过 {INGEST_JOB_MEMORY_LIMIT_MB} MB")
+            if reason:
+                abort_reason['value'] = reason
+                raise IngestionAborted(reason[1])
+
+        stats = {}
+        with instrumentation.span('ingestion.parse', file_name=job.file_name,
+                                  file_size_mb=round(job.file_size / 1024 / 1024, 2)) as tags:
+            try:
+                result = None
+                if job.loader is not None:
+                    result = job.loader(job.file_obj, on_progress, stats, self._remaining_time(job))
+                    if result is not None:
+                        stats['mode'] = 'incremental'
+                if result is None:
+                    stats.clear()
+                    if hasattr(job.file_obj, 'seek'):
+                        job.file_obj.seek(0)
+                    # 沙箱模式下子进程另有硬性的内存、CPU和墙钟限制
+                    result = sandbox_parser.load_excel_data(job.file_obj, progress_callback=on_progress,
+                                                            timeout=self._remaining_time(job), stats=stats)
+            except Exception as e:
+                result = (None, None, None, None, f"读取文件时出错: {e}")
+
+            rss_end = get_rss_mb()
+            if 'peak_rss_mb' not in stats:
+                stats['peak_rss_mb'] = round(max(rss_peak['value'], rss_end), 1)
+            tags.update(stats, spooled=job.spool_path is not None,
+                        rss_growth_mb=round(rss_end - rss_start, 1))
+
+        with self._condition:
+            if 'value' in abort_reason:
+                status, message = abort_reason['value']
+                job.error = message
+                self._finish(job, status, message)
+            elif result[4]:
+                job.error = result[4]
+                self._finish(job, STATUS_FAILED, "加载失败")
+            else:
+                job.result = result
+                self._finish(job, STATUS_DONE, "加载完成")
+
+    @staticmethod
+    def _remaining_time(job: IngestionJob) -> float:
+        """任务剩余的墙钟时间（秒，至少 1 秒，超时由进度回调判定）"""
+        return max(1.0, INGEST_TIMEOUT_S - (time.time() - job.started_at))
+
+    def _finish(self, job: IngestionJob, status: str, message: str):
+        """标记任务结束，释放文件对象并删除暂存文件（调用时需持有锁）"""
+        job.status = status
+        job.message = message
+        job.finished_at = time.time()
+        job.file_obj = None
+        job.loader = None
+        upload_spool.release(job.spool_path)
+        job.spool_path = None
+        if status == STATUS_DONE:
+            job.progress = 1.0
+
+    def _cleanup_finished(self):
+        """清理过期的已完成任务（调用时需持有锁）"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > INGEST_RESULT_TTL_S]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def load_with_progress(self, uploaded_file, key: str, loader: Optional[Callable] = None) -> Tuple:
+        """
+        通过解析队列加载上传的文件，并在页面中显示排队位置和进度
+
+        任务与会话中的文件标识绑定，页面重新运行时复用已提交或已完成的任务，不会重复解析。
+
+        Args:
+            uploaded_file: 上传的文件对象
+            key: 会话中保存任务标识的键
+            loader: 自定义加载函数（见 submit），只在提交新任务时使用
+
+        Returns:
+            (score_df, sales_df, department_sales_df, ranking_df, error_message)
+        """
+        file_token = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
+        state_key = f"{key}_ingestion"
+        saved = st.session_state.get(state_key)
+        job = self.get_job(saved['job_id']) if saved and saved['file_token'] == file_token else None
+
+        # 上一次任务被取消（如会话重连）时重新提交
+        if job is None or job.status == STATUS_CANCELLED:
+            job, error = self.submit(uploaded_file, uploaded_file.name, uploaded_file.size, loader)
+            if job is None:
+                st.session_state.pop(state_key, None)
+                return None, None, None, None, error
+            st.session_state[state_key] = {'job_id': job.job_id, 'file_token': file_token}
+
+        if not job.finished:
+            status_placeholder = st.empty()
+            progress_bar = st.progress(0.0)
+            while not job.finished:
+                position = self.get_position(job)
+                if job.status == STATUS_QUEUED:
+                    status_placeholder.info(f"⏳ {uploaded_file.name} 排队中，前面还有 {max(0, position - 1)} 个文件")
+                else:
+                    status_placeholder.info(f"📥 正在加载 {uploaded_file.name}：{job.message}")
+                progress_bar.progress(min(1.0, job.progress))
+                time.sleep(INGEST_POLL_INTERVAL)
+            status_placeholder.empty()
+            progress_bar.empty()
+
+        if job.status == STATUS_DONE:
+            return job.result
+        return None, None, None, None, job.error or job.message
+
+
+# 全局数据导入调度器实例
+ingestion_scheduler = IngestionScheduler()
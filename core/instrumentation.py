@@ -0,0 +1,232 @@
+"""
+性能埋点
+记录每个代码片段的耗时、CPU时间和内存分配，按页面和数据规模归类
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Callable
+
+import pandas as pd
+import streamlit as st
+
+from config.diagnostics_config import PERF_LOG_ENV, PERF_MAX_RECORDS, TRACEMALLOC_MAX_SPANS
+
+DATA_KEYS = ['score_df', 'sales_df', 'department_sales_df', 'ranking_df']
+
+
+class Instrumentation:
+    """性能埋点类"""
+    
+    def __init__(self, max_records: int = PERF_MAX_RECORDS):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._log_path = os.environ.get(PERF_LOG_ENV)
+        self._tracing_budget: Optional[int] = None
+    
+    @staticmethod
+    def _has_session() -> bool:
+        """当前线程是否在页面脚本中运行（后台线程如解析队列没有会话）"""
+        try:
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            return get_script_run_ctx(suppress_warning=True) is not None
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _get_route() -> Optional[str]:
+        """获取当前页面路由"""
+        if not Instrumentation._has_session():
+            return None
+        try:
+            return st.session_state.get('current_page')
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _get_dataset_rows() -> int:
+        """获取当前会话已加载数据的总行数（包含历史数据）"""
+        if not Instrumentation._has_session():
+            return 0
+        try:
+            rows = 0
+            for key in DATA_KEYS:
+                data = st.session_state.get(key)
+                if data is not None:
+                    rows += len(data)
+            for file_info in st.session_state.get('history_files', {}).values():
+                for key in ('sales_df', 'department_sales_df'):
+                    data = file_info.get(key)
+                    if data is not None:
+                        rows += len(data)
+            return rows
+        except Exception:
+            return 0
+    
+    def _get_stack(self) -> List[str]:
+        """获取当前线程的片段调用栈"""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+    
+    @contextmanager
+    def span(self, name: str, **tags):
+        """
+        记录一个代码片段的性能数据
+        
+        Args:
+            name: 片段名称
+            **tags: 附加标签（如文件名、数据量）
+            
+        Yields:
+            标签字典，片段执行过程中得到的测量值（如峰值内存）可补充到其中
+            
+        记录内容：墙钟时间、线程CPU时间、净内存分配（仅在 tracemalloc 启用时）、
+        当前页面、已加载数据行数、父片段和嵌套深度
+        """
+        stack = self._get_stack()
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        
+        tracing = tracemalloc.is_tracing()
+        mem_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        error = None
+        try:
+            yield tags
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+            alloc_kb = (tracemalloc.get_traced_memory()[0] - mem_before) / 1024 if tracing else None
+            stack.pop()
+            
+            record = {
+                'timestamp': time.time(),
+                'span': name,
+                'parent': parent,
+                'depth': len(stack),
+                'route': self._get_route(),
+                'dataset_rows': self._get_dataset_rows(),
+                'wall_ms': round(wall_ms, 3),
+                'cpu_ms': round(cpu_ms, 3),
+                'alloc_kb': round(alloc_kb, 1) if alloc_kb is not None else None,
+                'error': error
+            }
+            if tags:
+                record['tags'] = tags
+            self._add_record(record)
+            if tracing:
+                self._consume_tracing_budget()
+    
+    def instrument(self, name: Optional[str] = None) -> Callable:
+        """
+        函数埋点装饰器
+        
+        Args:
+            name: 片段名称（默认使用 模块.函数名）
+        """
+        def decorator(func):
+            span_name = name or f"{func.__module__}.{func.__qualname__}"
+            
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def start_tracing(self, max_spans: int = TRACEMALLOC_MAX_SPANS):
+        """
+        启用内存追踪，记录 max_spans 个片段后自动停止
+        
+        tracemalloc 对整个进程生效：追踪期间所有会话都会变慢，所有片段都会记录内存分配。
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._tracing_budget = max_spans
+    
+    def stop_tracing(self):
+        """停止由 start_tracing 启用的内存追踪"""
+        with self._lock:
+            self._tracing_budget = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+    
+    def get_tracing_budget(self) -> Optional[int]:
+        """内存追踪自动停止前剩余的片段数，未通过 start_tracing 启用时返回None"""
+        return self._tracing_budget
+    
+    def _consume_tracing_budget(self):
+        """记录一个追踪中的片段，达到上限时停止内存追踪"""
+        with self._lock:
+            if self._tracing_budget is None:
+                return
+            self._tracing_budget -= 1
+            if self._tracing_budget <= 0:
+                self._tracing_budget = None
+                if tracemalloc.is_tracing():
+                    tracemalloc.stop()
+    
+    def _add_record(self, record: Dict[str, Any]):
+        """保存记录，配置了日志文件时同时写入 JSON Lines"""
+        with self._lock:
+            self._records.append(record)
+            if self._log_path:
+                try:
+                    with open(self._log_path, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                except OSError:
+                    # 日志写入失败不影响页面渲染
+                    self._log_path = None
+    
+    def get_records(self) -> List[Dict[str, Any]]:
+        """获取内存中的埋点记录"""
+        with self._lock:
+            return list(self._records)
+    
+    def clear(self):
+        """清空内存中的埋点记录"""
+        with self._lock:
+            self._records.clear()
+    
+    def summarize(self) -> pd.DataFrame:
+        """
+        按页面和片段汇总埋点记录
+        
+        Returns:
+            包含次数、耗时分位数、平均CPU时间、平均内存分配和最大数据行数的汇总表
+        """
+        records = self.get_records()
+        if not records:
+            return pd.DataFrame()
+        
+        df = pd.DataFrame(records)
+        df['route'] = df['route'].fillna('-')
+        grouped = df.groupby(['route', 'span'])
+        summary = grouped.agg(
+            次数=('wall_ms', 'size'),
+            耗时P50=('wall_ms', 'median'),
+            耗时P95=('wall_ms', lambda s: s.quantile(0.95)),
+            耗时最大=('wall_ms', 'max'),
+            CPU平均=('cpu_ms', 'mean'),
+            内存分配平均KB=('alloc_kb', 'mean'),
+            数据行数=('dataset_rows', 'max')
+        ).reset_index()
+        summary = summary.rename(columns={'route': '页面', 'span': '片段'})
+        return summary.sort_values('耗时P95', ascending=False).round(1).reset_index(drop=True)
+
+
+# 全局性能埋点实例
+instrumentation = Instrumentation()
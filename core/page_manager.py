@@ -7,6 +7,7 @@ import streamlit as st
 import importlib
 from typing import Optional, Dict, Any
 from config.menu_config import MENU_CONFIG, ROUTES, DATA_REQUIREMENTS
+from core.instrumentation import instrumentation
 
 
 class PageManager:
@@ -134,12 +135,15 @@ class PageManager:
     def render_current_page(self):
         """渲染当前页面"""
         current_page = self.get_current_page()
-        page_module = self.load_page(current_page)
         
-        if page_module and hasattr(page_module, 'show'):
-            page_module.show()
-        else:
-            st.error(f"页面 {current_page} 缺少 show() 函数")
+        with instrumentation.span('page_manager.render_current_page'):
+            page_module = self.load_page(current_page)
+            
+            if page_module and hasattr(page_module, 'show'):
+                with instrumentation.span(f"{current_page}.show"):
+                    page_module.show()
+            else:
+                st.error(f"页面 {current_page} 缺少 show() 函数")
     
     def _check_data_requirements(self, page_name: str) -> bool:
         """检查页面的数据要求是否满足"""
@@ -0,0 +1,185 @@
+"""
+性能剖析
+按需对单次重新运行进行 cProfile 和 tracemalloc 剖析，并保存报告
+"""
+
+import cProfile
+import hashlib
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from typing import Optional, Dict, Any, Callable, Set
+
+import streamlit as st
+
+from config.diagnostics_config import (
+    PROFILE_ENV, PROFILE_QUERY_PARAM, PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR,
+    PROFILE_TOP_N, PROFILE_TRACEMALLOC_FRAMES
+)
+from core.ingestion import get_session_id
+
+
+class Profiler:
+    """性能剖析类"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Set[str] = set()
+    
+    @staticmethod
+    def is_requested(is_admin: bool = False) -> bool:
+        """
+        检查本次重新运行是否需要剖析
+        
+        Args:
+            is_admin: 当前访问者是否为管理员（查询参数方式仅对管理员生效）
+        """
+        if os.environ.get(PROFILE_ENV) == "1":
+            return True
+        return is_admin and st.query_params.get(PROFILE_QUERY_PARAM) == "1"
+    
+    @staticmethod
+    def clear_request():
+        """清除剖析查询参数，只剖析请求的这一次重新运行，之后的运行不再剖析"""
+        if PROFILE_QUERY_PARAM in st.query_params:
+            del st.query_params[PROFILE_QUERY_PARAM]
+    
+    def track_session(self):
+        """登记当前会话（每次页面运行时调用），用于统计在线的其他会话"""
+        session_id = get_session_id()
+        if session_id is not None:
+            with self._lock:
+                self._sessions.add(session_id)
+    
+    def count_other_sessions(self) -> Optional[int]:
+        """
+        获取服务进程中除当前会话以外仍然连接的会话数
+        
+        按登记过的会话逐个通过 Runtime.is_active_session 检查，已断开的会话移出登记。
+        
+        Returns:
+            其他会话数；不在 Streamlit 服务中运行时为 0，无法判断时返回None
+        """
+        try:
+            from streamlit.runtime import Runtime
+            if not Runtime.exists():
+                return 0
+            runtime = Runtime.instance()
+            with self._lock:
+                self._sessions = {session_id for session_id in self._sessions
+                                  if runtime.is_active_session(session_id)}
+                return len(self._sessions - {get_session_id()})
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _get_dataset_version() -> str:
+        """根据会话中各数据的版本生成简短的数据集版本标识"""
+        versions = st.session_state.get('data_versions', {})
+        if not versions:
+            return "nodata"
+        content = "|".join(f"{key}={versions[key]}" for key in sorted(versions))
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()[:8]
+    
+    def run(self, func: Callable, top_n: int = PROFILE_TOP_N) -> Dict[str, Any]:
+        """
+        剖析一次函数调用并保存报告
+        
+        tracemalloc 对整个进程生效，有其他会话在线（或无法确认）时不追踪内存分配，避免拖慢其他用户的页面。
+        
+        Args:
+            func: 要剖析的函数（通常为一次完整的页面渲染）
+            top_n: 报告中的条目数
+            
+        Returns:
+            剖析结果摘要（耗时、报告路径、耗时最多的函数、内存分配最多的位置）
+        """
+        route = st.session_state.get('current_page', 'home')
+        
+        other_sessions = self.count_other_sessions()
+        started_tracing = not tracemalloc.is_tracing() and other_sessions == 0
+        if started_tracing:
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        
+        profile = cProfile.Profile()
+        wall_start = time.perf_counter()
+        try:
+            profile.runcall(func)
+        finally:
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            # 诊断面板启用的内存追踪可能在剖析期间自动停止
+            snapshot, peak_kb = None, 0.0
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            if started_tracing and tracemalloc.is_tracing():
+                tracemalloc.stop()
+        
+        # 报告文件名包含时间、页面和数据集版本
+        output_dir = os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+        os.makedirs(output_dir, exist_ok=True)
+        safe_route = re.sub(r'[^\w-]', '_', str(route))
+        prefix = os.path.join(
+            output_dir,
+            f"{time.strftime('%Y%m%d_%H%M%S')}_{safe_route}_{Profiler._get_dataset_version()}"
+        )
+        
+        stats_path = f"{prefix}.pstats"
+        profile.dump_stats(stats_path)
+        
+        stats_text = io.StringIO()
+        pstats.Stats(profile, stream=stats_text).sort_stats('cumulative').print_stats(top_n)
+        
+        alloc_lines = []
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            alloc_lines = [str(stat) for stat in snapshot.statistics('lineno')[:top_n]]
+        alloc_path = f"{prefix}_alloc.txt"
+        alloc_note = None
+        if snapshot is None:
+            if other_sessions is None:
+                alloc_note = "无法确认是否有其他会话在线，未追踪内存分配"
+            elif other_sessions:
+                alloc_note = f"有 {other_sessions} 个其他会话在线，未追踪内存分配"
+            else:
+                alloc_note = "未追踪内存分配"
+        with open(alloc_path, 'w', encoding='utf-8') as f:
+            f.write(f"route: {route}\npeak_kb: {peak_kb:.1f}\n\n")
+            f.write("\n".join(alloc_lines) or (alloc_note or "无"))
+        
+        return {
+            'route': route,
+            'wall_ms': wall_ms,
+            'peak_kb': peak_kb,
+            'stats_path': stats_path,
+            'alloc_path': alloc_path,
+            'stats_text': stats_text.getvalue(),
+            'alloc_lines': alloc_lines,
+            'alloc_note': alloc_note
+        }
+    
+    @staticmethod
+    def render_summary(result: Optional[Dict[str, Any]]):
+        """在页面中显示剖析结果摘要"""
+        if not result:
+            return
+        
+        with st.expander("🔬 性能剖析结果", expanded=True):
+            st.caption(f"页面 {result['route']} ｜ 耗时 {result['wall_ms']:.0f} ms ｜ "
+                       f"内存峰值 {result['peak_kb']:.0f} KB")
+            st.caption(f"报告已保存：{result['stats_path']}、{result['alloc_path']}")
+            st.markdown("#### 累计耗时最多的函数")
+            st.code(result['stats_text'], language=None)
+            st.markdown("#### 内存分配最多的位置")
+            st.code("\n".join(result['alloc_lines']) or result.get('alloc_note') or "无", language=None)
+
+
+# 全局性能剖析实例
+profiler = Profiler()
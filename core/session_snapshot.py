@@ -0,0 +1,391 @@
+"""
+会话快照
+刷新页面或连接断开会清空会话状态，需要重新上传并解析当月和全部历史文件。
+已加载的数据表、历史月份和界面选择保存为本地快照：每个数据表一个 Parquet 列式文件，外加一个 JSON 清单，
+以恢复令牌为目录名。令牌保存在页面地址的查询参数中，新会话按令牌直接读取数据表，不再解析 Excel。
+来自数据目录的数据（数据版本以 watch- 开头，进程内所有会话共享）不写入快照，只在清单中记录版本，恢复时从数据目录监视器重新取得
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import time
+from typing import Dict, Any, Optional
+
+import pandas as pd
+import streamlit as st
+
+from config.snapshot_config import (
+    SNAPSHOT_ENV, SNAPSHOT_DIR_ENV, DEFAULT_SNAPSHOT_DIR, SNAPSHOT_QUERY_PARAM, SNAPSHOT_TTL_S,
+    SNAPSHOT_FORMAT_VERSION, SNAPSHOT_COMPRESSION, SNAPSHOT_PAGE_KEYS, SNAPSHOT_WIDGET_KEY_PATTERNS
+)
+from core.data_watcher import data_watcher, WATCH_VERSION_PREFIX
+from core.state_manager import state_manager
+from utils.arrow_codec import ArrowCodec
+
+logger = logging.getLogger(__name__)
+
+DATA_KEYS = ['score_df', 'sales_df', 'department_sales_df', 'ranking_df']
+HISTORY_FRAME_KEYS = ['sales_df', 'department_sales_df']
+MANIFEST_NAME = 'manifest.json'
+TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+WIDGET_KEY_PATTERNS = [re.compile(pattern) for pattern in SNAPSHOT_WIDGET_KEY_PATTERNS]
+# 清单中来自数据目录的数据表条目（不写文件）
+DATA_DIR_SOURCE = 'data_dir'
+
+
+class SessionSnapshot:
+    """会话快照类"""
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """是否启用会话快照"""
+        return os.environ.get(SNAPSHOT_ENV, '0') == '1'
+
+    @staticmethod
+    def get_snapshot_dir() -> str:
+        """获取快照存储目录"""
+        return os.environ.get(SNAPSHOT_DIR_ENV, DEFAULT_SNAPSHOT_DIR)
+
+    @staticmethod
+    def new_token() -> str:
+        """生成新的恢复令牌（随机值，持有令牌即可恢复数据）"""
+        return secrets.token_urlsafe(16)
+
+    @staticmethod
+    def is_valid_token(token) -> bool:
+        """检查恢复令牌格式（防止通过查询参数访问快照目录以外的路径）"""
+        return isinstance(token, str) and bool(TOKEN_PATTERN.match(token))
+
+    @staticmethod
+    def _write_frame(df: pd.DataFrame, directory: str, name: str) -> Dict[str, Any]:
+        """
+        以 Parquet 列式格式写入数据表，同名文件已存在时（数据版本未变化）直接沿用
+
+        不使用 pickle（读回 pickle 会执行文件中携带的代码），混合类型的对象列按文本保存（见 utils.arrow_codec）；
+        df.attrs 中的导入元数据记录在清单中，无法以 JSON 保存的键单独跳过并记录警告。
+
+        Returns:
+            清单中的数据表条目 {'file', 'format', 'attrs'}
+        """
+        attrs = {}
+        for key, value in df.attrs.items():
+            try:
+                attrs[str(key)] = json.loads(json.dumps(value, ensure_ascii=False))
+            except (TypeError, ValueError) as e:
+                logger.warning("数据表 %s 的元数据 %r 无法保存到快照，已跳过: %s", name, key, e)
+
+        file_name = name + '.parquet'
+        path = os.path.join(directory, file_name)
+        if not os.path.exists(path):
+            import pyarrow.parquet as pq
+            # Parquet 中的 pandas 元数据同样只带可保存的 attrs
+            frame = df.copy(deep=False)
+            frame.attrs = attrs
+            pq.write_table(ArrowCodec.to_table(frame, preserve_index=True), path, compression=SNAPSHOT_COMPRESSION)
+        return {'file': file_name, 'format': 'parquet', 'attrs': attrs}
+
+    @staticmethod
+    def _read_frame(directory: str, entry: Optional[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+        """读取数据表并还原 df.attrs"""
+        if entry is None:
+            return None
+        if entry.get('format') != 'parquet':
+            raise ValueError(f"不支持的数据表格式: {entry.get('format')}")
+        import pyarrow.parquet as pq
+        df = pq.read_table(os.path.join(directory, entry['file'])).to_pandas()
+        df.attrs = entry.get('attrs', {})
+        return df
+
+    @staticmethod
+    def _history_file_prefix(month_key: str, file_info: Dict[str, Any], history_version: str) -> str:
+        """历史月份数据表的文件名前缀（按文件内容哈希，内容相同时沿用已写入的文件）"""
+        digest = file_info.get('content_hash') or hashlib.sha256(
+            f"{month_key}/{history_version}".encode('utf-8')).hexdigest()
+        return f"history_{digest[:16]}"
+
+    @staticmethod
+    def write(token: str, state: Dict[str, Any], snapshot_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        写入快照
+
+        数据表文件名包含数据版本，未变化的数据表不重复写入；来自数据目录的数据表只记录版本；
+        清单写入完成后删除不再引用的文件。
+
+        Args:
+            token: 恢复令牌
+            state: collect_state 收集的会话状态
+            snapshot_dir: 快照存储目录（默认按配置）
+
+        Returns:
+            快照清单
+        """
+        directory = os.path.join(snapshot_dir or SessionSnapshot.get_snapshot_dir(), token)
+        os.makedirs(directory, exist_ok=True)
+
+        def store(df: Optional[pd.DataFrame], name: str) -> Optional[Dict[str, Any]]:
+            return None if df is None else SessionSnapshot._write_frame(df, directory, name)
+
+        def store_data(key: str, df: Optional[pd.DataFrame], version: str) -> Optional[Dict[str, Any]]:
+            if df is not None and version.startswith(WATCH_VERSION_PREFIX):
+                return {'source': DATA_DIR_SOURCE}
+            return store(df, f"{key}_{version}")
+
+        history = {}
+        for month_key, file_info in state['history'].items():
+            prefix = SessionSnapshot._history_file_prefix(month_key, file_info, state['history_version'])
+            history[month_key] = {
+                'file_name': file_info.get('file_name'),
+                'content_hash': file_info.get('content_hash'),
+                'frames': {key: store(file_info.get(key), f"{prefix}_{key}") for key in HISTORY_FRAME_KEYS},
+            }
+
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'saved_at': time.time(),
+            'file_name': state['file_name'],
+            'data': {key: store_data(key, df, version) for key, (df, version) in state['data'].items()},
+            'data_versions': {key: version for key, (df, version) in state['data'].items()},
+            'history': history,
+            'history_version': state['history_version'],
+            'pages': state['pages'],
+            'widgets': state['widgets'],
+        }
+
+        # 先写临时文件再替换，恢复时不会读到写了一半的清单
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+        referenced = {entry['file'] for entry in manifest['data'].values() if entry and 'file' in entry}
+        referenced.update(entry['file'] for info in history.values() for entry in info['frames'].values() if entry)
+        for name in os.listdir(directory):
+            if name != MANIFEST_NAME and name not in referenced:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        return manifest
+
+    @staticmethod
+    def read(token: str, snapshot_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        读取快照
+
+        Returns:
+            与 collect_state 结构相同的会话状态（另有 saved_at，以及来自数据目录、数据表为None待重新取得的
+            数据键列表 data_dir_keys）；令牌无效、快照不存在、已过期或已损坏时返回None
+        """
+        if not SessionSnapshot.is_valid_token(token):
+            return None
+        directory = os.path.join(snapshot_dir or SessionSnapshot.get_snapshot_dir(), token)
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION \
+                    or time.time() - manifest['saved_at'] > SNAPSHOT_TTL_S:
+                return None
+            data_dir_keys = [key for key, entry in manifest['data'].items()
+                             if entry and entry.get('source') == DATA_DIR_SOURCE]
+            data = {
+                key: (None if key in data_dir_keys else SessionSnapshot._read_frame(directory, entry),
+                      manifest['data_versions'][key])
+                for key, entry in manifest['data'].items()
+            }
+            history = {
+                month_key: {
+                    'file_name': info['file_name'],
+                    'content_hash': info['content_hash'],
+                    **{key: SessionSnapshot._read_frame(directory, entry) for key, entry in info['frames'].items()},
+                }
+                for month_key, info in manifest['history'].items()
+            }
+        except Exception as e:
+            logger.warning("读取会话快照失败: %s", e)
+            return None
+
+        return {
+            'file_name': manifest['file_name'],
+            'data': data,
+            'history': history,
+            'history_version': manifest['history_version'],
+            'pages': manifest['pages'],
+            'widgets': manifest['widgets'],
+            'saved_at': manifest['saved_at'],
+            'data_dir_keys': data_dir_keys,
+        }
+
+    @staticmethod
+    def delete(token: str, snapshot_dir: Optional[str] = None):
+        """删除快照"""
+        if SessionSnapshot.is_valid_token(token):
+            shutil.rmtree(os.path.join(snapshot_dir or SessionSnapshot.get_snapshot_dir(), token), ignore_errors=True)
+
+    @staticmethod
+    def cleanup_expired(snapshot_dir: Optional[str] = None, max_age_s: float = SNAPSHOT_TTL_S) -> int:
+        """
+        删除超过保留时间的快照
+
+        Returns:
+            删除的快照数
+        """
+        snapshot_dir = snapshot_dir or SessionSnapshot.get_snapshot_dir()
+        if not os.path.isdir(snapshot_dir):
+            return 0
+        cutoff = time.time() - max_age_s
+        removed = 0
+        for token in os.listdir(snapshot_dir):
+            directory = os.path.join(snapshot_dir, token)
+            try:
+                if SessionSnapshot.is_valid_token(token) and os.path.getmtime(directory) < cutoff:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    @staticmethod
+    def collect_state() -> Dict[str, Any]:
+        """
+        收集需要保存的会话状态
+
+        Returns:
+            {
+                'file_name': 当前文件名, 'data': {数据键: (数据表, 数据版本)},
+                'history': {月份: {'file_name', 'content_hash', 'sales_df', 'department_sales_df'}},
+                'history_version': 历史数据版本, 'pages': 页面状态, 'widgets': 界面选择
+            }
+        """
+        widgets = {}
+        for key, value in st.session_state.items():
+            if not isinstance(key, str) or key in SNAPSHOT_PAGE_KEYS:
+                continue
+            if isinstance(value, (str, int, float, bool, list, tuple)) \
+                    and any(pattern.search(key) for pattern in WIDGET_KEY_PATTERNS):
+                widgets[key] = list(value) if isinstance(value, tuple) else value
+
+        return {
+            'file_name': state_manager.get_file_name(),
+            'data': {key: (state_manager.get_data(key), state_manager.get_data_version(key)) for key in DATA_KEYS},
+            'history': {
+                month_key: {key: file_info.get(key) for key in ('file_name', 'content_hash', *HISTORY_FRAME_KEYS)}
+                for month_key, file_info in state_manager.get_history_files().items()
+            },
+            'history_version': state_manager.get_data_version('history_files'),
+            'pages': {key: st.session_state.get(key) for key in SNAPSHOT_PAGE_KEYS},
+            'widgets': widgets,
+        }
+
+    @staticmethod
+    def _get_signature(state: Dict[str, Any]) -> str:
+        """会话状态签名：数据版本、文件名和界面选择都未变化时不需要重新保存"""
+        return json.dumps([
+            {key: version for key, (df, version) in state['data'].items()},
+            sorted(state['history']), state['history_version'], state['file_name'],
+            state['pages'], state['widgets'],
+        ], ensure_ascii=False, sort_keys=True, default=str)
+
+    @staticmethod
+    def apply_state(state: Dict[str, Any]):
+        """
+        将快照中的会话状态写入当前会话（沿用保存时的数据版本）
+
+        来自数据目录的数据表从数据目录监视器取得：保存时的版本仍是当前发布的版本时原样恢复；
+        全部数据都来自数据目录时切换到当前发布的版本（与会话继续运行时的行为一致）；否则这部分数据不恢复。
+        """
+        data_dir_keys = state.get('data_dir_keys', [])
+        dataset = data_watcher.ensure_started() if data_dir_keys else None
+        for key, (df, version) in state['data'].items():
+            if key in data_dir_keys:
+                if dataset is None or version.split(':')[0] != dataset['version']:
+                    continue
+                df = dataset['frames'][key]
+            state_manager.set_data(key, df)
+            state_manager.set_data_version(key, version)
+        for month_key, file_info in state['history'].items():
+            state_manager.add_history_file(month_key, file_info)
+        state_manager.set_data_version('history_files', state['history_version'])
+        state_manager.set_file_name(state['file_name'])
+        if dataset is not None and len(data_dir_keys) == len(DATA_KEYS):
+            data_watcher.adopt(dataset)
+
+        for key, value in state['pages'].items():
+            if value is not None:
+                st.session_state[key] = value
+        # JSON 中的列表还原为元组（如趋势图时间范围）
+        for key, value in state['widgets'].items():
+            st.session_state[key] = tuple(value) if isinstance(value, list) else value
+
+    @staticmethod
+    def restore_from_query() -> Optional[float]:
+        """
+        按页面地址中的恢复令牌恢复会话（每个会话只尝试一次，已有数据时不恢复）
+
+        Returns:
+            恢复耗时（毫秒）；没有可恢复的快照时返回None
+        """
+        if not SessionSnapshot.is_enabled() or st.session_state.get('snapshot_checked'):
+            return None
+        st.session_state.snapshot_checked = True
+
+        token = st.query_params.get(SNAPSHOT_QUERY_PARAM)
+        if not token or state_manager.is_data_loaded() or state_manager.get_history_files():
+            return None
+
+        start = time.perf_counter()
+        state = SessionSnapshot.read(token)
+        if state is None:
+            del st.query_params[SNAPSHOT_QUERY_PARAM]
+            return None
+        SessionSnapshot.apply_state(state)
+        st.session_state.snapshot_token = token
+        st.session_state.snapshot_signature = SessionSnapshot._get_signature(state)
+        return (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def save_if_changed():
+        """
+        会话状态变化时保存快照（在每次页面运行结束时调用）
+
+        首次保存时生成恢复令牌并写入页面地址；数据被清空时删除快照。
+        """
+        if not SessionSnapshot.is_enabled():
+            return
+
+        state = SessionSnapshot.collect_state()
+        token = st.session_state.get('snapshot_token')
+        has_data = any(df is not None for df, version in state['data'].values()) or bool(state['history'])
+        if not has_data:
+            if token:
+                SessionSnapshot.delete(token)
+                st.session_state.pop('snapshot_token', None)
+                st.session_state.pop('snapshot_signature', None)
+                if SNAPSHOT_QUERY_PARAM in st.query_params:
+                    del st.query_params[SNAPSHOT_QUERY_PARAM]
+            return
+
+        signature = SessionSnapshot._get_signature(state)
+        if signature == st.session_state.get('snapshot_signature'):
+            return
+
+        token = token or SessionSnapshot.new_token()
+        try:
+            SessionSnapshot.write(token, state)
+        except Exception as e:
+            # 快照保存失败不影响页面使用
+            logger.warning("保存会话快照失败: %s", e)
+            return
+        st.session_state.snapshot_token = token
+        st.session_state.snapshot_signature = signature
+        if st.query_params.get(SNAPSHOT_QUERY_PARAM) != token:
+            st.query_params[SNAPSHOT_QUERY_PARAM] = token
+        SessionSnapshot.cleanup_expired()
+
+
+# 全局会话快照实例
+session_snapshot = SessionSnapshot()
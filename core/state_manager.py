@@ -3,9 +3,12 @@
 集中管理应用状态和数据
 """
 
+import uuid
 import streamlit as st
 import pandas as pd
 from typing import Optional, Dict, Any
+from config.ingestion_config import REVISION_LOG_LIMIT
+from utils.validation import data_validator
 
 
 class StateManager:
@@ -36,6 +39,10 @@ class StateManager:
         # 历史数据状态
         if 'history_files' not in st.session_state:
             st.session_state.history_files = {}
+        
+        # 数据版本（数据变化时更新，用于缓存失效）
+        if 'data_versions' not in st.session_state:
+            st.session_state.data_versions = {}
     
     def _initialize_data_state(self):
         """初始化数据状态"""
@@ -51,6 +58,7 @@ class StateManager:
     def set_data(self, key: str, data: Any):
         """设置数据"""
         st.session_state[key] = data
+        self._bump_data_version(key)
         
         # 检查是否有任何数据被加载
         if key in ['score_df', 'sales_df', 'department_sales_df', 'ranking_df']:
@@ -74,6 +82,7 @@ class StateManager:
         
         for key in data_keys:
             st.session_state[key] = None
+            self._bump_data_version(key)
         
         st.session_state.data_loaded = False
         st.session_state.file_name = None
@@ -116,26 +125,82 @@ class StateManager:
         """设置当前文件名"""
         st.session_state.file_name = file_name
     
+    # 数据版本管理
+    def _bump_data_version(self, key: str):
+        """更新数据版本（使用全局唯一标识，跨会话共享的缓存不会冲突）"""
+        if 'data_versions' not in st.session_state:
+            st.session_state.data_versions = {}
+        st.session_state.data_versions[key] = uuid.uuid4().hex
+    
+    def get_data_version(self, key: str) -> str:
+        """获取数据版本，数据未变化时版本不变"""
+        if 'data_versions' not in st.session_state:
+            st.session_state.data_versions = {}
+        versions = st.session_state.data_versions
+        if key not in versions:
+            versions[key] = uuid.uuid4().hex
+        return versions[key]
+
+    def set_data_version(self, key: str, version: str):
+        """恢复会话快照时沿用保存时的数据版本（数据相同，按版本缓存的结果可以直接复用）"""
+        if 'data_versions' not in st.session_state:
+            st.session_state.data_versions = {}
+        st.session_state.data_versions[key] = version
+
     # 历史数据管理
     def add_history_file(self, month_key: str, file_info: Dict[str, Any]):
-        """添加历史数据文件"""
+        """添加历史数据文件（file_info 中的 content_hash 同时登记到 内容哈希 -> 月份 索引）"""
         if 'history_files' not in st.session_state:
             st.session_state.history_files = {}
         
+        self._unindex_history_month(month_key)
         st.session_state.history_files[month_key] = file_info
+        if file_info.get('content_hash'):
+            self._get_history_hash_index()[file_info['content_hash']] = month_key
+        self._bump_data_version('history_files')
     
     def get_history_files(self) -> Dict[str, Any]:
         """获取历史数据文件"""
         return st.session_state.get('history_files', {})
     
+    def find_history_by_hash(self, content_hash: str) -> Optional[str]:
+        """按文件内容哈希查找已加载的历史月份，未加载时返回None"""
+        return self._get_history_hash_index().get(content_hash)
+    
+    def _get_history_hash_index(self) -> Dict[str, str]:
+        """内容哈希 -> 月份 索引"""
+        if 'history_hash_index' not in st.session_state:
+            st.session_state.history_hash_index = {}
+        return st.session_state.history_hash_index
+    
+    def _unindex_history_month(self, month_key: str):
+        """从内容哈希索引中移除某个月份"""
+        index = self._get_history_hash_index()
+        for content_hash in [h for h, month in index.items() if month == month_key]:
+            del index[content_hash]
+    
     def remove_history_file(self, month_key: str):
         """删除历史数据文件"""
         if 'history_files' in st.session_state and month_key in st.session_state.history_files:
             del st.session_state.history_files[month_key]
+            self._unindex_history_month(month_key)
+            self._bump_data_version('history_files')
     
     def clear_history_files(self):
         """清空所有历史数据"""
         st.session_state.history_files = {}
+        st.session_state.history_hash_index = {}
+        self._bump_data_version('history_files')
+    
+    # 修订记录（同一月份重新上传时的变化摘要）
+    def add_revision_record(self, record: Dict[str, Any]):
+        """添加修订记录，只保留最近 REVISION_LOG_LIMIT 条"""
+        log = st.session_state.get('revision_log', [])
+        st.session_state.revision_log = (log + [record])[-REVISION_LOG_LIMIT:]
+    
+    def get_revision_log(self) -> list:
+        """获取修订记录（按时间顺序）"""
+        return st.session_state.get('revision_log', [])
     
     # 页面状态管理
     def set_current_page(self, page_name: str):
@@ -167,31 +232,27 @@ class StateManager:
         return 'home'
     
     # 数据验证方法
-    def validate_score_data(self, df: pd.DataFrame) -> tuple[bool, str]:
-        """验证积分数据"""
+    def _validate_sheet(self, df: pd.DataFrame, sheet_name: str) -> tuple[bool, str]:
+        """按数据校验引擎校验工作表，存在错误时返回 False 和错误说明"""
         if df is None or df.empty:
             return False, "数据为空"
         
-        required_columns = ['员工姓名', '队名', '个人总积分', '加权小组总分']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            return False, f"缺少必要列: {', '.join(missing_columns)}"
+        issues = df.attrs.get('validation_issues')
+        if issues is None:
+            issues = data_validator.validate_sheet(df, sheet_name)
+        errors = [issue['message'] for issue in issues if issue['severity'] == 'error']
+        if errors:
+            return False, "；".join(errors)
         
         return True, "数据验证通过"
     
+    def validate_score_data(self, df: pd.DataFrame) -> tuple[bool, str]:
+        """验证积分数据"""
+        return self._validate_sheet(df, '员工积分数据')
+    
     def validate_sales_data(self, df: pd.DataFrame) -> tuple[bool, str]:
         """验证销售数据"""
-        if df is None or df.empty:
-            return False, "数据为空"
-        
-        required_columns = ['员工姓名', '本月销售额', '本月回款合计']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            return False, f"缺少必要列: {', '.join(missing_columns)}"
-        
-        return True, "数据验证通过"
+        return self._validate_sheet(df, '销售回款数据统计')
     
     # 数据统计方法
     def get_data_summary(self) -> Dict[str, Any]:
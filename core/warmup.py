@@ -0,0 +1,147 @@
+"""
+页面预加载
+主页渲染完成后，在后台线程预先导入数据已就绪的页面模块、加载其延迟导入的绘图库，
+并可调用页面的 warm_up 钩子预先计算缓存的聚合结果，使首次进入页面时无需等待
+"""
+
+import importlib
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Any, List
+
+import streamlit as st
+
+from config.menu_config import ROUTES, DATA_REQUIREMENTS, WARMUP_ENABLED, WARMUP_PRECOMPUTE
+from core.page_manager import page_manager
+from core.state_manager import state_manager
+from utils.lazy_import import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# 不需要预加载的页面（主页已加载）
+WARMUP_EXCLUDED_ROUTES = {"home"}
+
+
+class WarmupScheduler:
+    """页面预加载调度器（进程内共享一个后台工作线程）"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._charts_primed = False
+        self.last_timings: Dict[str, float] = {}
+
+    @staticmethod
+    def get_ready_routes() -> List[str]:
+        """获取数据要求已满足、需要预加载的页面"""
+        return [page for page in ROUTES
+                if page not in WARMUP_EXCLUDED_ROUTES and page_manager._check_data_requirements(page)]
+
+    @staticmethod
+    def _collect_data(routes: List[str]) -> tuple:
+        """在主线程中收集预加载所需的数据和数据版本（后台线程无法访问会话状态）"""
+        keys = {key for page in routes for key in DATA_REQUIREMENTS.get(page, [])}
+        data = {key: st.session_state.get(key) for key in keys}
+        versions = {key: state_manager.get_data_version(key) for key in keys}
+        history_files = state_manager.get_history_files()
+        if history_files:
+            data['history_files'] = history_files
+            versions['history_files'] = state_manager.get_data_version('history_files')
+        return data, versions
+
+    def schedule(self):
+        """
+        安排预加载任务（在主页渲染完成后调用）
+
+        同一会话中数据未变化时不会重复安排；任务在后台线程执行，不阻塞当前页面。
+        """
+        if not WARMUP_ENABLED:
+            return
+
+        routes = self.get_ready_routes()
+        if not routes:
+            return
+
+        data, versions = self._collect_data(routes)
+        signature = (tuple(routes), tuple(sorted(versions.items())))
+        if st.session_state.get('warmup_signature') == signature:
+            return
+        st.session_state.warmup_signature = signature
+
+        self._queue.put({'routes': routes, 'data': data, 'versions': versions})
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        """启动后台工作线程（如尚未运行）"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="page-warmup", daemon=True)
+                self._worker.start()
+
+    def _work(self):
+        """后台线程：依次处理预加载任务，队列空闲时退出"""
+        while True:
+            try:
+                job = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                return
+            try:
+                self.warm_routes(job['routes'], job['data'], job['versions'])
+            except Exception:
+                logger.exception("页面预加载失败")
+
+    def warm_routes(self, routes: List[str], data: Dict[str, Any], versions: Dict[str, str]):
+        """
+        预加载页面
+
+        Args:
+            routes: 页面名称列表
+            data: 页面所需的数据（数据键 -> DataFrame）
+            versions: 数据版本（数据键 -> 版本号），用于缓存键
+        """
+        for page in routes:
+            start = time.perf_counter()
+            try:
+                module = importlib.import_module(ROUTES[page])
+                page_manager.pages.setdefault(page, module)
+
+                # 加载页面中延迟导入的模块（如 plotly.express）
+                uses_lazy = False
+                for value in list(vars(module).values()):
+                    if isinstance(value, LazyModule):
+                        value._load()
+                        uses_lazy = True
+                if uses_lazy:
+                    self._prime_charts()
+
+                hook = getattr(module, 'warm_up', None)
+                if WARMUP_PRECOMPUTE and callable(hook):
+                    hook(data, versions)
+            except Exception:
+                logger.exception("预加载页面 %s 失败", page)
+            self.last_timings[page] = (time.perf_counter() - start) * 1000
+
+    def _prime_charts(self):
+        """首次生成图表时 plotly 需要初始化大量属性校验器，预先生成一次示例图表"""
+        if self._charts_primed:
+            return
+        self._charts_primed = True
+
+        import pandas as pd
+        import plotly.express as px
+        import plotly.graph_objects as go
+
+        sample_df = pd.DataFrame({'名称': ['A', 'B'], '数值': [1.0, 2.0]})
+        fig = px.bar(sample_df, x='名称', y='数值', text='数值', color='名称')
+        fig.add_trace(go.Scatter(x=sample_df['名称'], y=sample_df['数值'], mode='lines+markers'))
+        fig.update_layout(title='预加载', xaxis=dict(tickangle=-45), legend=dict(orientation='h'))
+        fig.update_traces(textposition='outside', selector=dict(type='bar'))
+        px.line(sample_df, x='名称', y='数值').to_plotly_json()
+        fig.to_plotly_json()
+
+
+# 全局页面预加载调度器实例
+warmup_scheduler = WarmupScheduler()
@@ -14,9 +14,14 @@ sys.path.insert(0, current_dir)
 # 导入核心组件
 from components.ui_components import ui
 from components.navigation import navigation
+from components.diagnostics import diagnostics
 from core.page_manager import page_manager
 from core.state_manager import state_manager
-from utils.data_loader import data_loader
+from core.profiling import profiler
+from core.session_snapshot import session_snapshot
+from core.data_watcher import data_watcher
+from core.warmup import warmup_scheduler
+from utils.sandbox_parser import sandbox_parser
 
 
 def initialize_app():
@@ -35,25 +40,50 @@ def initialize_app():
     # 初始化状态管理器
     state_manager._initialize_state()
     
+    # 预先启动解析子进程，首次上传不再等待解释器启动和库导入
+    sandbox_parser.prewarm()
+    
+    # 刷新页面或重新连接后按地址中的令牌恢复上次会话（需在页面管理器读取页面状态之前）
+    restore_session()
+    
     # 初始化页面管理器
     page_manager.initialize_from_session()
 
 
+def restore_session():
+    """从会话快照恢复数据、历史月份和界面选择，不再重新解析 Excel"""
+    elapsed_ms = session_snapshot.restore_from_query()
+    if elapsed_ms is not None:
+        st.success(f"已恢复上次会话的数据（耗时 {elapsed_ms:.0f} ms）")
+
+
 def auto_load_data():
-    """自动加载数据"""
-    if not state_manager.is_data_loaded() and state_manager.get_file_name() is None:
-        detected_file = data_loader.auto_detect_excel_file()
-        if detected_file:
-            score_df, sales_df, department_sales_df, ranking_df, error = data_loader.load_excel_data(detected_file)
-            if not error:
-                state_manager.set_data('score_df', score_df)
-                state_manager.set_data('sales_df', sales_df)
-                state_manager.set_data('department_sales_df', department_sales_df)
-                state_manager.set_data('ranking_df', ranking_df)
-                state_manager.set_file_name(detected_file)
-                st.success(f"自动加载文件成功: {detected_file}")
-            else:
-                st.error(f"自动加载文件失败: {error}")
+    """自动加载数据目录中的最新工作簿，后台监视器发布新版本后切换到新数据（上传的数据不会被替换）"""
+    # 只有尚未加载任何数据的会话才在本次运行中同步加载，已有数据的会话只由后台线程扫描
+    needs_data = not state_manager.is_data_loaded() and state_manager.get_file_name() is None
+    dataset = data_watcher.ensure_started(initial_load=needs_data)
+    if dataset is None:
+        if data_watcher.last_error and needs_data:
+            st.error(f"自动加载文件失败: {data_watcher.last_error}")
+        return
+    
+    if data_watcher.should_adopt(dataset):
+        updated = data_watcher.get_adopted_version() is not None
+        data_watcher.adopt(dataset)
+        if updated:
+            st.success(f"数据已更新为最新文件: {dataset['file_name']}")
+        else:
+            st.success(f"自动加载文件成功: {dataset['file_name']}")
+
+
+def render_page():
+    """渲染当前页面"""
+    try:
+        page_manager.render_current_page()
+    except Exception as e:
+        st.error(f"页面加载错误: {e}")
+        st.info("正在返回主页...")
+        page_manager.go_home()
 
 
 def main():
@@ -67,16 +97,32 @@ def main():
     # 获取当前页面
     current_page = page_manager.get_current_page()
     
-    # 渲染页面
-    try:
-        page_manager.render_current_page()
-    except Exception as e:
-        st.error(f"页面加载错误: {e}")
-        st.info("正在返回主页...")
-        page_manager.go_home()
+    # 渲染页面（按需剖析本次运行，未开启时直接渲染；登记会话用于判断剖析时是否有其他会话在线）
+    profiler.track_session()
+    profile_result = None
+    if profiler.is_requested(diagnostics.is_admin()):
+        # 查询参数方式只剖析这一次运行（在渲染前清除，页面跳转时也不会保留）
+        profiler.clear_request()
+        profile_result = profiler.run(render_page)
+    else:
+        render_page()
     
     # 渲染页脚
     ui.render_footer()
+    
+    # 主页渲染完成后，在后台预加载数据已就绪的页面
+    if current_page == "home":
+        warmup_scheduler.schedule()
+    
+    # 性能剖析结果与管理员性能诊断面板
+    profiler.render_summary(profile_result)
+    diagnostics.render_panel()
+    
+    # 保存会话快照（数据或界面选择有变化时）
+    session_snapshot.save_if_changed()
+    
+    # 定期检查数据目录中是否有新发布的数据
+    data_watcher.render_update_check()
 
 
 if __name__ == "__main__":
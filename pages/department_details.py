@@ -5,12 +5,15 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import re
 import time
 from components.navigation import navigation
+from components.data_table import data_table
 from core.state_manager import state_manager
+from utils.lazy_import import lazy_module
+
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
 
 
 def show():
@@ -235,29 +238,7 @@ def display_specific_metric_table(df, metric_column):
     if growth_column in df.columns:
         columns_to_show.append(growth_column)
     
-    # 创建显示用的数据框
-    display_df = df[columns_to_show].copy()
-    
-    def apply_growth_color(val):
-        """为增长率列应用颜色格式"""
-        if val == "" or pd.isna(val):
-            return ""
-        try:
-            # 提取数值部分
-            num_val = float(val.replace('%', ''))
-            if num_val > 0:
-                return "color: green; font-weight: bold"
-            else:
-                return "color: red; font-weight: bold"
-        except:
-            return ""
-    
-    # 应用样式
-    styled_df = display_df.style
-    if growth_column in display_df.columns:
-        styled_df = styled_df.applymap(apply_growth_color, subset=[growth_column])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    data_table.render_growth_table(df[columns_to_show])
 
 
 def sort_department_data(df):
@@ -288,59 +269,26 @@ def sort_department_data(df):
 
 
 def calculate_department_growth_rate(df):
-    """为每个部门计算环比增长率"""
+    """为每个部门计算环比增长率（数值，单位为百分比）"""
     if df.empty:
         return df
     
     df = df.copy()
     growth_columns = ['销售额(万元)', '回款额(万元)', '逾期未收回额(万元)']
     
-    # 为每个部门分别计算增长率
-    for department in df['部门'].unique():
-        dept_mask = df['部门'] == department
-        dept_indices = df[dept_mask].index
-        
-        for col in growth_columns:
-            growth_col = f"{col}环比增长率"
-            if growth_col not in df.columns:
-                df[growth_col] = ""
-            
-            dept_data = df.loc[dept_indices, col]
-            growth_rates = dept_data.pct_change() * 100
-            
-            # 第一行设为空值
-            growth_rates.iloc[0] = None
-            
-            # 格式化为百分比字符串
-            growth_rates = growth_rates.apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "")
-            
-            df.loc[dept_indices, growth_col] = growth_rates
+    # 按部门分组取上月数据，一次性计算所有部门的增长率
+    prev_values = df.groupby('部门', sort=False)[growth_columns].shift(1)
+    
+    for col in growth_columns:
+        growth_col = f"{col}环比增长率"
+        prev_col = prev_values[col]
+        # 每个部门的第一行及上月为0时设为空值
+        growth_rates = (df[col] / prev_col.where(prev_col != 0) - 1) * 100
+        df[growth_col] = growth_rates.round(1)
     
     return df
 
 
 def display_styled_department_dataframe(df):
     """显示带条件格式的部门数据表"""
-    def apply_growth_color(val):
-        """为增长率列应用颜色格式"""
-        if val == "" or pd.isna(val):
-            return ""
-        try:
-            # 提取数值部分
-            num_val = float(val.replace('%', ''))
-            if num_val > 0:
-                return "color: green; font-weight: bold"
-            else:
-                return "color: red; font-weight: bold"
-        except:
-            return ""
-    
-    # 获取环比增长率列
-    growth_columns = [col for col in df.columns if '环比增长率' in col]
-    
-    # 应用样式
-    styled_df = df.style
-    for col in growth_columns:
-        styled_df = styled_df.applymap(apply_growth_color, subset=[col])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True) 
\ No newline at end of file
+    data_table.render_growth_table(df)
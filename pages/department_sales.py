@@ -5,12 +5,17 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import re
 from html import escape
 from components.navigation import navigation
 from components.ui_components import ui
+from components.data_table import data_table
+from components.charts import charts
 from core.state_manager import state_manager
+from config.display_config import MONEY_COLUMN_FORMAT
+from utils.lazy_import import lazy_module
+
+px = lazy_module("plotly.express")
 
 
 def get_text_positions(df_length):
@@ -45,6 +50,32 @@ def get_text_positions(df_length):
         return positions
 
 
+def get_department_ranking_df(df, value_col, key):
+    """
+    生成部门排名柱状图数据（金额转换为万元）
+    
+    部门较多时默认只显示前N名和后N名，中间部门合并为一条平均值柱，可勾选展开全部
+    
+    Args:
+        df: 部门数据
+        value_col: 排名依据的金额列
+        key: 展开开关的唯一标识
+        
+    Returns:
+        按金额降序排列的显示数据
+    """
+    ranking_df = df.sort_values(value_col, ascending=False)
+    total_count = len(ranking_df)
+    if charts.render_expand_toggle(total_count, key=key, unit="个部门"):
+        ranking_df, _ = charts.select_top_bottom(ranking_df, value_col, '部门', max_bars=total_count)
+    else:
+        ranking_df, _ = charts.select_top_bottom(ranking_df, value_col, '部门', others_label="其余{count}个部门(平均)")
+    
+    # 转换为万元
+    ranking_df[f'{value_col}(万元)'] = ranking_df[value_col] / 10000
+    return ranking_df
+
+
 def show():
     """显示部门销售回款统计页面"""
     # 渲染导航
@@ -96,23 +127,10 @@ def show():
     available_payment_weeks = sorted(set(available_payment_weeks))
     all_weeks = sorted(set(available_sales_weeks + available_payment_weeks))
 
-    # --- 列名修正 ---
-    # 使用全角中文括号
-    payment_col_normal = '本月回未超期款'
-    payment_col_overdue = '本月回超期款'
-
-    if payment_col_normal in df.columns and payment_col_overdue in df.columns:
-        df['月总回款额'] = df[payment_col_normal].fillna(0) + df[payment_col_overdue].fillna(0)
-    else:
-        st.error(f"月度回款列缺失，请检查文件中的列名是否为 '{payment_col_normal}' 和 '{payment_col_overdue}'。")
+    # 月总回款额和各周总回款额在导入时按 config/column_config.py 的派生列规则计算
+    if '月总回款额' not in df.columns:
+        st.error("月度回款列缺失，请检查文件中的列名是否为 '本月回未超期款' 和 '本月回超期款'。")
         return
-    
-    # 动态计算各周总回款额
-    for week_num in available_payment_weeks:
-        week_payment_normal = f'第{week_num}周回未超期款'
-        week_payment_overdue = f'第{week_num}周回超期款'
-        if week_payment_normal in df.columns and week_payment_overdue in df.columns:
-            df[f'第{week_num}周总回款额'] = df[week_payment_normal].fillna(0) + df[week_payment_overdue].fillna(0)
 
     # --- 1 & 2. 月度排名 ---
     st.markdown('<h3 class="section-title fade-in">📊 月度排名</h3>', unsafe_allow_html=True)
@@ -120,10 +138,7 @@ def show():
 
     with col1:
         st.markdown("#### 销售额排名 (部门)")
-        sales_ranking_df = df.sort_values('本月销售额', ascending=False).copy()
-        
-        # 转换为万元
-        sales_ranking_df['本月销售额(万元)'] = sales_ranking_df['本月销售额'] / 10000
+        sales_ranking_df = get_department_ranking_df(df, '本月销售额', key='dept_sales_ranking_expand')
         
         # 动态生成文本位置
         sales_text_positions = get_text_positions(len(sales_ranking_df))
@@ -132,16 +147,13 @@ def show():
                           labels={'本月销售额(万元)': '销售额 (万元)', '部门': '部门'}, text='本月销售额(万元)',
                           color_discrete_sequence=['#0A84FF'])
         fig_sales.update_traces(texttemplate='%{text:,.1f}万', textposition=sales_text_positions)
-        fig_sales.update_layout(yaxis={'categoryorder': 'total ascending'}, plot_bgcolor='rgba(0,0,0,0)',
-                                paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#1D1D1F'))
+        fig_sales.update_layout(yaxis={'categoryorder': 'array', 'categoryarray': sales_ranking_df['部门'].tolist()[::-1]},
+                                plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#1D1D1F'))
         st.plotly_chart(fig_sales, use_container_width=True)
 
     with col2:
         st.markdown("#### 回款额排名 (部门)")
-        payment_ranking_df = df.sort_values('月总回款额', ascending=False).copy()
-        
-        # 转换为万元
-        payment_ranking_df['月总回款额(万元)'] = payment_ranking_df['月总回款额'] / 10000
+        payment_ranking_df = get_department_ranking_df(df, '月总回款额', key='dept_payment_ranking_expand')
         
         # 动态生成文本位置
         payment_text_positions = get_text_positions(len(payment_ranking_df))
@@ -150,8 +162,8 @@ def show():
                              labels={'月总回款额(万元)': '回款额 (万元)', '部门': '部门'}, text='月总回款额(万元)',
                              color_discrete_sequence=['#BF5AF2'])
         fig_payment.update_traces(texttemplate='%{text:,.1f}万', textposition=payment_text_positions)
-        fig_payment.update_layout(yaxis={'categoryorder': 'total ascending'}, plot_bgcolor='rgba(0,0,0,0)',
-                                  paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#1D1D1F'))
+        fig_payment.update_layout(yaxis={'categoryorder': 'array', 'categoryarray': payment_ranking_df['部门'].tolist()[::-1]},
+                                  plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#1D1D1F'))
         st.plotly_chart(fig_payment, use_container_width=True)
 
     # --- 3 & 4. 各周走势 ---
@@ -188,8 +200,11 @@ def show():
     with col3:
         st.markdown("#### 各周销售额走势")
         if not sales_melted.empty:
-            fig_sales_trend = px.line(sales_melted.sort_values('周序号'), x='周次', y='销售额(万元)', color='部门',
+            sales_plot_df = charts.limit_series(sales_melted.sort_values('周序号'), '部门', '销售额(万元)',
+                                                key='dept_sales_trend_expand')
+            fig_sales_trend = px.line(sales_plot_df, x='周次', y='销售额(万元)', color='部门',
                                       title='各部门周销售额趋势', markers=True,
+                                      render_mode=charts.get_line_render_mode(sales_plot_df, '部门'),
                                       labels={'销售额(万元)': '销售额 (万元)', '周次': '周次'})
             fig_sales_trend.update_layout(
                 height=550, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
@@ -206,8 +221,11 @@ def show():
             # 使用自定义排序的x轴标签
             custom_x_labels = sorted(payment_melted['周次'].unique(),
                                      key=lambda x: int(re.search(r'第(\d+)周', x).group(1)))
-            fig_payment_trend = px.line(payment_melted.sort_values('周序号'), x='周次', y='回款额(万元)', color='部门', 
+            payment_plot_df = charts.limit_series(payment_melted.sort_values('周序号'), '部门', '回款额(万元)',
+                                                  key='dept_payment_trend_expand')
+            fig_payment_trend = px.line(payment_plot_df, x='周次', y='回款额(万元)', color='部门', 
                                       title='各部门周回款额趋势', markers=True, 
+                                      render_mode=charts.get_line_render_mode(payment_plot_df, '部门'),
                                       category_orders={"周次": custom_x_labels},
                                       labels={'回款额(万元)': '回款额 (万元)', '周次': '周次'})
             fig_payment_trend.update_layout(
@@ -229,8 +247,8 @@ def show():
     with col5:
         if not sales_melted.empty:
             st.markdown("#### 📈 各周销售额详细数据")
-            sales_detail_df = create_sales_detail_table(sales_melted)
-            display_styled_dataframe(sales_detail_df)
+            sales_detail_df = create_weekly_detail_table(sales_melted, '销售额')
+            display_styled_dataframe(sales_detail_df, get_weekly_detail_column_config('销售额'))
         else:
             st.markdown("#### 📈 各周销售额详细数据")
             st.info("无销售额数据可供展示")
@@ -239,8 +257,8 @@ def show():
     with col6:
         if not payment_melted.empty:
             st.markdown("#### 💰 各周回款额详细数据")
-            payment_detail_df = create_payment_detail_table(payment_melted)
-            display_styled_dataframe(payment_detail_df)
+            payment_detail_df = create_weekly_detail_table(payment_melted, '回款额')
+            display_styled_dataframe(payment_detail_df, get_weekly_detail_column_config('回款额'))
         else:
             st.markdown("#### 💰 各周回款额详细数据")
             st.info("无回款额数据可供展示")
@@ -265,7 +283,7 @@ def show():
         with kpi_cols[1]:
             st.metric("本月总回款额", f"¥ {dept_data.get('月总回款额', 0):,.2f}")
         with kpi_cols[2]:
-            overdue_val = dept_data.get(payment_col_overdue, 0)
+            overdue_val = dept_data.get('本月回超期款', 0)
             total_payment = dept_data.get('月总回款额', 0)
             overdue_payment_pct = (overdue_val / total_payment * 100) if total_payment > 0 else 0
             st.metric("超期回款占比", f"{overdue_payment_pct:.2f}%", help=f"超期回款额: ¥ {overdue_val:,.2f}")
@@ -304,94 +322,48 @@ def show():
         st.markdown("</div>", unsafe_allow_html=True)
 
 
-def create_sales_detail_table(sales_melted):
-    """创建销售额详细数据表格"""
-    # 按部门和周次排序
-    detail_df = sales_melted.sort_values(['部门', '周序号']).copy()
-    
-    # 重新整理数据结构
-    detail_df['周数'] = detail_df['周序号']
-    detail_df['销售额（万元）'] = detail_df['销售额'] / 10000
-    
-    # 计算环比增长率
-    detail_df['环比增长率'] = ""
-    for dept in detail_df['部门'].unique():
-        dept_data = detail_df[detail_df['部门'] == dept].sort_values('周序号')
-        for i in range(1, len(dept_data)):
-            current_idx = dept_data.index[i]
-            prev_idx = dept_data.index[i-1]
-            current_val = dept_data.loc[current_idx, '销售额']
-            prev_val = dept_data.loc[prev_idx, '销售额']
-            
-            if prev_val != 0 and pd.notna(prev_val) and pd.notna(current_val):
-                growth_rate = ((current_val - prev_val) / prev_val) * 100
-                detail_df.loc[current_idx, '环比增长率'] = f"{growth_rate:+.1f}%"
-    
-    # 选择要显示的列
-    result_df = detail_df[['周数', '部门', '销售额', '销售额（万元）', '环比增长率']].copy()
-    
-    # 格式化销售额列
-    result_df['销售额'] = result_df['销售额'].apply(lambda x: f"¥ {x:,.2f}")
-    result_df['销售额（万元）'] = result_df['销售额（万元）'].apply(lambda x: f"¥ {x:,.2f}")
-    
-    return result_df
+def create_weekly_detail_table(melted_df, value_col):
+    """
+    创建各周详细数据表格（销售额与回款额共用）
 
+    按部门分组后用 shift 取上一周数值，一次性向量化计算环比增长率，
+    数值列保持为数字类型，显示格式交由列配置处理。
 
-def create_payment_detail_table(payment_melted):
-    """创建回款额详细数据表格"""
-    # 按部门和周次排序
-    detail_df = payment_melted.sort_values(['部门', '周序号']).copy()
-    
-    # 重新整理数据结构
-    detail_df['周数'] = detail_df['周序号']
-    detail_df['回款额（万元）'] = detail_df['回款额'] / 10000
-    
-    # 计算环比增长率
-    detail_df['环比增长率'] = ""
-    for dept in detail_df['部门'].unique():
-        dept_data = detail_df[detail_df['部门'] == dept].sort_values('周序号')
-        for i in range(1, len(dept_data)):
-            current_idx = dept_data.index[i]
-            prev_idx = dept_data.index[i-1]
-            current_val = dept_data.loc[current_idx, '回款额']
-            prev_val = dept_data.loc[prev_idx, '回款额']
-            
-            if prev_val != 0 and pd.notna(prev_val) and pd.notna(current_val):
-                growth_rate = ((current_val - prev_val) / prev_val) * 100
-                detail_df.loc[current_idx, '环比增长率'] = f"{growth_rate:+.1f}%"
-    
-    # 选择要显示的列
-    result_df = detail_df[['周数', '部门', '回款额', '回款额（万元）', '环比增长率']].copy()
-    
-    # 格式化回款额列
-    result_df['回款额'] = result_df['回款额'].apply(lambda x: f"¥ {x:,.2f}")
-    result_df['回款额（万元）'] = result_df['回款额（万元）'].apply(lambda x: f"¥ {x:,.2f}")
-    
-    return result_df
+    Args:
+        melted_df: 融合后的周数据（包含 部门、周序号 以及 value_col 列）
+        value_col: 数值列名，如 '销售额' 或 '回款额'
 
+    Returns:
+        包含 周数、部门、金额、金额（万元）、环比增长率 的DataFrame
+    """
+    # 按部门和周次排序（稳定排序，保证同一部门内周次有序）
+    detail_df = melted_df.sort_values(['部门', '周序号'], kind='mergesort')
 
-def display_styled_dataframe(df):
+    values = detail_df[value_col].astype(float)
+    prev_values = detail_df.groupby('部门', sort=False)[value_col].shift(1).astype(float)
+
+    # 计算环比增长率，上周为0或缺失时不计算
+    growth_rate = (values - prev_values) / prev_values * 100
+    growth_rate = growth_rate.where(prev_values.notna() & (prev_values != 0))
+
+    return pd.DataFrame({
+        '周数': detail_df['周序号'].to_numpy(),
+        '部门': detail_df['部门'].to_numpy(),
+        value_col: values.to_numpy(),
+        f'{value_col}（万元）': (values / 10000).to_numpy(),
+        '环比增长率': growth_rate.round(1).to_numpy()
+    })
+
+
+def get_weekly_detail_column_config(value_col):
+    """获取各周详细数据表格的列显示配置"""
+    return {
+        '周数': st.column_config.NumberColumn('周数', format="%d"),
+        value_col: st.column_config.NumberColumn(f'{value_col}（元）', format=MONEY_COLUMN_FORMAT),
+        f'{value_col}（万元）': st.column_config.NumberColumn(f'{value_col}（万元）', format=MONEY_COLUMN_FORMAT)
+    }
+
+
+def display_styled_dataframe(df, column_config=None):
     """显示带条件格式的数据表（参照总体趋势的颜色样式）"""
-    def apply_growth_color(val):
-        """为增长率列应用颜色格式"""
-        if val == "" or pd.isna(val):
-            return ""
-        try:
-            # 提取数值部分
-            num_val = float(val.replace('%', '').replace('+', ''))
-            if num_val > 0:
-                return "color: green; font-weight: bold"
-            else:
-                return "color: red; font-weight: bold"
-        except:
-            return ""
-    
-    # 获取环比增长率列
-    growth_columns = [col for col in df.columns if '环比增长率' in col]
-    
-    # 应用样式
-    styled_df = df.style
-    for col in growth_columns:
-        styled_df = styled_df.applymap(apply_growth_color, subset=[col])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True) 
\ No newline at end of file
+    data_table.render_growth_table(df, column_config=column_config, growth_format="%+.1f%%")
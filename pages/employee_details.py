@@ -5,12 +5,17 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import re
 import time
 from components.navigation import navigation
+from components.data_table import data_table
+from components.charts import charts
+from utils.downsampling import downsampler
 from core.state_manager import state_manager
+from utils.lazy_import import lazy_module
+
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
 
 
 def show():
@@ -74,19 +79,17 @@ def display_employee_details(history_files):
     employee_trend_df = calculate_employee_growth_rate(employee_trend_df)
 
     # 显示员工历史对比图表（包含对应的数据汇总表）
-    display_employee_charts(employee_trend_df)
+    display_employee_charts(employee_trend_df, history_files, selected_employees)
 
     # 显示员工销售能力雷达图对比
     if len(selected_employees) <= 5:
         display_employee_radar_chart(employee_trend_df)
 
-    # 数据下载功能
-    csv = employee_trend_df.to_csv(index=False).encode('utf-8')
-    st.download_button(
+    # 数据下载功能（CSV在服务端缓存，数据不变时不重复生成）
+    data_table.render_csv_download(
+        employee_trend_df,
         label="📥 下载员工数据(CSV)",
-        data=csv,
         file_name=f"员工销售回款历史数据_{time.strftime('%Y%m%d')}.csv",
-        mime="text/csv",
         key="download_emp_data"
     )
 
@@ -132,16 +135,28 @@ def prepare_employee_data(history_files, selected_employees):
     return employee_data
 
 
-def display_employee_charts(employee_trend_df):
+def display_employee_charts(employee_trend_df, history_files, selected_employees):
     """显示员工对比图表"""
     st.markdown("### 📈 员工销售回款历史对比")
     
     # 添加图例操作提示
     st.info("💡 提示：点击图例可以隐藏或显示对应的数据线")
     
+    # 趋势图时间范围，降采样结果按数据版本、所选员工和时间范围缓存
+    sorted_months = sorted(history_files.keys(), key=extract_year_month_for_sort)
+    visible_months = charts.select_month_range(sorted_months, key='employee_trend_range')
+    chart_df = employee_trend_df[employee_trend_df['月份'].isin(visible_months)]
+    chart_cache_key = (state_manager.get_data_version('history_files'), tuple(selected_employees),
+                       visible_months[0], visible_months[-1])
+    
     # 1. 员工销售额趋势图
+    plot_df = charts.limit_series(chart_df, '员工', '销售额(万元)', key="emp_trend_expand_销售额(万元)")
+    plot_df = downsampler.get_chart_data(plot_df, '销售额(万元)', charts.get_point_budget('employee_sales'),
+                                         ('employee_sales', plot_df['员工'].nunique()) + chart_cache_key, series_col='员工')
     fig_emp_sales = px.line(
-        employee_trend_df, x='月份', y='销售额(万元)', color='员工',
+        plot_df, x='月份', y='销售额(万元)', color='员工',
+        category_orders={'月份': visible_months},
+        render_mode=charts.get_line_render_mode(plot_df, '员工'),
         markers=True, title='员工销售额月度变化趋势',
         color_discrete_sequence=px.colors.qualitative.Vivid
     )
@@ -158,8 +173,13 @@ def display_employee_charts(employee_trend_df):
     display_specific_employee_metric_table(employee_trend_df, '销售额(万元)')
 
     # 2. 员工回款额趋势图
+    plot_df = charts.limit_series(chart_df, '员工', '回款额(万元)', key="emp_trend_expand_回款额(万元)")
+    plot_df = downsampler.get_chart_data(plot_df, '回款额(万元)', charts.get_point_budget('employee_payment'),
+                                         ('employee_payment', plot_df['员工'].nunique()) + chart_cache_key, series_col='员工')
     fig_emp_payment = px.line(
-        employee_trend_df, x='月份', y='回款额(万元)', color='员工',
+        plot_df, x='月份', y='回款额(万元)', color='员工',
+        category_orders={'月份': visible_months},
+        render_mode=charts.get_line_render_mode(plot_df, '员工'),
         markers=True, title='员工回款额月度变化趋势',
         color_discrete_sequence=px.colors.qualitative.Vivid
     )
@@ -176,8 +196,13 @@ def display_employee_charts(employee_trend_df):
     display_specific_employee_metric_table(employee_trend_df, '回款额(万元)')
 
     # 3. 员工逾期未收回额趋势图
+    plot_df = charts.limit_series(chart_df, '员工', '逾期未收回额(万元)', key="emp_trend_expand_逾期未收回额(万元)")
+    plot_df = downsampler.get_chart_data(plot_df, '逾期未收回额(万元)', charts.get_point_budget('employee_overdue'),
+                                         ('employee_overdue', plot_df['员工'].nunique()) + chart_cache_key, series_col='员工')
     fig_emp_overdue = px.line(
-        employee_trend_df, x='月份', y='逾期未收回额(万元)', color='员工',
+        plot_df, x='月份', y='逾期未收回额(万元)', color='员工',
+        category_orders={'月份': visible_months},
+        render_mode=charts.get_line_render_mode(plot_df, '员工'),
         markers=True, title='员工逾期未收回额月度变化趋势',
         color_discrete_sequence=px.colors.qualitative.Vivid
     )
@@ -231,23 +256,29 @@ def display_employee_radar_chart(employee_trend_df):
     st.caption("注：逾期控制维度中，值越高表示逾期未收回额越低，表现越好")
 
 
+def extract_year_month_for_sort(month_str):
+    """提取年月用于排序"""
+    year_match = re.search(r'(\d{4})年', str(month_str))
+    month_match = re.search(r'年(\d{1,2})月', str(month_str))
+    year = year_match.group(1) if year_match else '0000'
+    month = month_match.group(1) if month_match else '00'
+    if len(month) == 1:
+        month = '0' + month
+    return year + month
+
+
+def month_sort_key(month_series):
+    """将月份列转换为可排序的年月键（供分页表格排序使用）"""
+    return month_series.map(extract_year_month_for_sort)
+
+
 def sort_employee_data(df):
     """按员工分组，组内按年月排序"""
     if df.empty:
         return df
     
-    def extract_year_month_for_sort(month_str):
-        """提取年月用于排序"""
-        year_match = re.search(r'(\d{4})年', str(month_str))
-        month_match = re.search(r'年(\d{1,2})月', str(month_str))
-        year = year_match.group(1) if year_match else '0000'
-        month = month_match.group(1) if month_match else '00'
-        if len(month) == 1:
-            month = '0' + month
-        return year + month
-    
     # 添加排序用的年月列
-    df['年月排序'] = df['月份'].apply(extract_year_month_for_sort)
+    df['年月排序'] = month_sort_key(df['月份'])
     
     # 按员工和年月排序
     df = df.sort_values(['员工', '年月排序']).reset_index(drop=True)
@@ -259,62 +290,29 @@ def sort_employee_data(df):
 
 
 def calculate_employee_growth_rate(df):
-    """为每个员工计算环比增长率"""
+    """为每个员工计算环比增长率（数值，单位为百分比）"""
     if df.empty:
         return df
     
     df = df.copy()
     growth_columns = ['销售额(万元)', '回款额(万元)', '逾期未收回额(万元)']
     
-    # 为每个员工分别计算增长率
-    for employee in df['员工'].unique():
-        emp_mask = df['员工'] == employee
-        emp_indices = df[emp_mask].index
-        
-        for col in growth_columns:
-            growth_col = f"{col}环比增长率"
-            if growth_col not in df.columns:
-                df[growth_col] = ""
-            
-            emp_data = df.loc[emp_indices, col]
-            growth_rates = emp_data.pct_change() * 100
-            
-            # 第一行设为空值
-            growth_rates.iloc[0] = None
-            
-            # 格式化为百分比字符串
-            growth_rates = growth_rates.apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "")
-            
-            df.loc[emp_indices, growth_col] = growth_rates
+    # 按员工分组取上月数据，一次性计算所有员工的增长率
+    prev_values = df.groupby('员工', sort=False)[growth_columns].shift(1)
+    
+    for col in growth_columns:
+        growth_col = f"{col}环比增长率"
+        prev_col = prev_values[col]
+        # 每个员工的第一行及上月为0时设为空值
+        growth_rates = (df[col] / prev_col.where(prev_col != 0) - 1) * 100
+        df[growth_col] = growth_rates.round(1)
     
     return df
 
 
 def display_styled_employee_dataframe(df):
     """显示带条件格式的员工数据表"""
-    def apply_growth_color(val):
-        """为增长率列应用颜色格式"""
-        if val == "" or pd.isna(val):
-            return ""
-        try:
-            # 提取数值部分
-            num_val = float(val.replace('%', ''))
-            if num_val > 0:
-                return "color: green; font-weight: bold"
-            else:
-                return "color: red; font-weight: bold"
-        except:
-            return ""
-    
-    # 获取环比增长率列
-    growth_columns = [col for col in df.columns if '环比增长率' in col]
-    
-    # 应用样式
-    styled_df = df.style
-    for col in growth_columns:
-        styled_df = styled_df.applymap(apply_growth_color, subset=[col])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    data_table.render_growth_table(df)
 
 
 def display_specific_employee_metric_table(df, metric_column):
@@ -326,26 +324,11 @@ def display_specific_employee_metric_table(df, metric_column):
     if growth_column in df.columns:
         columns_to_show.append(growth_column)
     
-    # 创建显示用的数据框
-    display_df = df[columns_to_show].copy()
-    
-    def apply_growth_color(val):
-        """为增长率列应用颜色格式"""
-        if val == "" or pd.isna(val):
-            return ""
-        try:
-            # 提取数值部分
-            num_val = float(val.replace('%', ''))
-            if num_val > 0:
-                return "color: green; font-weight: bold"
-            else:
-                return "color: red; font-weight: bold"
-        except:
-            return ""
-    
-    # 应用样式
-    styled_df = display_df.style
-    if growth_column in display_df.columns:
-        styled_df = styled_df.applymap(apply_growth_color, subset=[growth_column])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True) 
\ No newline at end of file
+    # 员工较多时分页显示，排序与筛选在服务端完成
+    data_table.render_paginated_table(
+        df[columns_to_show],
+        key=f"emp_table_{metric_column}",
+        filter_column='员工',
+        summary_columns=[metric_column],
+        sort_key_funcs={'月份': month_sort_key}
+    ) 
\ No newline at end of file
@@ -5,10 +5,6 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
 import json
 import re
 import time
@@ -16,7 +12,13 @@ from components.navigation import navigation
 from components.ui_components import ui
 from core.state_manager import state_manager
 from core.page_manager import page_manager
+from core.ingestion import ingestion_scheduler
 from utils.data_loader import data_loader
+from utils.revision_diff import revision_differ
+from utils.lazy_import import lazy_module
+
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
 
 
 def show():
@@ -79,6 +81,9 @@ def show_upload_section():
         
         process_uploaded_files(uploaded_files)
 
+    # 同一月份内容不同的文件，等待确认是否替换
+    show_history_conflicts()
+
 
 def show_function_menu():
     """显示功能菜单"""
@@ -152,7 +157,12 @@ def show_function_menu():
 
 
 def process_uploaded_files(uploaded_files):
-    """处理上传的文件"""
+    """
+    处理上传的文件
+
+    按文件内容哈希识别重复上传：内容已加载过的文件（包括改名的副本）只计算一次哈希，不再解析；
+    同一月份已有不同内容的数据时作为修订版本等待确认，不直接覆盖。
+    """
     # 防止在删除操作后意外处理文件
     if st.session_state.get('skip_file_processing', False):
         st.session_state.skip_file_processing = False
@@ -161,46 +171,79 @@ def process_uploaded_files(uploaded_files):
     history_files = state_manager.get_history_files()
     
     for uploaded_file in uploaded_files:
-        # 创建文件唯一标识符（文件名+大小）
-        file_id = f"{uploaded_file.name}_{uploaded_file.size}"
-        
-        # 检查是否在当前会话中已处理过此文件
-        if file_id in st.session_state.processed_files:
+        # 上传标识（每次上传唯一），页面重新运行时不重复处理
+        upload_id = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}_{uploaded_file.size}"
+        if upload_id in st.session_state.processed_files:
             continue
-            
-        # 检查文件是否已经在历史数据中存在
-        file_already_exists = False
-        for key, info in history_files.items():
-            if info['file_name'] == uploaded_file.name:
-                file_already_exists = True
-                break
-
-        if file_already_exists:
-            # 标记为已处理，避免重复检查
-            st.session_state.processed_files.add(file_id)
+        
+        # 按内容识别已加载的文件
+        content_hash = data_loader.compute_content_hash(uploaded_file)
+        existing_month = state_manager.find_history_by_hash(content_hash)
+        if existing_month is not None:
+            st.info(f"ℹ️ {uploaded_file.name} 与已加载的 {existing_month} 数据内容相同，已跳过")
+            st.session_state.processed_files.add(upload_id)
             continue
 
-        # 加载Excel数据
-        with st.spinner(f"正在加载 {uploaded_file.name}..."):
-            score_df, sales_df, department_sales_df, ranking_df, error = data_loader.load_excel_data(uploaded_file)
+        # 加载Excel数据（通过解析队列，显示排队位置和进度；相同内容复用同一个解析任务）
+        score_df, sales_df, department_sales_df, ranking_df, error = ingestion_scheduler.load_with_progress(
+            uploaded_file, key=f"history_upload_{content_hash}")
 
         if error:
             st.error(f"文件 {uploaded_file.name} 加载失败: {error}")
         else:
             # 提取年月信息
             month_info = extract_month_info(uploaded_file, sales_df, score_df)
-
-            # 存储数据
-            state_manager.add_history_file(month_info, {
+            file_info = {
                 'file_name': uploaded_file.name,
+                'content_hash': content_hash,
                 'sales_df': sales_df,
                 'department_sales_df': department_sales_df
-            })
-
-            st.success(f"✅ 成功加载 {month_info} 的数据")
+            }
+
+            if month_info in history_files:
+                # 同一月份已有不同内容的数据，作为修订版本等待确认
+                st.session_state.setdefault('history_conflicts', {})[month_info] = file_info
+            else:
+                # 存储数据
+                state_manager.add_history_file(month_info, file_info)
+                st.success(f"✅ 成功加载 {month_info} 的数据")
         
         # 标记文件为已处理
-        st.session_state.processed_files.add(file_id)
+        st.session_state.processed_files.add(upload_id)
+
+
+def show_history_conflicts():
+    """显示与已加载月份内容不同的上传文件，由用户选择替换为新版本或保留原数据"""
+    conflicts = st.session_state.get('history_conflicts', {})
+    history_files = state_manager.get_history_files()
+    
+    for month_info, file_info in list(conflicts.items()):
+        current = history_files.get(month_info)
+        if current is None:
+            # 原数据已被删除，直接加载
+            state_manager.add_history_file(month_info, conflicts.pop(month_info))
+            continue
+        
+        report = revision_differ.diff(
+            {'销售回款数据统计': current['sales_df'], '部门销售回款统计': current['department_sales_df']},
+            {'销售回款数据统计': file_info['sales_df'], '部门销售回款统计': file_info['department_sales_df']}
+        )
+        changes = "；".join(
+            f"{sheet} 修改 {summary['changed_cells']} 个单元格，新增 {summary['added_rows']} 行，删除 {summary['removed_rows']} 行"
+            if summary['comparable'] else f"{sheet} 内容有变化（名称重复或为空，无法逐行对比）"
+            for sheet, summary in revision_differ.summarize(report).items()
+        ) or "销售和部门数据没有变化"
+        st.warning(f"⚠️ {file_info['file_name']} 与已加载的 {month_info} 数据（{current['file_name']}）内容不同：{changes}")
+        
+        col_replace, col_keep = st.columns(2)
+        with col_replace:
+            if st.button("替换为新版本", key=f"history_conflict_replace_{month_info}", use_container_width=True):
+                state_manager.add_history_file(month_info, conflicts.pop(month_info))
+                st.rerun()
+        with col_keep:
+            if st.button("保留原数据", key=f"history_conflict_keep_{month_info}", use_container_width=True):
+                conflicts.pop(month_info)
+                st.rerun()
 
 
 def extract_month_info(uploaded_file, sales_df, score_df):
@@ -309,9 +352,10 @@ def show_data_management_section():
                     state_manager.clear_history_files()
                     # 重置文件上传器
                     reset_file_uploader()
-                    # 清空已处理文件记录
+                    # 清空已处理文件记录和待确认的修订版本
                     if 'processed_files' in st.session_state:
                         st.session_state.processed_files.clear()
+                    st.session_state.pop('history_conflicts', None)
                     st.success("已清空所有历史数据")
                     st.rerun()
         else:
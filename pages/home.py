@@ -3,12 +3,20 @@
 销售积分红黑榜系统主页面
 """
 
+import time
+import pandas as pd
 import streamlit as st
 from components.navigation import navigation
+from components.data_table import data_table
 from components.ui_components import ui
 from core.state_manager import state_manager
 from core.page_manager import page_manager
+from core.ingestion import ingestion_scheduler
 from utils.data_loader import data_loader
+from utils.validation import data_validator
+from utils.incremental import incremental_ingestor
+from utils.revision_diff import revision_differ, SHEET_DATA_KEYS
+from utils.workbook_sniffer import workbook_sniffer, WorkbookSniffError
 
 
 def show():
@@ -76,39 +84,201 @@ def _render_file_upload_section():
             st.error(f"文件验证失败: {message}")
             return
         
-        # 加载数据
-        with st.spinner("正在加载数据..."):
-            score_df, sales_df, department_sales_df, ranking_df, error = data_loader.load_excel_data(uploaded_file)
+        # 解析前先显示快速探测到的工作表信息
+        _render_sniff_preview(uploaded_file)
+        
+        # 同一月份新增周数据的新版本只读取新增的周列（增量导入）
+        revision_loader = incremental_ingestor.get_revision_loader(uploaded_file, {
+            '员工积分数据': state_manager.get_data('score_df'),
+            '销售回款数据统计': state_manager.get_data('sales_df'),
+            '部门销售回款统计': state_manager.get_data('department_sales_df'),
+            '销售回款超期账款排名': state_manager.get_data('ranking_df'),
+        }, state_manager.get_file_name())
+        
+        # 加载数据（通过解析队列，显示排队位置和进度）
+        score_df, sales_df, department_sales_df, ranking_df, error = ingestion_scheduler.load_with_progress(
+            uploaded_file, key="home_upload", loader=revision_loader)
+        
+        # 页面重新运行时复用已完成的解析结果，数据已保存过则不重复记录和保存
+        job_id = st.session_state.get('home_upload_ingestion', {}).get('job_id')
+        already_applied = job_id is not None and st.session_state.get('home_upload_applied') == job_id
         
         if error:
             st.error(f"文件加载失败: {error}")
-        else:
-            # 记录数据上传操作（用于撤销）
-            page_manager._record_action({
-                'type': 'data_upload',
-                'file_name': uploaded_file.name,
-                'previous_data': {
-                    'score_df': state_manager.get_data('score_df'),
-                    'sales_df': state_manager.get_data('sales_df'),
-                    'department_sales_df': state_manager.get_data('department_sales_df'),
-                    'ranking_df': state_manager.get_data('ranking_df'),
-                    'file_name': state_manager.get_file_name()
-                }
+            return
+        
+        if not already_applied:
+            _apply_uploaded_data(uploaded_file.name, {
+                '员工积分数据': score_df,
+                '销售回款数据统计': sales_df,
+                '部门销售回款统计': department_sales_df,
+                '销售回款超期账款排名': ranking_df,
             })
-            
-            # 存储数据到状态管理器
-            state_manager.set_data('score_df', score_df)
-            state_manager.set_data('sales_df', sales_df)
-            state_manager.set_data('department_sales_df', department_sales_df)
-            state_manager.set_data('ranking_df', ranking_df)
-            state_manager.set_file_name(uploaded_file.name)
-            
-            # 显示成功信息
-            st.success(f"文件加载成功: {uploaded_file.name}")
-            
-            # 显示数据基本信息
-            data_info = data_loader.get_data_info(score_df, sales_df)
-            _render_data_summary(data_info, department_sales_df, ranking_df)
+            st.session_state.home_upload_applied = job_id
+        
+        # 显示成功信息和数据基本信息
+        st.success(f"文件加载成功: {uploaded_file.name}")
+        data_info = data_loader.get_data_info(score_df, sales_df)
+        _render_data_summary(data_info, department_sales_df, ranking_df)
+        _render_revision_diff()
+        _render_ingest_report(score_df, sales_df, department_sales_df, ranking_df)
+        _render_validation_report(score_df, sales_df, department_sales_df, ranking_df)
+
+
+def _apply_uploaded_data(file_name: str, frames: dict):
+    """
+    保存上传的数据到状态管理器
+
+    重新上传已加载月份的数据时先与已加载的版本对比：只替换有变化的工作表，
+    未变化的工作表保留原数据和数据版本（相关缓存继续有效），完全相同时不做任何替换。
+    """
+    previous_frames = {sheet: state_manager.get_data(key) for sheet, key in SHEET_DATA_KEYS.items()}
+    previous_file_name = state_manager.get_file_name()
+    month = incremental_ingestor.get_month_key(file_name)
+    
+    diff_report = None
+    if state_manager.is_data_loaded() and month and month == incremental_ingestor.get_month_key(previous_file_name):
+        diff_report = revision_differ.diff(previous_frames, frames)
+        state_manager.add_revision_record({
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'file_name': file_name,
+            'previous_file_name': previous_file_name,
+            'summary': revision_differ.summarize(diff_report),
+        })
+    st.session_state.last_revision_diff = diff_report
+    
+    if diff_report is not None and not diff_report['changed']:
+        state_manager.set_file_name(file_name)
+        return
+    
+    # 记录数据上传操作（用于撤销）
+    page_manager._record_action({
+        'type': 'data_upload',
+        'file_name': file_name,
+        'previous_data': {
+            **{key: previous_frames[sheet] for sheet, key in SHEET_DATA_KEYS.items()},
+            'file_name': previous_file_name
+        }
+    })
+    
+    # 存储数据到状态管理器
+    for sheet, key in SHEET_DATA_KEYS.items():
+        if diff_report is not None:
+            if key not in diff_report['invalidation']:
+                continue
+            revision_differ.carry_over_aggregates(previous_frames[sheet], frames[sheet], diff_report['sheets'][sheet])
+        state_manager.set_data(key, frames[sheet])
+    state_manager.set_file_name(file_name)
+
+
+def _render_revision_diff():
+    """显示与上一次上传的同月数据相比的变化和修订记录"""
+    report = st.session_state.get('last_revision_diff')
+    if report is None:
+        return
+    if not report['changed']:
+        st.info("ℹ️ 与已加载的同月数据完全相同，无需更新")
+        return
+    
+    with st.expander("🔁 与上一次上传相比的变化", expanded=True):
+        for sheet, result in report['sheets'].items():
+            if not result['changed']:
+                continue
+            if not result['comparable']:
+                st.markdown(f"**{sheet}**：无法按名称对齐，已整体替换")
+                continue
+            parts = []
+            if result['changed_cells']:
+                parts.append(f"修改 {result['changed_cells']} 个单元格（{result['changed_keys']} 行）")
+            if result['added_rows']:
+                parts.append(f"新增 {len(result['added_rows'])} 行")
+            if result['removed_rows']:
+                parts.append(f"删除 {len(result['removed_rows'])} 行")
+            if result['added_columns']:
+                parts.append(f"新增列：{'、'.join(result['added_columns'])}")
+            if result['removed_columns']:
+                parts.append(f"删除列：{'、'.join(result['removed_columns'])}")
+            st.markdown(f"**{sheet}**：" + "，".join(parts))
+        
+        changes = [result['changes'] for result in report['sheets'].values() if result['changes'] is not None]
+        if changes:
+            changes_df = pd.concat(changes, ignore_index=True)
+            changes_df[['原值', '新值']] = changes_df[['原值', '新值']].astype(str)
+            data_table.render_paginated_table(changes_df, key="revision_diff_table", filter_column='名称')
+        
+        revision_log = state_manager.get_revision_log()
+        if len(revision_log) > 1:
+            st.caption("修订记录：" + "；".join(
+                f"{record['time']} {record['file_name']}"
+                f"（{sum(item['changed_cells'] for item in record['summary'].values())} 个单元格）"
+                for record in reversed(revision_log)))
+
+
+def _render_sniff_preview(uploaded_file):
+    """显示快速探测到的工作表、周数和大致行数（无需完整解析）"""
+    try:
+        sniff_result = workbook_sniffer.sniff(uploaded_file)
+    except WorkbookSniffError:
+        return
+    
+    parts = [f"检测到工作表：{'、'.join(sniff_result['expected_sheets'])}"]
+    if sniff_result['week_count']:
+        parts.append(f"共 {sniff_result['week_count']} 周数据")
+    sales_rows = sniff_result['sheets'].get('销售回款数据统计', {}).get('approx_rows')
+    if sales_rows:
+        parts.append(f"销售数据约 {sales_rows} 行")
+    st.caption("🔎 " + " ｜ ".join(parts))
+
+
+def _render_ingest_report(*frames):
+    """显示导入报告：增量更新新增的周次、跳过的未使用列、类型规范化节省的内存和无法识别的数值单元格"""
+    unused_columns = []
+    saved_kb = 0.0
+    coercion_messages = []
+    for df in frames:
+        if df is None:
+            continue
+        unused_columns.extend(df.attrs.get('unused_columns', []))
+        report = df.attrs.get('schema_report')
+        if report:
+            saved_kb += report['saved_kb']
+            for column, detail in report['coercion_errors'].items():
+                rows = "、".join(f"第{sample['row']}行「{sample['value']}」" for sample in detail['samples'])
+                coercion_messages.append(f"{column}：{detail['count']} 个单元格（{rows}）")
+    
+    incremental = next((df.attrs['incremental'] for df in frames if df is not None and 'incremental' in df.attrs), None)
+    if incremental:
+        weeks = "、".join(f"第{week}周" for week in incremental['new_weeks'])
+        st.caption(f"ℹ️ 增量更新：新增{weeks}数据，只读取了新增周和月度汇总列")
+    if unused_columns:
+        preview = "、".join(unused_columns[:10]) + ("等" if len(unused_columns) > 10 else "")
+        st.caption(f"ℹ️ 已跳过 {len(unused_columns)} 个系统未使用的列：{preview}")
+    if saved_kb > 0:
+        st.caption(f"ℹ️ 数据类型规范化节省内存约 {saved_kb:,.1f} KB")
+    if coercion_messages:
+        st.warning("以下数值列中存在无法识别的内容，已按空值处理：\n\n" + "\n\n".join(coercion_messages))
+
+
+def _render_validation_report(score_df, sales_df, department_sales_df, ranking_df):
+    """显示数据校验报告：错误直接列出，警告折叠显示，均包含工作表、列和 Excel 行号"""
+    report = data_validator.build_report({
+        '员工积分数据': score_df,
+        '销售回款数据统计': sales_df,
+        '部门销售回款统计': department_sales_df,
+        '销售回款超期账款排名': ranking_df,
+    })
+    
+    errors = [issue for issue in report['issues'] if issue['severity'] == 'error']
+    warnings = [issue for issue in report['issues'] if issue['severity'] != 'error']
+    if errors:
+        st.error("数据校验发现以下错误，相关功能可能无法正常使用：\n\n"
+                 + "\n\n".join(data_validator.format_issue(issue) for issue in errors))
+    if warnings:
+        with st.expander(f"⚠️ 数据校验发现 {len(warnings)} 个问题，请核对源文件"):
+            for issue in warnings:
+                st.markdown(f"- {data_validator.format_issue(issue)}")
+    if not report['issues']:
+        st.caption("✅ 数据校验通过")
 
 
 def _render_data_summary(data_info: dict, department_sales_df=None, ranking_df=None):
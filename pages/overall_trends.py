@@ -5,12 +5,17 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import re
 import time
 from components.navigation import navigation
+from components.data_table import data_table
+from components.charts import charts
 from core.state_manager import state_manager
+from utils.downsampling import downsampler
+from utils.lazy_import import lazy_module
+
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
 
 
 def show():
@@ -105,9 +110,17 @@ def display_overall_trends(history_files):
         # 添加图例操作提示
         st.info("💡 提示：点击图例可以隐藏或显示对应的数据线")
         
+        # 趋势图时间范围，降采样结果按数据版本和时间范围缓存
+        visible_months = charts.select_month_range(sorted_months, key='overall_trend_range')
+        chart_df = trend_df[trend_df['月份'].isin(visible_months)]
+        chart_cache_key = (state_manager.get_data_version('history_files'), visible_months[0], visible_months[-1])
+        
         # 1. 总销售额月度变化趋势
         fig_sales = px.line(
-            trend_df, x='月份', y='总销售额(万元)',
+            downsampler.get_chart_data(chart_df, '总销售额(万元)', charts.get_point_budget('overall_sales'),
+                                       ('overall_sales',) + chart_cache_key),
+            x='月份', y='总销售额(万元)',
+            category_orders={'月份': visible_months},
             markers=True, title='总销售额月度变化趋势',
             color_discrete_sequence=['#0A84FF']
         )
@@ -125,7 +138,10 @@ def display_overall_trends(history_files):
 
         # 2. 总回款额月度变化趋势
         fig_payment = px.line(
-            trend_df, x='月份', y='总回款额(万元)',
+            downsampler.get_chart_data(chart_df, '总回款额(万元)', charts.get_point_budget('overall_payment'),
+                                       ('overall_payment',) + chart_cache_key),
+            x='月份', y='总回款额(万元)',
+            category_orders={'月份': visible_months},
             markers=True, title='总回款额月度变化趋势',
             color_discrete_sequence=['#BF5AF2']
         )
@@ -143,7 +159,10 @@ def display_overall_trends(history_files):
 
         # 3. 总逾期未收回额月度变化趋势
         fig_overdue = px.line(
-            trend_df, x='月份', y='总逾期未收回额(万元)',
+            downsampler.get_chart_data(chart_df, '总逾期未收回额(万元)', charts.get_point_budget('overall_overdue'),
+                                       ('overall_overdue',) + chart_cache_key),
+            x='月份', y='总逾期未收回额(万元)',
+            category_orders={'月份': visible_months},
             markers=True, title='总逾期未收回额月度变化趋势',
             color_discrete_sequence=['#FF453A']
         )
@@ -173,7 +192,7 @@ def display_overall_trends(history_files):
 
 
 def calculate_growth_rate(df):
-    """计算环比增长率"""
+    """计算环比增长率（数值，单位为百分比）"""
     df = df.copy()
     
     # 为需要计算增长率的列添加环比增长率列
@@ -181,40 +200,17 @@ def calculate_growth_rate(df):
     
     for col in growth_columns:
         growth_col = f"{col}环比增长率"
-        df[growth_col] = df[col].pct_change() * 100
-        # 第一行设为空值
-        df.loc[0, growth_col] = None
-        # 格式化为百分比字符串
-        df[growth_col] = df[growth_col].apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "")
+        prev_values = df[col].shift(1)
+        # 第一行及上月为0时设为空值
+        growth_rates = (df[col] / prev_values.where(prev_values != 0) - 1) * 100
+        df[growth_col] = growth_rates.round(1)
     
     return df
 
 
 def display_styled_dataframe(df):
     """显示带条件格式的数据表"""
-    def apply_growth_color(val):
-        """为增长率列应用颜色格式"""
-        if val == "" or pd.isna(val):
-            return ""
-        try:
-            # 提取数值部分
-            num_val = float(val.replace('%', ''))
-            if num_val > 0:
-                return "color: green; font-weight: bold"
-            else:
-                return "color: red; font-weight: bold"
-        except:
-            return ""
-    
-    # 获取环比增长率列
-    growth_columns = [col for col in df.columns if '环比增长率' in col]
-    
-    # 应用样式
-    styled_df = df.style
-    for col in growth_columns:
-        styled_df = styled_df.applymap(apply_growth_color, subset=[col])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    data_table.render_growth_table(df)
 
 
 def display_specific_metric_table(df, metric_column):
@@ -226,26 +222,4 @@ def display_specific_metric_table(df, metric_column):
     if growth_column in df.columns:
         columns_to_show.append(growth_column)
     
-    # 创建显示用的数据框
-    display_df = df[columns_to_show].copy()
-    
-    def apply_growth_color(val):
-        """为增长率列应用颜色格式"""
-        if val == "" or pd.isna(val):
-            return ""
-        try:
-            # 提取数值部分
-            num_val = float(val.replace('%', ''))
-            if num_val > 0:
-                return "color: green; font-weight: bold"
-            else:
-                return "color: red; font-weight: bold"
-        except:
-            return ""
-    
-    # 应用样式
-    styled_df = display_df.style
-    if growth_column in display_df.columns:
-        styled_df = styled_df.applymap(apply_growth_color, subset=[growth_column])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True) 
\ No newline at end of file
+    data_table.render_growth_table(df[columns_to_show])
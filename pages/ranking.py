@@ -5,11 +5,16 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from components.navigation import navigation
 from components.ui_components import ui
+from components.charts import charts, OTHERS_FLAG_COLUMN
 from core.state_manager import state_manager
+from core.instrumentation import instrumentation
+from config.display_config import RANKING_TOP_N, RANKING_BOTTOM_N, RANKING_OTHERS_COLOR, BAR_TEXT_MAX_BARS
+from utils.lazy_import import lazy_module
+
+go = lazy_module("plotly.graph_objects")
+px = lazy_module("plotly.express")
 
 
 def show():
@@ -65,234 +70,52 @@ def _render_header_with_help():
     )
 
 
+@instrumentation.instrument()
 def _display_weekly_sales_chart(df):
     """显示周销售额柱状图"""
     st.markdown('<h3 class="section-title fade-in">📊 周销售额排名</h3>', unsafe_allow_html=True)
-    
-    # 检查是否有排名类型列
-    if '排名类型' not in df.columns:
-        st.info("数据格式不正确，缺少'排名类型'列")
-        return
-    
-    # 查找周销售额相关的排名类型
-    week_sales_types = []
-    for ranking_type in df['排名类型'].dropna().unique():
-        if '周销售额' in str(ranking_type):
-            week_sales_types.append(ranking_type)
-    
-    if not week_sales_types:
-        st.info("暂无周销售额数据")
-        return
-    
-    # 创建标签页
-    tab_names = [str(ranking_type).replace('销售额', '') for ranking_type in week_sales_types]
-    tabs = st.tabs(tab_names)
-    
-    for i, (tab, ranking_type) in enumerate(zip(tabs, week_sales_types)):
-        with tab:
-            # 过滤该排名类型的数据
-            type_data = df[df['排名类型'] == ranking_type].copy()
-            
-            if type_data.empty:
-                st.info(f"{ranking_type}暂无有效数据")
-                continue
-            
-            # 检查必要的列
-            name_col = '姓名' if '姓名' in type_data.columns else ('员工姓名' if '员工姓名' in type_data.columns else None)
-            amount_col = '金额' if '金额' in type_data.columns else None
-            
-            if not name_col or not amount_col:
-                st.info(f"{ranking_type}数据格式不正确，缺少姓名或金额列")
-                continue
-            
-            # 过滤有效数据并排序（包含0值）
-            valid_data = type_data[type_data[amount_col].notna() & (type_data[amount_col] >= 0)].copy()
-            if valid_data.empty:
-                st.info(f"{ranking_type}暂无有效数据")
-                continue
-                
-            valid_data = valid_data.sort_values(amount_col, ascending=False)  # 展示所有有效数据
-            
-            # 准备显示文本和颜色
-            display_texts = []
-            colors = []
-            total_count = len(valid_data)
-            
-            for idx, val in enumerate(valid_data[amount_col]):
-                text = f"{val/10000:.1f}万"
-                
-                # 为0值添加警示图标
-                if val == 0:
-                    if idx == 0:  # 第一名且为0
-                        text = f"🥇⚠️ {text}"
-                        colors.append('#FFD700')  # 金色
-                    elif idx == 1:  # 第二名且为0
-                        text = f"🥈⚠️ {text}"
-                        colors.append('#C0C0C0')  # 银色
-                    elif idx == 2:  # 第三名且为0
-                        text = f"🥉⚠️ {text}"
-                        colors.append('#CD7F32')  # 铜色
-                    else:  # 其他名次且为0
-                        text = f"⚠️ {text}"
-                        colors.append('#FF9500')  # 橙色警示
-                else:
-                    # 非0值的正常逻辑
-                    if idx == 0:  # 第一名
-                        text = f"🥇 {text}"
-                        colors.append('#FFD700')  # 金色
-                    elif idx == 1:  # 第二名
-                        text = f"🥈 {text}"
-                        colors.append('#C0C0C0')  # 银色
-                    elif idx == 2:  # 第三名
-                        text = f"🥉 {text}"
-                        colors.append('#CD7F32')  # 铜色
-                    elif total_count >= 6 and idx >= total_count - 3:  # 后三名（总人数>=6时）
-                        text = f"⚠️ {text}"
-                        colors.append('#FF9500')  # 橙色警示
-                    else:
-                        colors.append('#0A84FF')  # 默认蓝色
-                
-                display_texts.append(text)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=valid_data[name_col],
-                y=valid_data[amount_col],
-                name=str(ranking_type),
-                marker_color=colors,
-                text=display_texts,
-                textposition='outside'
-            ))
-            
-            fig.update_layout(
-                title=f"{ranking_type}排名榜 (共{total_count}人)",
-                title_font=dict(size=20, color='#1D1D1F'),
-                xaxis_title='员工姓名',
-                yaxis_title='销售额(元)',
-                height=max(500, total_count * 25),  # 根据人数调整高度
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#1D1D1F'),
-                xaxis=dict(tickangle=45)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+    _display_weekly_ranking_tabs(df, '周销售额', '销售额', '销售额(元)', '#0A84FF')
 
 
+@instrumentation.instrument()
 def _display_weekly_payment_chart(df):
     """显示周回款合计柱状图"""
     st.markdown('<h3 class="section-title fade-in">💰 周回款合计排名</h3>', unsafe_allow_html=True)
-    
+    _display_weekly_ranking_tabs(df, '周回款合计', '回款合计', '回款额(元)', '#30D158')
+
+
+def _display_weekly_ranking_tabs(df, type_keyword, tab_suffix, y_label, color):
+    """按排名类型分标签页显示周排名柱状图"""
     # 检查是否有排名类型列
     if '排名类型' not in df.columns:
         st.info("数据格式不正确，缺少'排名类型'列")
         return
     
-    # 查找周回款合计相关的排名类型
-    week_payment_types = []
-    for ranking_type in df['排名类型'].dropna().unique():
-        if '周回款合计' in str(ranking_type):
-            week_payment_types.append(ranking_type)
+    # 查找相关的排名类型
+    week_types = [ranking_type for ranking_type in df['排名类型'].dropna().unique()
+                  if type_keyword in str(ranking_type)]
     
-    if not week_payment_types:
-        st.info("暂无周回款合计数据")
+    if not week_types:
+        st.info(f"暂无{type_keyword}数据")
         return
     
     # 创建标签页
-    tab_names = [str(ranking_type).replace('回款合计', '') for ranking_type in week_payment_types]
+    tab_names = [str(ranking_type).replace(tab_suffix, '') for ranking_type in week_types]
     tabs = st.tabs(tab_names)
     
-    for i, (tab, ranking_type) in enumerate(zip(tabs, week_payment_types)):
+    for tab, ranking_type in zip(tabs, week_types):
         with tab:
             # 过滤该排名类型的数据
-            type_data = df[df['排名类型'] == ranking_type].copy()
+            type_data = df[df['排名类型'] == ranking_type]
             
             if type_data.empty:
                 st.info(f"{ranking_type}暂无有效数据")
                 continue
             
-            # 检查必要的列
-            name_col = '姓名' if '姓名' in type_data.columns else ('员工姓名' if '员工姓名' in type_data.columns else None)
-            amount_col = '金额' if '金额' in type_data.columns else None
-            
-            if not name_col or not amount_col:
-                st.info(f"{ranking_type}数据格式不正确，缺少姓名或金额列")
-                continue
-            
-            # 过滤有效数据并排序（包含0值）
-            valid_data = type_data[type_data[amount_col].notna() & (type_data[amount_col] >= 0)].copy()
-            if valid_data.empty:
-                st.info(f"{ranking_type}暂无有效数据")
-                continue
-                
-            valid_data = valid_data.sort_values(amount_col, ascending=False)  # 展示所有有效数据
-            
-            # 准备显示文本和颜色
-            display_texts = []
-            colors = []
-            total_count = len(valid_data)
-            
-            for idx, val in enumerate(valid_data[amount_col]):
-                text = f"{val/10000:.1f}万"
-                
-                # 为0值添加警示图标
-                if val == 0:
-                    if idx == 0:  # 第一名且为0
-                        text = f"🥇⚠️ {text}"
-                        colors.append('#FFD700')  # 金色
-                    elif idx == 1:  # 第二名且为0
-                        text = f"🥈⚠️ {text}"
-                        colors.append('#C0C0C0')  # 银色
-                    elif idx == 2:  # 第三名且为0
-                        text = f"🥉⚠️ {text}"
-                        colors.append('#CD7F32')  # 铜色
-                    else:  # 其他名次且为0
-                        text = f"⚠️ {text}"
-                        colors.append('#FF9500')  # 橙色警示
-                else:
-                    # 非0值的正常逻辑
-                    if idx == 0:  # 第一名
-                        text = f"🥇 {text}"
-                        colors.append('#FFD700')  # 金色
-                    elif idx == 1:  # 第二名
-                        text = f"🥈 {text}"
-                        colors.append('#C0C0C0')  # 银色
-                    elif idx == 2:  # 第三名
-                        text = f"🥉 {text}"
-                        colors.append('#CD7F32')  # 铜色
-                    elif total_count >= 6 and idx >= total_count - 3:  # 后三名（总人数>=6时）
-                        text = f"⚠️ {text}"
-                        colors.append('#FF9500')  # 橙色警示
-                    else:
-                        colors.append('#30D158')  # 默认绿色
-                
-                display_texts.append(text)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=valid_data[name_col],
-                y=valid_data[amount_col],
-                name=str(ranking_type),
-                marker_color=colors,
-                text=display_texts,
-                textposition='outside'
-            ))
-            
-            fig.update_layout(
-                title=f"{ranking_type}排名榜 (共{total_count}人)",
-                title_font=dict(size=20, color='#1D1D1F'),
-                xaxis_title='员工姓名',
-                yaxis_title='回款额(元)',
-                height=max(500, total_count * 25),  # 根据人数调整高度
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#1D1D1F'),
-                xaxis=dict(tickangle=45)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            _display_single_ranking_chart(type_data, ranking_type, y_label, color)
 
 
+@instrumentation.instrument()
 def _display_monthly_data_chart(df):
     """显示月度数据对比柱状图"""
     st.markdown('<h3 class="section-title fade-in">📈 月度销售回款对比</h3>', unsafe_allow_html=True)
@@ -340,10 +163,34 @@ def _display_monthly_data_chart(df):
         _display_single_ranking_chart(payment_data, monthly_payment_type, '回款额(元)', '#30D158')
 
 
+def _get_rank_style(idx, val, total_count, color):
+    """根据名次和数值获取柱子的标记文本前缀和颜色"""
+    medals = {0: ('🥇', '#FFD700'), 1: ('🥈', '#C0C0C0'), 2: ('🥉', '#CD7F32')}
+    
+    # 为0值添加警示图标
+    if val == 0:
+        if idx in medals:
+            medal, medal_color = medals[idx]
+            return f"{medal}⚠️ ", medal_color
+        return "⚠️ ", '#FF9500'  # 橙色警示
+    
+    # 非0值的正常逻辑
+    if idx in medals:
+        medal, medal_color = medals[idx]
+        return f"{medal} ", medal_color
+    if total_count >= 6 and idx >= total_count - 3:  # 后三名（总人数>=6时）
+        return "⚠️ ", '#FF9500'  # 橙色警示
+    return "", color  # 默认颜色
+
+
 def _display_single_ranking_chart(data, ranking_type, y_label, color):
-    """显示单一排名图表"""
+    """
+    显示单一排名图表
+    
+    人数较多时默认只显示前N名和后N名，中间人员合并为一条平均值柱，可勾选展开全部
+    """
     # 检查必要的列
-    name_col = '姓名' if '姓名' in data.columns else ('员工姓名' if '员工姓名' in data.columns else None)
+    name_col = '姓名' if '姓名' in data.columns else None
     amount_col = '金额' if '金额' in data.columns else None
     
     if not name_col or not amount_col:
@@ -351,7 +198,7 @@ def _display_single_ranking_chart(data, ranking_type, y_label, color):
         return
     
     # 过滤有效数据并排序（包含0值）
-    valid_data = data[data[amount_col].notna() & (data[amount_col] >= 0)].copy()
+    valid_data = data[data[amount_col].notna() & (data[amount_col] >= 0)]
     if valid_data.empty:
         st.info(f"{ranking_type}暂无有效数据")
         return
@@ -359,62 +206,50 @@ def _display_single_ranking_chart(data, ranking_type, y_label, color):
     valid_data = valid_data.sort_values(amount_col, ascending=False)
     total_count = len(valid_data)
     
+    # 人数较多时截取前后名次
+    show_all = charts.render_expand_toggle(total_count, key=f"ranking_expand_{ranking_type}")
+    if show_all:
+        display_data, others_count = charts.select_top_bottom(valid_data, amount_col, name_col, max_bars=total_count)
+    else:
+        display_data, others_count = charts.select_top_bottom(valid_data, amount_col, name_col)
+    
     # 准备显示文本和颜色
     display_texts = []
     colors = []
     
-    for idx, val in enumerate(valid_data[amount_col]):
+    for rank, val, is_others in zip(display_data['_rank'], display_data[amount_col], display_data[OTHERS_FLAG_COLUMN]):
         text = f"{val/10000:.1f}万"
-        
-        # 为0值添加警示图标
-        if val == 0:
-            if idx == 0:  # 第一名且为0
-                text = f"🥇⚠️ {text}"
-                colors.append('#FFD700')  # 金色
-            elif idx == 1:  # 第二名且为0
-                text = f"🥈⚠️ {text}"
-                colors.append('#C0C0C0')  # 银色
-            elif idx == 2:  # 第三名且为0
-                text = f"🥉⚠️ {text}"
-                colors.append('#CD7F32')  # 铜色
-            else:  # 其他名次且为0
-                text = f"⚠️ {text}"
-                colors.append('#FF9500')  # 橙色警示
+        if is_others:
+            prefix, bar_color = "", RANKING_OTHERS_COLOR
         else:
-            # 非0值的正常逻辑
-            if idx == 0:  # 第一名
-                text = f"🥇 {text}"
-                colors.append('#FFD700')  # 金色
-            elif idx == 1:  # 第二名
-                text = f"🥈 {text}"
-                colors.append('#C0C0C0')  # 银色
-            elif idx == 2:  # 第三名
-                text = f"🥉 {text}"
-                colors.append('#CD7F32')  # 铜色
-            elif total_count >= 6 and idx >= total_count - 3:  # 后三名（总人数>=6时）
-                text = f"⚠️ {text}"
-                colors.append('#FF9500')  # 橙色警示
-            else:
-                colors.append(color)  # 默认颜色
-        
-        display_texts.append(text)
+            prefix, bar_color = _get_rank_style(rank, val, total_count, color)
+        display_texts.append(f"{prefix}{text}")
+        colors.append(bar_color)
+    
+    bar_count = len(display_data)
+    show_text = bar_count <= BAR_TEXT_MAX_BARS
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
-        x=valid_data[name_col],
-        y=valid_data[amount_col],
+        x=display_data[name_col],
+        y=display_data[amount_col],
         name=str(ranking_type),
         marker_color=colors,
-        text=display_texts,
+        text=display_texts if show_text else None,
+        hovertext=None if show_text else display_texts,
         textposition='outside'
     ))
     
+    title = f"{ranking_type}排名榜 (共{total_count}人)"
+    if others_count:
+        title += f" - 显示前{RANKING_TOP_N}名与后{RANKING_BOTTOM_N}名"
+    
     fig.update_layout(
-        title=f"{ranking_type}排名榜 (共{total_count}人)",
+        title=title,
         title_font=dict(size=20, color='#1D1D1F'),
         xaxis_title='员工姓名',
         yaxis_title=y_label,
-        height=max(500, total_count * 25),
+        height=max(500, bar_count * 25),  # 根据柱子数量调整高度
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
         font=dict(color='#1D1D1F'),
@@ -425,6 +260,7 @@ def _display_single_ranking_chart(data, ranking_type, y_label, color):
 
 
 
+@instrumentation.instrument()
 def _display_overdue_warning_chart(df):
     """显示逾期清收失职警示榜"""
     st.markdown('<h3 class="section-title fade-in">⚠️ 逾期清收失职警示榜</h3>', unsafe_allow_html=True)
@@ -454,7 +290,7 @@ def _display_overdue_warning_chart(df):
         return
     
     # 检查必要的列
-    name_col = '姓名' if '姓名' in type_data.columns else ('员工姓名' if '员工姓名' in type_data.columns else None)
+    name_col = '姓名' if '姓名' in type_data.columns else None
     amount_col = '金额' if '金额' in type_data.columns else None
     
     if not name_col or not amount_col:
@@ -470,19 +306,31 @@ def _display_overdue_warning_chart(df):
     
     # 按逾期金额倒序排列
     warning_data = warning_data.sort_values(amount_col, ascending=False)
+    warning_count = len(warning_data)
+    
+    # 人数较多时只显示逾期金额最高的人员，其余合并为平均值柱
+    if charts.render_expand_toggle(warning_count, key="ranking_expand_overdue"):
+        warning_data, _ = charts.select_top_bottom(warning_data, amount_col, name_col, max_bars=warning_count)
+    else:
+        warning_data, _ = charts.select_top_bottom(warning_data, amount_col, name_col,
+                                                   top_n=RANKING_TOP_N + RANKING_BOTTOM_N, bottom_n=0)
     
     # 创建警示色彩 - 金额越高颜色越红
     max_overdue = warning_data[amount_col].max()
     colors = []
-    for val in warning_data[amount_col]:
+    for val, is_others in zip(warning_data[amount_col], warning_data[OTHERS_FLAG_COLUMN]):
         intensity = val / max_overdue
-        if intensity > 0.7:
+        if is_others:
+            colors.append(RANKING_OTHERS_COLOR)  # 合并的其余人员
+        elif intensity > 0.7:
             colors.append('#FF3B30')  # 深红色 - 严重
         elif intensity > 0.4:
             colors.append('#FF9500')  # 橙色 - 警告
         else:
             colors.append('#FFCC00')  # 黄色 - 注意
     
+    show_text = len(warning_data) <= BAR_TEXT_MAX_BARS
+    
     fig = go.Figure()
     
     fig.add_trace(go.Bar(
@@ -490,13 +338,13 @@ def _display_overdue_warning_chart(df):
         y=warning_data[amount_col],
         name='逾期未收回额',
         marker_color=colors,
-        text=[f"{val/10000:.1f}万" for val in warning_data[amount_col]],
+        text=[f"{val/10000:.1f}万" for val in warning_data[amount_col]] if show_text else None,
         textposition='outside',
         hovertemplate='<b>%{x}</b><br>逾期未收回额: %{y:,.0f}元<extra></extra>'
     ))
     
     fig.update_layout(
-        title=f'逾期清收失职警示榜 - {overdue_type}',
+        title=f'逾期清收失职警示榜 - {overdue_type} (共{warning_count}人)',
         title_font=dict(size=22, color='#FF3B30'),
         xaxis_title='员工姓名',
         yaxis_title='逾期金额(元)',
@@ -5,8 +5,6 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import json
 import numpy as np
 import re
@@ -14,6 +12,12 @@ from html import escape
 from components.navigation import navigation
 from components.ui_components import ui
 from core.state_manager import state_manager
+from core.instrumentation import instrumentation
+from utils.lazy_import import lazy_module
+from utils.incremental import incremental_ingestor
+
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
 
 
 def show():
@@ -46,6 +50,7 @@ def show():
     display_sales_employee_details(sales_df)
 
 
+@instrumentation.instrument()
 def display_sales_overview(sales_df):
     """显示销售概览"""
     if sales_df is None or sales_df.empty:
@@ -57,10 +62,12 @@ def display_sales_overview(sales_df):
     filtered_df = sales_df[sales_df['员工姓名'] != '合计'].copy()
     filtered_df = filtered_df[filtered_df['员工姓名'].notna()]
 
+    # 各周合计（增量导入时只计算新增的周）
+    week_sums = incremental_ingestor.get_week_sums(sales_df)
+
     # 辅助函数：检测可用周次
     def get_available_weeks(df):
         """检测数据中可用的周次"""
-        import re
         week_pattern = r'第(\d+)周销售额'
         available_weeks = []
         for col in df.columns:
@@ -69,7 +76,7 @@ def display_sales_overview(sales_df):
                 week_num = int(match.group(1))
                 # 检查该周是否有实际数据
                 week_col = f'第{week_num}周销售额'
-                if week_col in df.columns and df[week_col].sum() > 0:
+                if week_sums.get(week_col, 0) > 0:
                     available_weeks.append(week_num)
         return sorted(set(available_weeks))
 
@@ -82,8 +89,7 @@ def display_sales_overview(sales_df):
         cumulative_amount = 0
         for w in range(1, week_num + 1):
             week_col = f"{week_prefix}{w}周销售额" if "销售" in week_prefix else f"{week_prefix}{w}周回款合计"
-            if week_col in df.columns:
-                cumulative_amount += df[week_col].sum()
+            cumulative_amount += week_sums.get(week_col, 0)
         
         total_task = df[task_col].sum()
         return (cumulative_amount / total_task * 100) if total_task > 0 else 0
@@ -493,6 +499,7 @@ def display_sales_overview(sales_df):
 
 
 
+@instrumentation.instrument()
 def display_weekly_analysis(sales_df):
     """显示周分析"""
     if sales_df is None or sales_df.empty:
@@ -500,37 +507,14 @@ def display_weekly_analysis(sales_df):
 
     st.markdown('<h3 class="section-title fade-in">📅 周数据分析</h3>', unsafe_allow_html=True)
 
-    # 排除合计行
-    filtered_df = sales_df[sales_df['员工姓名'] != '合计'].copy()
-    filtered_df = filtered_df[filtered_df['员工姓名'].notna()]
+    # 各周合计（使用Excel中原始数据，只转换单位）
+    weekly_totals = get_weekly_totals(sales_df, state_manager.get_data_version('sales_df'))
 
-    # 动态检测所有周数据
-    week_pattern = r'第(\d+)周销售额'
-    available_weeks = []
-    for col in filtered_df.columns:
-        match = re.match(week_pattern, col)
-        if match:
-            week_num = int(match.group(1))
-            available_weeks.append(week_num)
-    
-    available_weeks = sorted(set(available_weeks))
-
-    if available_weeks:
-        # 使用Excel中原始数据，只转换单位
-        weekly_totals = {}
-        for week_num in available_weeks:
-            sales_col = f'第{week_num}周销售额'
-            payment_col = f'第{week_num}周回款合计'
-            if sales_col in filtered_df.columns and payment_col in filtered_df.columns:
-                weekly_totals[f'第{week_num}周'] = {
-                    '销售额(万元)': filtered_df[sales_col].sum() / 10000,
-                    '回款额(万元)': filtered_df[payment_col].sum() / 10000
-                }
-        
-        if weekly_totals:
-            weeks = list(weekly_totals.keys())
-            sales_values = [weekly_totals[week]['销售额(万元)'] for week in weeks]
-            payment_values = [weekly_totals[week]['回款额(万元)'] for week in weeks]
+    if weekly_totals is not None:
+        if not weekly_totals.empty:
+            weeks = weekly_totals['周次'].tolist()
+            sales_values = weekly_totals['销售额(万元)'].tolist()
+            payment_values = weekly_totals['回款额(万元)'].tolist()
             
             fig = go.Figure()
             fig.add_trace(go.Scatter(
@@ -566,30 +550,91 @@ def display_weekly_analysis(sales_df):
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("**各周销售额汇总**")
-                week_sales_data = []
-                for week, data in weekly_totals.items():
-                    formatted_sales = ui.format_amount(data['销售额(万元)'])
-                    week_sales_data.append({
-                        '周次': week,
-                        '销售额': formatted_sales
-                    })
-                week_sales_df = pd.DataFrame(week_sales_data)
+                week_sales_df = pd.DataFrame({
+                    '周次': weeks,
+                    '销售额': [ui.format_amount(value) for value in sales_values]
+                })
                 st.dataframe(week_sales_df, use_container_width=True, hide_index=True)
             with col2:
                 st.markdown("**各周回款额汇总**")
-                week_payment_data = []
-                for week, data in weekly_totals.items():
-                    formatted_payment = ui.format_amount(data['回款额(万元)'])
-                    week_payment_data.append({
-                        '周次': week,
-                        '回款额': formatted_payment
-                    })
-                week_payment_df = pd.DataFrame(week_payment_data)
+                week_payment_df = pd.DataFrame({
+                    '周次': weeks,
+                    '回款额': [ui.format_amount(value) for value in payment_values]
+                })
                 st.dataframe(week_payment_df, use_container_width=True, hide_index=True)
     else:
         st.info("当前数据中没有周数据信息")
 
 
+def compute_weekly_totals(sales_df):
+    """
+    计算各周销售额与回款额合计（排除合计行，单位万元）
+    
+    Args:
+        sales_df: 销售回款数据
+        
+    Returns:
+        包含 周次、销售额(万元)、回款额(万元) 列的DataFrame（按周次排序）；
+        数据中没有任何周销售额列时返回None
+    """
+    # 排除合计行
+    filtered_df = sales_df[(sales_df['员工姓名'] != '合计') & sales_df['员工姓名'].notna()]
+
+    # 动态检测所有周数据
+    week_pattern = r'第(\d+)周销售额'
+    available_weeks = sorted({int(match.group(1)) for col in filtered_df.columns
+                              if (match := re.match(week_pattern, str(col)))})
+    if not available_weeks:
+        return None
+
+    # 同时存在销售额和回款合计列的周次
+    weeks = [week_num for week_num in available_weeks
+             if f'第{week_num}周回款合计' in filtered_df.columns]
+    sales_cols = [f'第{week_num}周销售额' for week_num in weeks]
+    payment_cols = [f'第{week_num}周回款合计' for week_num in weeks]
+
+    # 各周合计（增量导入时只计算新增的周）
+    week_sums = incremental_ingestor.get_week_sums(sales_df)
+    return pd.DataFrame({
+        '周次': [f'第{week_num}周' for week_num in weeks],
+        '销售额(万元)': np.array([week_sums.get(col, 0.0) for col in sales_cols]) / 10000,
+        '回款额(万元)': np.array([week_sums.get(col, 0.0) for col in payment_cols]) / 10000
+    })
+
+
+def get_weekly_totals(sales_df, data_version):
+    """
+    获取各周合计（按数据版本缓存）
+    
+    Args:
+        sales_df: 销售回款数据
+        data_version: sales_df 的数据版本
+        
+    Returns:
+        同 compute_weekly_totals
+    """
+    return _cached_weekly_totals(data_version, sales_df)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_weekly_totals(data_version, _sales_df):
+    """各周合计缓存（数据本身不参与哈希，由数据版本标识）"""
+    return compute_weekly_totals(_sales_df)
+
+
+def warm_up(data, versions):
+    """
+    页面预加载钩子：后台预先计算各周合计缓存
+    
+    Args:
+        data: 页面所需的数据（数据键 -> DataFrame）
+        versions: 数据版本（数据键 -> 版本号）
+    """
+    sales_df = data.get('sales_df')
+    if sales_df is not None and not sales_df.empty:
+        get_weekly_totals(sales_df, versions['sales_df'])
+
+
 def get_progress_color(progress):
     """根据完成进度获取颜色"""
     if progress >= 1.0:
@@ -600,6 +645,7 @@ def get_progress_color(progress):
         return "#FF453A"  # 红色
 
 
+@instrumentation.instrument()
 def display_achievement_badges(sales_df):
     """显示成就徽章"""
     if sales_df is None or sales_df.empty:
@@ -758,25 +804,12 @@ def display_achievement_badges(sales_df):
         progress_scores = []
         
         # 检查所需列是否存在
-        required_cols = ['本月销售额', '本月回款合计']
-        last_month_sales_cols = ['上月销售额', '上月销售额参考']  # 可能的列名
-        last_month_payment_cols = ['上月回款额', '上月回款额参考']  # 可能的列名
-        
-        # 找到实际存在的上月数据列
-        last_sales_col = None
-        last_payment_col = None
-        
-        for col in last_month_sales_cols:
-            if col in filtered_df.columns:
-                last_sales_col = col
-                break
-                
-        for col in last_month_payment_cols:
-            if col in filtered_df.columns:
-                last_payment_col = col
-                break
-        
-        if all(col in filtered_df.columns for col in required_cols) and last_sales_col and last_payment_col:
+        # 上月数据列的别名在导入时已统一为标准列名
+        required_cols = ['本月销售额', '本月回款合计', '上月销售额', '上月回款额']
+        last_sales_col = '上月销售额'
+        last_payment_col = '上月回款额'
+
+        if all(col in filtered_df.columns for col in required_cols):
             for idx, row in filtered_df.iterrows():
                 # 获取本月和上月数据
                 current_sales = row.get('本月销售额', 0)
@@ -833,6 +866,7 @@ def display_achievement_badges(sales_df):
             """, unsafe_allow_html=True)
 
 
+@instrumentation.instrument()
 def display_sales_employee_details(sales_df):
     """销售回款相关的员工详情"""
     if sales_df is None or sales_df.shape[0] == 0:
@@ -5,12 +5,14 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 from html import escape
 from components.navigation import navigation
 from components.ui_components import ui
 from core.state_manager import state_manager
 from utils.data_loader import data_loader
+from utils.lazy_import import lazy_module
+
+go = lazy_module("plotly.graph_objects")
 
 
 def show():
@@ -0,0 +1,87 @@
+"""
+Arrow 数据表转换
+沙箱解析结果的传输（Arrow IPC）和会话快照的存储（Parquet）共用的数据表转换，不使用 pickle：
+反序列化 pickle 会执行数据中携带的任意代码，解析不可信文件的子进程传回的数据和磁盘上的文件都不能用 pickle 读回
+"""
+
+from typing import List
+
+import pandas as pd
+
+
+class ArrowCodec:
+    """Arrow 数据表转换类"""
+
+    @staticmethod
+    def _stringify(series: pd.Series) -> pd.Series:
+        """将列中的非空值转换为文本，空值保持为空"""
+        return series.astype(str).where(series.notna(), None)
+
+    @staticmethod
+    def _find_mixed_columns(df: pd.DataFrame) -> List[str]:
+        """查找无法直接转换为 Arrow 的对象列（如同一列中既有数字又有文本）"""
+        import pyarrow as pa
+
+        mixed = []
+        for column in df.columns[df.dtypes == object]:
+            try:
+                pa.array(df[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                mixed.append(column)
+        return mixed
+
+    @staticmethod
+    def to_table(df: pd.DataFrame, preserve_index: bool = False):
+        """
+        将数据表转换为 Arrow 表
+
+        非字符串列名转换为字符串，混合类型的对象列转换为文本；df.attrs 随 pandas 元数据保存。
+
+        Args:
+            df: 数据表
+            preserve_index: 是否保存行索引
+
+        Returns:
+            pyarrow.Table
+
+        Raises:
+            ValueError: 列名（转换为字符串后）重复
+        """
+        import pyarrow as pa
+
+        if not all(isinstance(column, str) for column in df.columns):
+            df = df.set_axis([str(column) for column in df.columns], axis=1)
+        if not df.columns.is_unique:
+            duplicated = sorted(set(df.columns[df.columns.duplicated()]))
+            raise ValueError(f"列名重复：{', '.join(duplicated)}")
+
+        try:
+            return pa.Table.from_pandas(df, preserve_index=preserve_index)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            mixed = ArrowCodec._find_mixed_columns(df)
+            if not mixed:
+                raise
+        df = df.assign(**{column: ArrowCodec._stringify(df[column]) for column in mixed})
+        return pa.Table.from_pandas(df, preserve_index=preserve_index)
+
+    @staticmethod
+    def serialize(df: pd.DataFrame) -> bytes:
+        """将数据表序列化为 Arrow IPC 流"""
+        import pyarrow as pa
+
+        table = ArrowCodec.to_table(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def deserialize(data: bytes) -> pd.DataFrame:
+        """从 Arrow IPC 流还原数据表（含 df.attrs）"""
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(pa.py_buffer(data)).read_all().to_pandas()
+
+
+# 全局 Arrow 数据表转换实例
+arrow_codec = ArrowCodec()
@@ -6,9 +6,20 @@
 import pandas as pd
 import streamlit as st
 import os
+import re
 import glob
+import hashlib
 import warnings
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Callable, Dict, List
+from core.instrumentation import instrumentation
+from config.column_config import ROUTE_COLUMN_USAGE, COMMON_COLUMN_USAGE, EXTRA_COLUMNS, COLUMN_PRUNING_ENV
+from config.ingestion_config import DATA_DIR_ENV, DEFAULT_DATA_DIR, DATA_FILE_PATTERN
+from utils.schema import schema_normalizer
+from utils.validation import data_validator
+from utils.workbook_sniffer import workbook_sniffer, WorkbookSniffError, EXPECTED_SHEETS
+
+# 计算文件哈希时每次读取的字节数
+CONTENT_HASH_CHUNK_SIZE = 1024 * 1024
 
 # 忽略警告
 warnings.filterwarnings('ignore')
@@ -21,16 +32,84 @@ LAST_MONTH_PAYMENT_COL = "上月回款额"
 class DataLoader:
     """数据加载器类"""
     
+    @staticmethod
+    def get_used_columns(sheet_name: str, extra_columns: Optional[Dict[str, List[str]]] = None) -> Tuple[set, list]:
+        """
+        获取工作表中被页面使用的列（所有页面声明的列、公共列和额外保留列的并集）
+        
+        Args:
+            sheet_name: 工作表名称
+            extra_columns: 额外保留的列，工作表 -> 列名列表
+            
+        Returns:
+            (列名集合, 列名正则列表)
+        """
+        columns, patterns = set(), []
+        usages = [COMMON_COLUMN_USAGE] + list(ROUTE_COLUMN_USAGE.values())
+        for usage in usages:
+            sheet_usage = usage.get(sheet_name, {})
+            columns.update(sheet_usage.get('columns', []))
+            patterns.extend(sheet_usage.get('patterns', []))
+        for extra in (EXTRA_COLUMNS, extra_columns or {}):
+            columns.update(extra.get(sheet_name, []))
+        # 标准列名的别名和派生列的来源列也需要读取
+        columns.update(schema_normalizer.get_alias_columns(sheet_name))
+        return columns, [re.compile(pattern) for pattern in dict.fromkeys(patterns)]
+    
+    @staticmethod
+    def _make_column_filter(sheet_name: str, unused_columns: list,
+                            extra_columns: Optional[Dict[str, List[str]]] = None,
+                            only_columns: Optional[set] = None) -> Optional[Callable[[str], bool]]:
+        """
+        生成 read_excel 的 usecols 过滤函数，未使用的列名记录到 unused_columns
+        
+        指定 only_columns 时只读取其中的列（增量导入）；列裁剪被关闭且未指定 only_columns 时返回None（读取全部列）
+        """
+        pruning = os.environ.get(COLUMN_PRUNING_ENV, '1') != '0'
+        if not pruning and only_columns is None:
+            return None
+        columns, patterns = DataLoader.get_used_columns(sheet_name, extra_columns)
+        
+        def column_filter(column) -> bool:
+            name = str(column).strip()
+            if only_columns is not None and name not in only_columns:
+                return False
+            if not pruning or name in columns or any(pattern.search(name) for pattern in patterns):
+                return True
+            unused_columns.append(str(column))
+            return False
+        
+        return column_filter
+    
+    @staticmethod
+    def _read_sheet(file_path, sheet_name: str,
+                    extra_columns: Optional[Dict[str, List[str]]] = None,
+                    only_columns: Optional[set] = None) -> pd.DataFrame:
+        """
+        读取工作表中被使用的列，统一为标准列名并规范化列类型，
+        未使用的列名记录在 df.attrs['unused_columns']，校验结果记录在 df.attrs['validation_issues']
+        """
+        unused_columns = []
+        df = pd.read_excel(file_path, sheet_name=sheet_name, engine='openpyxl',
+                           usecols=DataLoader._make_column_filter(sheet_name, unused_columns, extra_columns,
+                                                                  only_columns))
+        df = schema_normalizer.resolve_columns(df, sheet_name)
+        df.attrs['unused_columns'] = unused_columns
+        df = schema_normalizer.normalize(df)
+        if df is not None:
+            df.attrs['validation_issues'] = data_validator.validate_sheet(df, sheet_name)
+        return df
+    
     @staticmethod
     def auto_detect_excel_file() -> Optional[str]:
         """
-        自动检测Excel文件
+        自动检测数据目录（SAC_DATA_DIR，默认当前目录）中最新放入的Excel文件
         
         Returns:
             文件路径或None
         """
         try:
-            pattern = "员工销售回款统计_*.xlsx"
+            pattern = os.path.join(os.environ.get(DATA_DIR_ENV, DEFAULT_DATA_DIR), DATA_FILE_PATTERN)
             files = glob.glob(pattern)
             if files:
                 latest_file = max(files, key=os.path.getctime)
@@ -41,13 +120,20 @@ class DataLoader:
             return None
     
     @staticmethod
-    def load_excel_data(file_path) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], 
-                                           Optional[pd.DataFrame], Optional[pd.DataFrame], Optional[str]]:
+    @instrumentation.instrument('data_loader.load_excel_data')
+    def load_excel_data(file_path, progress_callback: Optional[Callable[[float, str], None]] = None,
+                        extra_columns: Optional[Dict[str, List[str]]] = None,
+                        only_columns: Optional[Dict[str, List[str]]] = None) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame],
+                                   Optional[pd.DataFrame], Optional[pd.DataFrame], Optional[str]]:
         """
         加载Excel数据 - 智能兼容模式，基本验证+工作表可选
         
         Args:
             file_path: 文件路径或上传的文件对象
+            progress_callback: 进度回调 (进度0-1, 当前步骤说明)，每个工作表加载前后调用；
+                回调抛出异常时中止加载并返回错误信息
+            extra_columns: 除页面声明的列以外额外读取的列，工作表 -> 列名列表
+            only_columns: 只读取其中的列的工作表，工作表 -> 列名列表（增量导入；未列出的工作表正常读取）
             
         Returns:
             (score_df, sales_df, department_sales_df, ranking_df, error_message)
@@ -62,56 +148,80 @@ class DataLoader:
             - 销售回款超期账款排名 (可选) - 启用销售回款排名功能
             
         Note: 
+            - 只读取 config/column_config.py 中声明被页面使用的列，未使用的列名记录在 df.attrs['unused_columns']
             - 如果没有任何预期工作表，返回错误提示上传正确文件
             - 如果有至少一个预期工作表，系统智能启用对应功能
             - 各工作表独立加载，支持部分工作表缺失的情况
         """
         try:
-            # 检查文件中包含的工作表
-            excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-            available_sheets = excel_file.sheet_names
+            # 检查文件中包含的工作表（只读取工作簿清单，不解析工作表）
+            available_sheets = workbook_sniffer.sniff(file_path, sheets=[])['sheet_names']
             
             # 检查是否包含任何预期的工作表
-            expected_sheets = ['员工积分数据', '销售回款数据统计', '部门销售回款统计', '销售回款超期账款排名']
+            expected_sheets = EXPECTED_SHEETS
             has_any_expected_sheet = any(sheet in available_sheets for sheet in expected_sheets)
             
             if not has_any_expected_sheet:
                 return None, None, None, None, "请上传员工销售回款统计_XXXX年X月.xlsx文件，文件中应包含以下工作表之一：员工积分数据、销售回款数据统计、部门销售回款统计、销售回款超期账款排名"
             
+            # 进度按需要加载的工作表数量平均分配
+            sheets_to_load = [sheet for sheet in expected_sheets if sheet in available_sheets]
+            loaded_count = 0
+
+            def report_progress(sheet_name: str):
+                if progress_callback is not None:
+                    progress_callback(loaded_count / len(sheets_to_load), f"正在读取工作表：{sheet_name}")
+
+            def read_sheet(sheet_name: str) -> pd.DataFrame:
+                columns = only_columns.get(sheet_name) if only_columns else None
+                return DataLoader._read_sheet(file_path, sheet_name, extra_columns,
+                                              only_columns=set(columns) if columns is not None else None)
+
             # Load score_df (可选)
             score_df = None
             if '员工积分数据' in available_sheets:
+                report_progress('员工积分数据')
                 try:
-                    score_df = pd.read_excel(file_path, sheet_name='员工积分数据', engine='openpyxl')
+                    score_df = read_sheet('员工积分数据')
                     # 验证必要列是否存在
                     if '队名' not in score_df.columns:
                         score_df = None  # 如果缺少必要列，将数据设为None
                 except Exception as e:
                     score_df = None
+                loaded_count += 1
 
             # Load sales_df (可选)
             sales_df = None
             if '销售回款数据统计' in available_sheets:
+                report_progress('销售回款数据统计')
                 try:
-                    sales_df = pd.read_excel(file_path, sheet_name='销售回款数据统计', engine='openpyxl')
+                    sales_df = read_sheet('销售回款数据统计')
                 except Exception as e:
                     sales_df = None
+                loaded_count += 1
 
             # Load department_sales_df (可选)
             department_sales_df = None
             if '部门销售回款统计' in available_sheets:
+                report_progress('部门销售回款统计')
                 try:
-                    department_sales_df = pd.read_excel(file_path, sheet_name='部门销售回款统计', engine='openpyxl')
+                    department_sales_df = read_sheet('部门销售回款统计')
                 except Exception as e:
                     department_sales_df = None
+                loaded_count += 1
 
             # Load ranking_df (可选)
             ranking_df = None
             if '销售回款超期账款排名' in available_sheets:
+                report_progress('销售回款超期账款排名')
                 try:
-                    ranking_df = pd.read_excel(file_path, sheet_name='销售回款超期账款排名', engine='openpyxl')
+                    ranking_df = read_sheet('销售回款超期账款排名')
                 except Exception as e:
                     ranking_df = None
+                loaded_count += 1
+
+            if progress_callback is not None:
+                progress_callback(1.0, "加载完成")
 
             return score_df, sales_df, department_sales_df, ranking_df, None
         except Exception as e:
@@ -191,8 +301,43 @@ class DataLoader:
         if file_obj.size > 50 * 1024 * 1024:  # 50MB限制
             return False, "文件大小不能超过50MB"
         
+        # 快速探测工作簿结构，在完整解析前拒绝损坏、异常或不含预期工作表的文件
+        try:
+            sniff_result = workbook_sniffer.sniff(file_obj, sheets=[])
+        except WorkbookSniffError as e:
+            return False, str(e)
+        
+        if not sniff_result['expected_sheets']:
+            return False, f"文件中应包含以下工作表之一：{'、'.join(EXPECTED_SHEETS)}"
+        
         return True, "文件验证通过"
     
+    @staticmethod
+    def compute_content_hash(file_obj) -> str:
+        """
+        计算文件内容的 SHA-256 哈希（与文件名无关，用于识别重复上传）
+        
+        Args:
+            file_obj: 文件路径或上传的文件对象（读取后恢复到开头）
+            
+        Returns:
+            十六进制哈希字符串
+        """
+        digest = hashlib.sha256()
+        if isinstance(file_obj, (str, os.PathLike)):
+            with open(file_obj, 'rb') as f:
+                for chunk in iter(lambda: f.read(CONTENT_HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        elif hasattr(file_obj, 'getbuffer'):
+            with file_obj.getbuffer() as view:
+                digest.update(view)
+        else:
+            file_obj.seek(0)
+            for chunk in iter(lambda: file_obj.read(CONTENT_HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+            file_obj.seek(0)
+        return digest.hexdigest()
+    
     @staticmethod
     def get_sheet_names(file_path) -> list:
         """
@@ -205,8 +350,7 @@ class DataLoader:
             工作表名称列表
         """
         try:
-            excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-            return excel_file.sheet_names
+            return workbook_sniffer.sniff(file_path, sheets=[])['sheet_names']
         except Exception as e:
             st.error(f"读取工作表名称失败: {e}")
             return []
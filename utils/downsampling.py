@@ -0,0 +1,125 @@
+"""
+趋势数据降采样工具
+在绘图前使用 LTTB（Largest-Triangle-Three-Buckets）算法减少折线图的数据点
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Optional, Hashable
+
+
+class Downsampler:
+    """趋势数据降采样器"""
+
+    @staticmethod
+    def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+        """
+        使用 LTTB 算法选择保留的数据点
+
+        Args:
+            x: 横坐标（数值，升序）
+            y: 纵坐标
+            threshold: 保留的点数（至少3个）
+
+        Returns:
+            保留的点的位置索引（升序，包含首尾点）
+        """
+        n = len(x)
+        if threshold >= n or threshold < 3:
+            return np.arange(n)
+
+        x = np.asarray(x, dtype=float)
+        y = np.nan_to_num(np.asarray(y, dtype=float))
+
+        # 首尾点固定保留，中间点分为 threshold-2 个桶
+        bucket_edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+        selected = np.empty(threshold, dtype=int)
+        selected[0] = 0
+        selected[-1] = n - 1
+
+        prev = 0
+        for i in range(threshold - 2):
+            start, end = bucket_edges[i], bucket_edges[i + 1]
+
+            # 下一个桶的平均点（最后一个桶使用末尾点）
+            if i + 2 < len(bucket_edges):
+                next_start, next_end = bucket_edges[i + 1], bucket_edges[i + 2]
+                avg_x = x[next_start:next_end].mean()
+                avg_y = y[next_start:next_end].mean()
+            else:
+                avg_x, avg_y = x[n - 1], y[n - 1]
+
+            # 选择与上一个选中点、下一桶平均点构成最大三角形面积的点
+            areas = np.abs(
+                (x[prev] - avg_x) * (y[start:end] - y[prev])
+                - (x[prev] - x[start:end]) * (avg_y - y[prev])
+            )
+            prev = start + int(np.argmax(areas))
+            selected[i + 1] = prev
+
+        return selected
+
+    @staticmethod
+    def downsample_frame(df: pd.DataFrame, y_col: str, budget: int,
+                         series_col: Optional[str] = None) -> pd.DataFrame:
+        """
+        对长格式趋势数据降采样
+
+        每条曲线按行顺序作为横坐标，点数预算按曲线数量平均分配。
+        降采样后部分月份可能只出现在部分曲线中，类别横轴的绘图需用 category_orders 指定月份顺序。
+
+        Args:
+            df: 趋势数据（每条曲线内已按横坐标排序）
+            y_col: 数值列
+            budget: 整张图的点数预算
+            series_col: 区分曲线的列（为空时视为单条曲线）
+
+        Returns:
+            降采样后的数据
+        """
+        if len(df) <= budget:
+            return df
+
+        if series_col is None:
+            keep = Downsampler.lttb_indices(np.arange(len(df)), df[y_col].to_numpy(), budget)
+            return df.iloc[keep]
+
+        groups = df.groupby(series_col, sort=False).indices
+        per_series_budget = max(3, budget // max(1, len(groups)))
+        y = df[y_col].to_numpy()
+        keep = []
+        for positions in groups.values():
+            local = Downsampler.lttb_indices(np.arange(len(positions)), y[positions], per_series_budget)
+            keep.append(positions[local])
+        return df.iloc[np.sort(np.concatenate(keep))]
+
+    @staticmethod
+    def get_chart_data(df: pd.DataFrame, y_col: str, budget: int, cache_key: Hashable,
+                       series_col: Optional[str] = None) -> pd.DataFrame:
+        """
+        获取用于绘图的降采样数据（按数据版本和显示范围缓存）
+
+        Args:
+            df: 趋势数据
+            y_col: 数值列
+            budget: 整张图的点数预算
+            cache_key: 缓存标识（应包含数据版本和显示范围）
+            series_col: 区分曲线的列
+
+        Returns:
+            降采样后的数据，点数不超过预算时直接返回原数据
+        """
+        if len(df) <= budget:
+            return df
+        return _cached_downsample(cache_key, y_col, budget, series_col, df)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_downsample(cache_key, y_col, budget, series_col, _df):
+    """降采样结果缓存（数据本身不参与哈希，由 cache_key 标识）"""
+    return Downsampler.downsample_frame(_df, y_col, budget, series_col)
+
+
+# 全局降采样器实例
+downsampler = Downsampler()
@@ -0,0 +1,277 @@
+"""
+增量导入
+月中每周重新下发的同一月份工作簿只比上一版多出新的周列，识别出这种情况后
+只读取新增周的列和月度汇总列，与已加载的数据按名称列对齐合并，未变化的周列直接沿用
+"""
+
+import os
+import re
+from typing import Dict, Any, Optional, Callable, Tuple
+
+import pandas as pd
+
+from config.ingestion_config import INCREMENTAL_INGEST_ENV, WEEKLY_SHEET_KEYS, INGEST_TIMEOUT_S
+from config.validation_config import TOTAL_ROW_LABEL
+from utils.sandbox_parser import sandbox_parser
+from utils.validation import data_validator
+from utils.workbook_sniffer import workbook_sniffer, WorkbookSniffError, EXPECTED_SHEETS
+
+MONTH_PATTERN = re.compile(r'(\d{4})年(\d{1,2})月')
+WEEK_NUMBER_PATTERN = re.compile(r'^第(\d+)周')
+
+
+class IncrementalIngestor:
+    """增量导入类"""
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """是否启用增量导入"""
+        return os.environ.get(INCREMENTAL_INGEST_ENV, '1') != '0'
+
+    @staticmethod
+    def get_week_number(column) -> Optional[int]:
+        """获取周数据列的周次，不是周数据列时返回None"""
+        match = WEEK_NUMBER_PATTERN.match(str(column).strip())
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def get_month_key(file_name: Optional[str]) -> Optional[str]:
+        """从文件名中提取月份（如 2024年3月），无法识别时返回None"""
+        match = MONTH_PATTERN.search(file_name or '')
+        return f"{match.group(1)}年{int(match.group(2))}月" if match else None
+
+    @staticmethod
+    def plan_revision(file_obj, file_name: str, frames: Dict[str, Optional[pd.DataFrame]],
+                      loaded_file_name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        判断上传的工作簿是否为已加载月份的下一版（只新增了周列），并生成增量读取计划
+
+        只读取工作簿表头，不解析数据。
+
+        Args:
+            file_obj: 上传的文件对象
+            file_name: 上传的文件名
+            frames: 已加载的数据，工作表名称 -> 数据表
+            loaded_file_name: 已加载数据的文件名
+
+        Returns:
+            {'month': 月份, 'new_weeks': 新增周次, 'sheets': {工作表: {'key', 'new_weeks', 'columns', 'header'}}}；
+            不是同一月份的新版本时返回None（需要完整解析）
+        """
+        if not IncrementalIngestor.is_enabled():
+            return None
+        month = IncrementalIngestor.get_month_key(file_name)
+        if month is None or month != IncrementalIngestor.get_month_key(loaded_file_name):
+            return None
+
+        loaded_sheets = [sheet for sheet in EXPECTED_SHEETS if frames.get(sheet) is not None]
+        weekly_sheets = [sheet for sheet in loaded_sheets if sheet in WEEKLY_SHEET_KEYS]
+        if not weekly_sheets:
+            return None
+
+        try:
+            sniff_result = workbook_sniffer.sniff(file_obj)
+        except WorkbookSniffError:
+            return None
+        if sniff_result['expected_sheets'] != loaded_sheets:
+            return None
+
+        plan_sheets = {}
+        new_weeks_all = set()
+        for sheet in weekly_sheets:
+            df = frames[sheet]
+            key = WEEKLY_SHEET_KEYS[sheet]
+            header = [str(col).strip() for col in sniff_result['sheets'][sheet]['columns']]
+            derived = set(df.attrs.get('derived_columns', []))
+            old_weeks = {week for col in df.columns if (week := IncrementalIngestor.get_week_number(col))}
+            header_weeks = {week for col in header if (week := IncrementalIngestor.get_week_number(col))}
+            new_weeks = sorted(header_weeks - old_weeks)
+
+            # 只接受在已有周次之后追加的周列，已读取的周列在新版本中必须仍然存在
+            if key not in df.columns or not new_weeks or min(new_weeks) <= max(old_weeks, default=0):
+                return None
+            old_week_columns = {col for col in df.columns
+                                if IncrementalIngestor.get_week_number(col) and col not in derived}
+            if not old_week_columns <= set(header):
+                return None
+
+            columns = {col for col in header
+                       if IncrementalIngestor.get_week_number(col) in (None, *new_weeks)}
+            plan_sheets[sheet] = {'key': key, 'new_weeks': new_weeks, 'columns': columns, 'header': header}
+            new_weeks_all.update(new_weeks)
+
+        return {'month': month, 'new_weeks': sorted(new_weeks_all), 'sheets': plan_sheets}
+
+    @staticmethod
+    def merge_sheet(old: pd.DataFrame, partial: pd.DataFrame, sheet_name: str,
+                    sheet_plan: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        将新读取的月度汇总列和新增周列合并到已加载的数据表
+
+        Args:
+            old: 已加载的数据表
+            partial: 只包含名称列、月度汇总列和新增周列的数据表
+            sheet_name: 工作表名称
+            sheet_plan: plan_revision 中该工作表的读取计划
+
+        Returns:
+            合并后的数据表；行无法对齐或之前的周数据被修改（周度之和与月度汇总不再一致）时返回None
+        """
+        key = sheet_plan['key']
+        if key not in partial.columns or len(old) != len(partial):
+            return None
+        if not old[key].astype(object).reset_index(drop=True).equals(
+                partial[key].astype(object).reset_index(drop=True)):
+            return None
+
+        kept = [col for col in old.columns if col not in partial.columns]
+        merged = pd.concat([old[kept].reset_index(drop=True), partial.reset_index(drop=True)], axis=1)
+
+        # 列顺序与完整解析一致：按工作簿表头顺序（别名换成标准列名），派生列在最后
+        physical_to_canonical = {physical: canonical
+                                 for canonical, physical in partial.attrs.get('column_mapping', {}).items()}
+        order = [physical_to_canonical.get(col, col) for col in sheet_plan['header']]
+        order = list(dict.fromkeys(col for col in order if col in merged.columns))
+        order += [col for col in list(old.columns) + list(partial.columns) if col in merged.columns and col not in order]
+        merged = merged[list(dict.fromkeys(order))]
+
+        old_attrs, partial_attrs = old.attrs, partial.attrs
+        derived = set(old_attrs.get('derived_columns', [])) | set(partial_attrs.get('derived_columns', []))
+        attrs = dict(old_attrs)
+        attrs['column_mapping'] = {**old_attrs.get('column_mapping', {}), **partial_attrs.get('column_mapping', {})}
+        attrs['derived_columns'] = [col for col in merged.columns if col in derived]
+        attrs['unused_columns'] = list(dict.fromkeys(
+            old_attrs.get('unused_columns', []) + partial_attrs.get('unused_columns', [])))
+
+        old_report = old_attrs.get('schema_report')
+        partial_report = partial_attrs.get('schema_report')
+        if old_report and partial_report:
+            report = dict(old_report)
+            report['coercion_errors'] = {
+                **{col: detail for col, detail in old_report['coercion_errors'].items() if col in kept},
+                **partial_report['coercion_errors']
+            }
+            for field in ('categorical_columns', 'numeric_columns'):
+                report[field] = list(dict.fromkeys(old_report[field] + partial_report[field]))
+            attrs['schema_report'] = report
+
+        # 未变化的周列合计直接沿用
+        week_sums = old_attrs.get('week_sums')
+        if week_sums:
+            attrs['week_sums'] = {'rows': week_sums['rows'],
+                                  'sums': {col: value for col, value in week_sums['sums'].items() if col in kept}}
+        attrs['incremental'] = {'new_weeks': sheet_plan['new_weeks'], 'columns_read': len(partial.columns)}
+        merged.attrs = attrs
+
+        # 之前的周数据被修改时，周度之和与新的月度汇总不一致，改为完整解析
+        issues = data_validator.validate_sheet(merged, sheet_name)
+        old_checks = {(issue['check'], issue['column']) for issue in old_attrs.get('validation_issues', [])}
+        if any(issue['check'] == 'weekly_sum' and (issue['check'], issue['column']) not in old_checks
+               for issue in issues):
+            return None
+        merged.attrs['validation_issues'] = issues
+        return merged
+
+    @staticmethod
+    def load_revision(file_obj, plan: Dict[str, Any], frames: Dict[str, Optional[pd.DataFrame]],
+                      progress_callback: Optional[Callable[[float, str], None]] = None,
+                      stats: Optional[Dict[str, Any]] = None,
+                      timeout: float = INGEST_TIMEOUT_S) -> Optional[Tuple]:
+        """
+        按增量读取计划加载新版本工作簿
+
+        按周分列的工作表只读取名称列、月度汇总列和新增周列；积分和排名工作表没有周列分块，完整读取。
+        读取与完整解析一样按解析模式进行（沙箱模式下在资源受限的子进程中读取），读取结果在本进程中合并。
+
+        Args:
+            file_obj: 上传的文件对象或暂存文件路径
+            plan: plan_revision 生成的读取计划
+            frames: 已加载的数据，工作表名称 -> 数据表
+            progress_callback: 进度回调 (进度0-1, 当前步骤说明)
+            stats: 传入字典时写入解析统计（见 SandboxParser.load_excel_data）
+            timeout: 沙箱模式的墙钟超时（秒）
+
+        Returns:
+            (score_df, sales_df, department_sales_df, ranking_df, None)；无法增量合并时返回None
+        """
+        only_columns = {sheet: sorted(sheet_plan['columns']) for sheet, sheet_plan in plan['sheets'].items()}
+        if hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
+        *loaded, error = sandbox_parser.load_excel_data(file_obj, progress_callback=progress_callback, timeout=timeout,
+                                                        only_columns=only_columns, stats=stats)
+        if error:
+            return None
+        loaded = dict(zip(EXPECTED_SHEETS, loaded))
+
+        result = {}
+        for sheet in [sheet for sheet in EXPECTED_SHEETS if frames.get(sheet) is not None]:
+            df = loaded.get(sheet)
+            sheet_plan = plan['sheets'].get(sheet)
+            if sheet_plan is not None:
+                if df is None:
+                    return None
+                try:
+                    df = IncrementalIngestor.merge_sheet(frames[sheet], df, sheet, sheet_plan)
+                except Exception:
+                    return None
+                if df is None:
+                    return None
+            result[sheet] = df
+
+        return tuple(result.get(sheet) for sheet in EXPECTED_SHEETS) + (None,)
+
+    @staticmethod
+    def get_revision_loader(uploaded_file, frames: Dict[str, Optional[pd.DataFrame]],
+                            loaded_file_name: Optional[str]) -> Optional[Callable]:
+        """
+        获取增量加载函数（供解析队列调用）
+
+        Args:
+            uploaded_file: 上传的文件对象
+            frames: 已加载的数据，工作表名称 -> 数据表
+            loaded_file_name: 已加载数据的文件名
+
+        Returns:
+            loader(file_obj, progress_callback, stats, timeout) -> 结果元组或None（None 时改为完整解析）；
+            不是同一月份的新版本时返回None
+        """
+        plan = IncrementalIngestor.plan_revision(uploaded_file, uploaded_file.name, frames, loaded_file_name)
+        if plan is None:
+            return None
+
+        def loader(file_obj, progress_callback, stats, timeout):
+            return IncrementalIngestor.load_revision(file_obj, plan, frames, progress_callback, stats, timeout)
+
+        return loader
+
+    @staticmethod
+    def get_week_sums(df: pd.DataFrame, key_col: str = '员工姓名') -> Dict[str, float]:
+        """
+        获取各周数据列的合计（排除合计行和名称为空的行）
+
+        结果缓存在 df.attrs['week_sums']，增量导入时未变化的周列沿用上一版本的合计，只计算新增的周列。
+
+        Args:
+            df: 销售或部门数据（从状态管理器取出的完整数据表）
+            key_col: 名称列
+
+        Returns:
+            周数据列 -> 合计
+        """
+        week_columns = [col for col in df.columns
+                        if IncrementalIngestor.get_week_number(col) and pd.api.types.is_numeric_dtype(df[col])]
+        cache = df.attrs.get('week_sums')
+        if not cache or cache.get('rows') != len(df):
+            cache = {'rows': len(df), 'sums': {}}
+
+        missing = [col for col in week_columns if col not in cache['sums']]
+        if missing:
+            body = df[(df[key_col] != TOTAL_ROW_LABEL) & df[key_col].notna()] if key_col in df.columns else df
+            sums = body[missing].sum()
+            cache = {'rows': len(df), 'sums': {**cache['sums'], **{col: float(sums[col]) for col in missing}}}
+            df.attrs['week_sums'] = cache
+        return {col: cache['sums'][col] for col in week_columns}
+
+
+# 全局增量导入实例
+incremental_ingestor = IncrementalIngestor()
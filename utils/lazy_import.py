@@ -0,0 +1,45 @@
+"""
+延迟导入工具
+重量级模块（如 plotly.express）在首次访问属性时才真正导入，缩短应用冷启动和页面模块加载时间
+"""
+
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """延迟导入的模块代理，首次访问属性时导入真实模块"""
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        """导入并缓存真实模块（多线程安全）"""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._module_name)
+        return self._module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __repr__(self) -> str:
+        state = "已加载" if self._module is not None else "未加载"
+        return f"<LazyModule {self._module_name} ({state})>"
+
+
+def lazy_module(module_name: str) -> LazyModule:
+    """
+    创建延迟导入的模块代理
+
+    Args:
+        module_name: 模块全名，如 "plotly.express"
+
+    Returns:
+        模块代理，用法与 import 的模块相同
+    """
+    return LazyModule(module_name)
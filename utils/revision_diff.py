@@ -0,0 +1,212 @@
+"""
+修订对比
+同一月份的工作簿被更正后重新上传时，按员工、部门等名称列对齐两个版本，
+向量化比较出修改的单元格、新增和删除的行，既用于界面展示，也作为失效集合：
+未变化的工作表保留原数据和数据版本，未变化的周列沿用已计算的合计
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.ingestion_config import REVISION_DIFF_CELL_LIMIT
+from config.validation_config import UNIQUE_COLUMNS
+from utils.workbook_sniffer import EXPECTED_SHEETS
+
+# 工作表 -> 状态管理器中的数据键
+SHEET_DATA_KEYS = {
+    '员工积分数据': 'score_df',
+    '销售回款数据统计': 'sales_df',
+    '部门销售回款统计': 'department_sales_df',
+    '销售回款超期账款排名': 'ranking_df',
+}
+
+
+class RevisionDiffer:
+    """修订对比类"""
+
+    @staticmethod
+    def _changed_mask(old_values: pd.Series, new_values: pd.Series) -> np.ndarray:
+        """逐行比较两列，两侧都为空视为相同"""
+        if pd.api.types.is_numeric_dtype(old_values) and pd.api.types.is_numeric_dtype(new_values) \
+                and not pd.api.types.is_bool_dtype(old_values) and not pd.api.types.is_bool_dtype(new_values):
+            old_array = old_values.to_numpy(dtype=float)
+            new_array = new_values.to_numpy(dtype=float)
+            return ~((old_array == new_array) | (np.isnan(old_array) & np.isnan(new_array)))
+        # 空值统一为 None 后逐个比较（None == None 视为相同）
+        old_array = old_values.astype(object).to_numpy()
+        new_array = new_values.astype(object).to_numpy()
+        old_array = np.where(pd.isna(old_array), None, old_array)
+        new_array = np.where(pd.isna(new_array), None, new_array)
+        return ~(old_array == new_array).astype(bool)
+
+    @staticmethod
+    def _key_labels(index: pd.Index) -> List[str]:
+        """对齐键转换为显示文字（多列键用 / 连接）"""
+        if isinstance(index, pd.MultiIndex):
+            return [" / ".join(str(part) for part in key) for key in index]
+        return [str(key) for key in index]
+
+    @staticmethod
+    def diff_sheet(old: Optional[pd.DataFrame], new: Optional[pd.DataFrame], sheet_name: str,
+                   cell_limit: int = REVISION_DIFF_CELL_LIMIT) -> Dict[str, Any]:
+        """
+        对比同一工作表的两个版本
+
+        Args:
+            old: 已加载的版本
+            new: 新上传的版本
+            sheet_name: 工作表名称
+            cell_limit: changes 中最多列出的修改单元格数
+
+        Returns:
+            {
+                'sheet', 'changed': 是否有变化,
+                'comparable': 是否能按名称列对齐（缺少名称列、名称重复或为空时为 False，只判断整表是否相同）,
+                'added_rows'/'removed_rows': 新增/删除的键, 'added_columns'/'removed_columns',
+                'changed_cells': 修改的单元格数, 'changed_columns': {列名: 修改数},
+                'changed_keys': 有修改的键数,
+                'changes': 修改明细 DataFrame（键、列名、原值、新值，最多 cell_limit 行）
+            }
+        """
+        result = {
+            'sheet': sheet_name, 'changed': False, 'comparable': True,
+            'added_rows': [], 'removed_rows': [], 'added_columns': [], 'removed_columns': [],
+            'changed_cells': 0, 'changed_columns': {}, 'changed_keys': 0, 'changes': None,
+        }
+        if old is None and new is None:
+            return result
+        if old is None or new is None:
+            result.update(changed=True, comparable=False)
+            return result
+        if old is new:
+            return result
+
+        key_columns = UNIQUE_COLUMNS.get(sheet_name, [])
+        if not key_columns or not all(col in old.columns and col in new.columns for col in key_columns):
+            result.update(changed=not old.equals(new), comparable=False)
+            return result
+
+        # 名称列有重复或为空时无法逐行对齐（只比较其中一行会漏掉其余行的修改），按整表是否相同判断并整体替换
+        if any(df[key_columns].isna().any(axis=None) or df.duplicated(subset=key_columns).any()
+               for df in (old, new)):
+            result.update(changed=not old.equals(new), comparable=False)
+            return result
+
+        # 按名称列对齐
+        old_indexed = old.set_index(key_columns)
+        new_indexed = new.set_index(key_columns)
+
+        common_keys = old_indexed.index.intersection(new_indexed.index, sort=False)
+        result['added_rows'] = RevisionDiffer._key_labels(new_indexed.index.difference(old_indexed.index, sort=False))
+        result['removed_rows'] = RevisionDiffer._key_labels(old_indexed.index.difference(new_indexed.index, sort=False))
+        result['added_columns'] = [str(col) for col in new_indexed.columns if col not in old_indexed.columns]
+        result['removed_columns'] = [str(col) for col in old_indexed.columns if col not in new_indexed.columns]
+
+        common_columns = [col for col in new_indexed.columns if col in old_indexed.columns]
+        old_aligned = old_indexed.loc[common_keys, common_columns]
+        new_aligned = new_indexed.loc[common_keys, common_columns]
+
+        masks = [RevisionDiffer._changed_mask(old_aligned[col], new_aligned[col]) for col in common_columns]
+        mask = np.column_stack(masks) if masks else np.zeros((len(common_keys), 0), dtype=bool)
+        column_counts = mask.sum(axis=0)
+
+        result['changed_cells'] = int(column_counts.sum())
+        result['changed_columns'] = {str(col): int(count) for col, count in zip(common_columns, column_counts) if count}
+        result['changed_keys'] = int(mask.any(axis=1).sum())
+        result['changed'] = bool(result['changed_cells'] or result['added_rows'] or result['removed_rows']
+                                 or result['added_columns'] or result['removed_columns'])
+
+        if result['changed_cells']:
+            rows, cols = np.nonzero(mask)
+            rows, cols = rows[:cell_limit], cols[:cell_limit]
+            labels = np.array(RevisionDiffer._key_labels(common_keys), dtype=object)
+            columns = np.array(common_columns, dtype=object)
+            old_values = old_aligned.to_numpy(dtype=object)
+            new_values = new_aligned.to_numpy(dtype=object)
+            result['changes'] = pd.DataFrame({
+                '工作表': sheet_name,
+                '名称': labels[rows],
+                '列名': columns[cols],
+                '原值': old_values[rows, cols],
+                '新值': new_values[rows, cols],
+            })
+        return result
+
+    @staticmethod
+    def diff(old_frames: Dict[str, Optional[pd.DataFrame]], new_frames: Dict[str, Optional[pd.DataFrame]],
+             cell_limit: int = REVISION_DIFF_CELL_LIMIT) -> Dict[str, Any]:
+        """
+        对比两个版本的全部工作表
+
+        Args:
+            old_frames: 已加载的数据，工作表名称 -> 数据表
+            new_frames: 新上传的数据，工作表名称 -> 数据表
+            cell_limit: 每个工作表最多列出的修改单元格数
+
+        Returns:
+            {
+                'changed': 是否有变化, 'sheets': {工作表: diff_sheet 结果},
+                'invalidation': {数据键: 修改的列名列表}（只包含有变化的工作表）,
+                'elapsed_ms': 对比耗时
+            }
+        """
+        start = time.perf_counter()
+        sheets = {sheet: RevisionDiffer.diff_sheet(old_frames.get(sheet), new_frames.get(sheet), sheet, cell_limit)
+                  for sheet in EXPECTED_SHEETS}
+        invalidation = {
+            SHEET_DATA_KEYS[sheet]: sorted(set(result['changed_columns']) | set(result['added_columns'])
+                                           | set(result['removed_columns']))
+            for sheet, result in sheets.items() if result['changed']
+        }
+        return {
+            'changed': bool(invalidation),
+            'sheets': sheets,
+            'invalidation': invalidation,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    @staticmethod
+    def carry_over_aggregates(old: Optional[pd.DataFrame], new: Optional[pd.DataFrame],
+                              sheet_diff: Dict[str, Any]):
+        """
+        将旧版本中未受影响的预计算结果（各周合计 df.attrs['week_sums']）沿用到新版本
+
+        只有行完全对齐（没有新增、删除的行且顺序相同）时沿用，修改过的列重新计算。
+        """
+        if old is None or new is None or not sheet_diff['comparable']:
+            return
+        week_sums = old.attrs.get('week_sums')
+        if not week_sums or sheet_diff['added_rows'] or sheet_diff['removed_rows'] or len(old) != len(new):
+            return
+        key_columns = UNIQUE_COLUMNS.get(sheet_diff['sheet'], [])
+        if not old[key_columns].astype(object).reset_index(drop=True).equals(
+                new[key_columns].astype(object).reset_index(drop=True)):
+            return
+        affected = set(sheet_diff['changed_columns']) | set(sheet_diff['removed_columns'])
+        new.attrs['week_sums'] = {
+            'rows': len(new),
+            'sums': {col: value for col, value in week_sums['sums'].items() if col not in affected and col in new.columns}
+        }
+
+    @staticmethod
+    def summarize(report: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """修订对比结果的数量摘要（用于修订记录；comparable 为 False 时各数量为 0，工作表整体替换）"""
+        return {
+            sheet: {
+                'comparable': result['comparable'],
+                'changed_cells': result['changed_cells'],
+                'changed_keys': result['changed_keys'],
+                'added_rows': len(result['added_rows']),
+                'removed_rows': len(result['removed_rows']),
+                'added_columns': len(result['added_columns']),
+                'removed_columns': len(result['removed_columns']),
+            }
+            for sheet, result in report['sheets'].items() if result['changed']
+        }
+
+
+# 全局修订对比实例
+revision_differ = RevisionDiffer()
@@ -0,0 +1,336 @@
+"""
+沙箱解析器
+在资源受限的子进程中解析上传的 Excel 文件，防止异常文件（如压缩炸弹、海量带样式空单元格）耗尽服务器资源
+
+子进程设置 RLIMIT_AS / RLIMIT_CPU 并受墙钟超时约束；磁盘上的文件（如暂存的上传文件）由子进程按路径直接读取，
+内存中的文件对象通过共享内存传递；解析结果以 Arrow IPC 列式格式通过共享内存传回（不使用 pickle，见 utils.arrow_codec）。
+
+新启动的解释器导入 pandas/openpyxl 需要一秒以上，因此预先启动一个导入完成、等待请求的子进程，
+每个子进程仍只解析一个文件，取走后立即在后台启动下一个。
+"""
+
+import io
+import json
+import os
+import select
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Callable, Tuple, Dict, Any, List
+
+import pandas as pd
+
+from config.ingestion_config import (
+    PARSE_MODE_ENV, DEFAULT_PARSE_MODE, SANDBOX_MEMORY_LIMIT_MB, SANDBOX_CPU_LIMIT_S, INGEST_TIMEOUT_S,
+    SANDBOX_PREFORK_ENV
+)
+from utils.arrow_codec import ArrowCodec
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRAME_KEYS = ['score_df', 'sales_df', 'department_sales_df', 'ranking_df']
+
+try:
+    import resource
+except ImportError:  # Windows 不支持资源限制
+    resource = None
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    """取消 resource_tracker 对共享内存的跟踪，由接收方负责释放"""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def _read_shared(name: str, size: int) -> bytes:
+    """读取并释放共享内存块"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class SandboxParser:
+    """沙箱解析器类"""
+
+    def __init__(self):
+        self._spare_lock = threading.Lock()
+        self._spare: Optional[subprocess.Popen] = None
+
+    @staticmethod
+    def is_prefork_enabled() -> bool:
+        """是否预先启动等待请求的解析子进程"""
+        return os.environ.get(SANDBOX_PREFORK_ENV, '1') != '0'
+
+    @staticmethod
+    def _spawn_worker() -> subprocess.Popen:
+        """启动一个解析子进程（导入解析所需的库后等待请求）"""
+        return subprocess.Popen(
+            [sys.executable, '-m', 'utils.sandbox_parser'],
+            cwd=PROJECT_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+
+    def _take_worker(self) -> subprocess.Popen:
+        """取一个解析子进程：优先使用预先启动的子进程"""
+        with self._spare_lock:
+            worker, self._spare = self._spare, None
+        if worker is None or worker.poll() is not None:
+            worker = self._spawn_worker()
+        return worker
+
+    def prewarm(self):
+        """
+        确保有一个预先启动的备用子进程（应用启动时调用；每次解析结束后再调用，不与正在进行的解析争抢CPU）
+        """
+        if not self.is_prefork_enabled() or self.get_mode() != 'sandbox':
+            return
+        with self._spare_lock:
+            if self._spare is None or self._spare.poll() is not None:
+                self._spare = self._spawn_worker()
+
+    @staticmethod
+    def get_mode() -> str:
+        """获取当前解析模式（sandbox 或 inprocess）"""
+        mode = os.environ.get(PARSE_MODE_ENV, DEFAULT_PARSE_MODE).strip().lower()
+        if mode == 'inprocess' or resource is None:
+            return 'inprocess'
+        return 'sandbox'
+
+    @staticmethod
+    def load_excel_data(file_obj, progress_callback: Optional[Callable[[float, str], None]] = None,
+                        timeout: float = INGEST_TIMEOUT_S,
+                        extra_columns: Optional[Dict[str, List[str]]] = None,
+                        only_columns: Optional[Dict[str, List[str]]] = None,
+                        stats: Optional[Dict[str, Any]] = None) -> Tuple:
+        """
+        按配置的解析模式加载Excel数据
+
+        Args:
+            file_obj: 文件路径或上传的文件对象（传入路径时不在内存中复制文件内容）
+            progress_callback: 进度回调，抛出异常时中止解析（沙箱模式下终止子进程）
+            timeout: 沙箱模式的墙钟超时（秒）
+            extra_columns: 除页面声明的列以外额外读取的列
+            only_columns: 只读取其中的列的工作表（增量导入），工作表 -> 列名列表
+            stats: 传入字典时写入解析统计（mode；沙箱模式下还有子进程峰值常驻内存 peak_rss_mb）
+
+        Returns:
+            (score_df, sales_df, department_sales_df, ranking_df, error_message)
+        """
+        mode = SandboxParser.get_mode()
+        if stats is not None:
+            stats['mode'] = mode
+        if mode == 'inprocess':
+            from utils.data_loader import data_loader
+            return data_loader.load_excel_data(file_obj, progress_callback=progress_callback,
+                                               extra_columns=extra_columns, only_columns=only_columns)
+        return SandboxParser.parse_in_sandbox(file_obj, progress_callback, timeout, extra_columns=extra_columns,
+                                              only_columns=only_columns, stats=stats)
+
+    @staticmethod
+    def parse_in_sandbox(file_obj, progress_callback: Optional[Callable[[float, str], None]] = None,
+                         timeout: float = INGEST_TIMEOUT_S,
+                         memory_limit_mb: int = SANDBOX_MEMORY_LIMIT_MB,
+                         cpu_limit_s: int = SANDBOX_CPU_LIMIT_S,
+                         extra_columns: Optional[Dict[str, List[str]]] = None,
+                         only_columns: Optional[Dict[str, List[str]]] = None,
+                         stats: Optional[Dict[str, Any]] = None) -> Tuple:
+        """
+        在子进程中解析Excel文件
+
+        文件路径直接交给子进程读取；内存中的文件对象先复制到共享内存。
+
+        Returns:
+            (score_df, sales_df, department_sales_df, ranking_df, error_message)
+        """
+        input_shm = None
+        request = {}
+        if isinstance(file_obj, (str, os.PathLike)):
+            request['path'] = os.path.abspath(file_obj)
+        else:
+            if hasattr(file_obj, 'getbuffer'):
+                with file_obj.getbuffer() as view:
+                    input_shm = shared_memory.SharedMemory(create=True, size=max(1, len(view)))
+                    input_shm.buf[:len(view)] = view
+                    request['size'] = len(view)
+            else:
+                file_obj.seek(0)
+                content = file_obj.read()
+                input_shm = shared_memory.SharedMemory(create=True, size=max(1, len(content)))
+                input_shm.buf[:len(content)] = content
+                request['size'] = len(content)
+                del content
+            request['input'] = input_shm.name
+
+        request.update({
+            'memory_limit_mb': memory_limit_mb,
+            'cpu_limit_s': cpu_limit_s,
+            'extra_columns': extra_columns,
+            'only_columns': only_columns,
+        })
+        process = sandbox_parser._take_worker()
+        result_message = None
+        try:
+            process.stdin.write((json.dumps(request) + '\n').encode('utf-8'))
+            process.stdin.close()
+
+            deadline = time.monotonic() + timeout
+            buffer = b''
+            while result_message is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, None, None, None, f"解析超时（超过 {timeout:g} 秒），文件可能异常"
+                ready, _, _ = select.select([process.stdout], [], [], min(remaining, 0.5))
+                if not ready:
+                    continue
+                chunk = os.read(process.stdout.fileno(), 65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    message = json.loads(line)
+                    if message['type'] == 'progress':
+                        if progress_callback is not None:
+                            progress_callback(message['progress'], message['message'])
+                    else:
+                        result_message = message
+                        break
+
+            if result_message is None:
+                process.wait(timeout=5)
+                return None, None, None, None, SandboxParser._describe_exit(process.returncode)
+
+            if stats is not None and result_message.get('peak_rss_mb') is not None:
+                stats['peak_rss_mb'] = result_message['peak_rss_mb']
+            frames = SandboxParser._collect_frames(result_message)
+            return (*[frames.get(key) for key in FRAME_KEYS], result_message.get('error'))
+        except Exception as e:
+            return None, None, None, None, f"读取文件时出错: {e}"
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            if input_shm is not None:
+                input_shm.close()
+                try:
+                    input_shm.unlink()
+                except FileNotFoundError:
+                    pass
+            # 异常退出时释放子进程已创建但未读取的结果
+            if result_message is not None:
+                SandboxParser._release_frames(result_message)
+            sandbox_parser.prewarm()
+
+    @staticmethod
+    def _collect_frames(message: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+        """从共享内存读取子进程返回的数据表"""
+        frames = {}
+        for key, info in message.get('frames', {}).items():
+            data = _read_shared(info['shm'], info['size'])
+            info['consumed'] = True
+            if info.get('format') != 'arrow':
+                raise ValueError(f"不支持的结果格式: {info.get('format')}")
+            frames[key] = ArrowCodec.deserialize(data)
+        return frames
+
+    @staticmethod
+    def _release_frames(message: Dict[str, Any]):
+        """释放未读取的结果共享内存"""
+        for info in message.get('frames', {}).values():
+            if not info.get('consumed'):
+                try:
+                    shm = shared_memory.SharedMemory(name=info['shm'])
+                    shm.close()
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _describe_exit(returncode: int) -> str:
+        """根据子进程退出码生成错误说明"""
+        if returncode is not None and returncode < 0:
+            import signal
+            if -returncode == signal.SIGXCPU:
+                return "解析占用CPU时间过长，文件可能异常"
+            if -returncode == signal.SIGKILL:
+                return "解析进程被终止，文件可能过大或异常"
+        return "解析文件时资源不足或进程异常退出，文件可能过大或异常"
+
+
+def _get_peak_rss_mb() -> Optional[float]:
+    """获取子进程的峰值常驻内存（MB），无法获取时返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(peak / 1024 / (1024 if sys.platform == 'darwin' else 1), 1)
+
+
+def _child_main():
+    """子进程入口：读取请求，设置资源限制，解析文件并把结果写入共享内存"""
+    # 协议消息使用原始标准输出，其他输出重定向到标准错误
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8')
+    sys.stdout = sys.stderr
+
+    def send(message: Dict[str, Any]):
+        protocol.write(json.dumps(message, ensure_ascii=False) + '\n')
+        protocol.flush()
+
+    # 先导入解析所需的库（预先启动的子进程在等待请求前完成导入），收到空请求（父进程退出）时直接结束
+    from utils.data_loader import DataLoader
+    import openpyxl  # noqa: F401
+    import pyarrow  # noqa: F401
+
+    line = sys.stdin.readline()
+    if not line.strip():
+        return
+    request = json.loads(line)
+    if 'path' in request:
+        # 按路径读取，openpyxl 通过文件描述符按需读取 zip 中的各个部分
+        content = request['path']
+    else:
+        input_shm = shared_memory.SharedMemory(name=request['input'])
+        _untrack(input_shm)
+        content = io.BytesIO(bytes(input_shm.buf[:request['size']]))
+        input_shm.close()
+
+    # 读取输入后再设置资源限制，之后的解析和结果序列化都受限制约束
+    if resource is not None:
+        memory_bytes = request['memory_limit_mb'] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        resource.setrlimit(resource.RLIMIT_CPU, (request['cpu_limit_s'], request['cpu_limit_s'] + 5))
+
+    result = DataLoader.load_excel_data(
+        content, progress_callback=lambda progress, message: send(
+            {'type': 'progress', 'progress': progress, 'message': message}),
+        extra_columns=request.get('extra_columns'), only_columns=request.get('only_columns'))
+
+    # 先全部序列化，任一数据表无法转换时整个解析失败，不传回部分结果
+    try:
+        serialized = {key: ArrowCodec.serialize(df) for key, df in zip(FRAME_KEYS, result[:4]) if df is not None}
+    except Exception as e:
+        send({'type': 'result', 'frames': {}, 'error': f"解析结果无法转换: {e}", 'peak_rss_mb': _get_peak_rss_mb()})
+        return
+
+    frames = {}
+    for key, data in serialized.items():
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        shm.buf[:len(data)] = data
+        _untrack(shm)
+        frames[key] = {'shm': shm.name, 'size': len(data), 'format': 'arrow'}
+        shm.close()
+    send({'type': 'result', 'frames': frames, 'error': result[4], 'peak_rss_mb': _get_peak_rss_mb()})
+
+
+# 全局沙箱解析器实例
+sandbox_parser = SandboxParser()
+
+
+if __name__ == "__main__":
+    _child_main()
@@ -0,0 +1,153 @@
+"""
+数据类型规范化
+导入后将列名别名统一为标准列名、计算派生列，将名称类文本列转换为分类类型、金额列统一为 float64，
+记录无法识别的单元格并统计节省的内存
+"""
+
+import re
+from typing import Dict, Any
+
+import pandas as pd
+
+from config.column_config import (
+    CATEGORICAL_COLUMNS, NUMERIC_COLUMN_PATTERNS, COERCION_SAMPLE_LIMIT, COLUMN_ALIASES, DERIVED_COLUMNS
+)
+
+NUMERIC_PATTERNS = [re.compile(pattern) for pattern in NUMERIC_COLUMN_PATTERNS]
+WEEK_NUMBER_PATTERN = re.compile(r'^第(\d+)周')
+
+
+class SchemaNormalizer:
+    """数据类型规范化类"""
+
+    @staticmethod
+    def is_numeric_column(column) -> bool:
+        """按列名判断是否为金额/分数列"""
+        name = str(column)
+        return name not in CATEGORICAL_COLUMNS and any(pattern.search(name) for pattern in NUMERIC_PATTERNS)
+
+    @staticmethod
+    def _to_categorical(series: pd.Series) -> pd.Series:
+        """文本列转换为分类类型（含非文本值或已是分类类型时保持不变）"""
+        if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(series):
+            return series
+        values = series.dropna()
+        if not values.map(lambda value: isinstance(value, str)).all():
+            return series
+        return series.astype('category')
+
+    @staticmethod
+    def _to_float(series: pd.Series, errors: Dict[str, Any]) -> pd.Series:
+        """金额列转换为 float64，无法识别的单元格置空并记录行号和原值"""
+        if pd.api.types.is_float_dtype(series) and series.dtype == 'float64':
+            return series
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series.astype('float64')
+
+        numeric = pd.to_numeric(series, errors='coerce')
+        invalid = numeric.isna() & series.notna() & (series.astype(str).str.strip() != '')
+        if invalid.any():
+            samples = series[invalid].head(COERCION_SAMPLE_LIMIT)
+            errors[str(series.name)] = {
+                'count': int(invalid.sum()),
+                # Excel 行号：表头占第1行，数据从第2行开始
+                'samples': [{'row': int(index) + 2, 'value': str(value)} for index, value in samples.items()]
+            }
+        return numeric.astype('float64')
+
+    @staticmethod
+    def get_alias_columns(sheet_name: str) -> set:
+        """获取工作表所有可能的列名别名（导入列裁剪时需要保留）"""
+        return {alias for aliases in COLUMN_ALIASES.get(sheet_name, {}).values() for alias in aliases}
+
+    @staticmethod
+    def resolve_columns(df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
+        """
+        按别名表将列重命名为标准列名，并计算缺少的派生列
+
+        Args:
+            df: 刚读取的数据表
+            sheet_name: 工作表名称
+
+        Returns:
+            使用标准列名的数据表，df.attrs['column_mapping'] 记录 标准列名 -> 文件中的列名，
+            df.attrs['derived_columns'] 记录导入时计算的列
+        """
+        if df is None:
+            return df
+
+        mapping, renames = {}, {}
+        for canonical, aliases in COLUMN_ALIASES.get(sheet_name, {}).items():
+            physical = next((alias for alias in aliases if alias in df.columns), None)
+            if physical is None:
+                continue
+            mapping[canonical] = physical
+            if physical != canonical and canonical not in df.columns:
+                renames[physical] = canonical
+        if renames:
+            df = df.rename(columns=renames)
+
+        derived = []
+        weeks = sorted({int(match.group(1)) for col in df.columns if (match := WEEK_NUMBER_PATTERN.match(str(col)))})
+        for rule in DERIVED_COLUMNS.get(sheet_name, []):
+            for week in (weeks if '{week}' in rule['name'] else [None]):
+                name = rule['name'].format(week=week)
+                sources = [source.format(week=week) for source in rule['sum']]
+                if name in df.columns or not all(source in df.columns for source in sources):
+                    continue
+                df[name] = sum(pd.to_numeric(df[source], errors='coerce').fillna(0) for source in sources)
+                derived.append(name)
+
+        df.attrs['column_mapping'] = mapping
+        df.attrs['derived_columns'] = derived
+        return df
+
+    @staticmethod
+    def normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        规范化数据表的列类型
+
+        Args:
+            df: 刚读取的数据表
+
+        Returns:
+            规范化后的数据表，df.attrs['schema_report'] 记录：
+            内存占用变化（KB）、转换为分类类型的列、转换为 float64 的列、无法识别的数值单元格
+        """
+        if df is None or df.empty:
+            return df
+
+        memory_before = int(df.memory_usage(deep=True).sum())
+        categorical_columns, numeric_columns = [], []
+        coercion_errors: Dict[str, Any] = {}
+        columns = {}
+        for column in df.columns:
+            series = df[column]
+            if column in CATEGORICAL_COLUMNS:
+                converted = SchemaNormalizer._to_categorical(series)
+                if converted is not series:
+                    categorical_columns.append(str(column))
+            elif SchemaNormalizer.is_numeric_column(column):
+                converted = SchemaNormalizer._to_float(series, coercion_errors)
+                if converted is not series:
+                    numeric_columns.append(str(column))
+            else:
+                converted = series
+            columns[column] = converted
+
+        result = pd.DataFrame(columns, index=df.index)
+        result.attrs = dict(df.attrs)
+        memory_after = int(result.memory_usage(deep=True).sum())
+        result.attrs['schema_report'] = {
+            'memory_before_kb': round(memory_before / 1024, 1),
+            'memory_after_kb': round(memory_after / 1024, 1),
+            'saved_kb': round((memory_before - memory_after) / 1024, 1),
+            'categorical_columns': categorical_columns,
+            'numeric_columns': numeric_columns,
+            'coercion_errors': coercion_errors
+        }
+        return result
+
+
+# 全局数据类型规范化实例
+schema_normalizer = SchemaNormalizer()
@@ -0,0 +1,98 @@
+"""
+上传文件暂存
+上传的文件在提交解析前写入磁盘上的临时文件，解析器（沙箱子进程或进程内的 openpyxl）
+直接按路径读取，zip 目录和各工作表按需从文件中读取，不再在内存中复制整个文件
+"""
+
+import glob
+import os
+import tempfile
+import time
+from typing import Optional
+
+from config.ingestion_config import UPLOAD_SPOOL_DIR_ENV, UPLOAD_SPOOL_PREFIX, UPLOAD_SPOOL_STALE_S
+
+# 从不支持 getbuffer 的文件对象复制时每次读取的字节数
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadSpool:
+    """上传文件暂存类"""
+
+    @staticmethod
+    def get_spool_dir() -> Optional[str]:
+        """获取暂存目录（未配置时返回None，使用系统临时目录）"""
+        spool_dir = os.environ.get(UPLOAD_SPOOL_DIR_ENV)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+            return spool_dir
+        return None
+
+    @staticmethod
+    def spool(file_obj, suffix: str = '.xlsx') -> str:
+        """
+        将上传的文件对象写入暂存文件
+
+        支持 getbuffer 的对象（如 Streamlit 的 UploadedFile）直接写出内存视图，不产生额外副本。
+
+        Args:
+            file_obj: 上传的文件对象（写入后恢复到开头）
+            suffix: 暂存文件扩展名
+
+        Returns:
+            暂存文件路径，使用完后调用 release 删除
+
+        Raises:
+            OSError: 写入暂存文件失败（如磁盘空间不足）
+        """
+        spool_dir = UploadSpool.get_spool_dir()
+        UploadSpool.cleanup_stale(spool_dir)
+        fd, path = tempfile.mkstemp(prefix=UPLOAD_SPOOL_PREFIX, suffix=suffix, dir=spool_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if hasattr(file_obj, 'getbuffer'):
+                    with file_obj.getbuffer() as view:
+                        f.write(view)
+                else:
+                    file_obj.seek(0)
+                    for chunk in iter(lambda: file_obj.read(SPOOL_CHUNK_SIZE), b''):
+                        f.write(chunk)
+                    file_obj.seek(0)
+        except BaseException:
+            UploadSpool.release(path)
+            raise
+        return path
+
+    @staticmethod
+    def release(path: Optional[str]):
+        """删除暂存文件（文件不存在时忽略）"""
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def cleanup_stale(spool_dir: Optional[str] = None, max_age_s: float = UPLOAD_SPOOL_STALE_S) -> int:
+        """
+        删除进程异常退出后残留的过期暂存文件
+
+        Returns:
+            删除的文件数
+        """
+        pattern = os.path.join(spool_dir or tempfile.gettempdir(), f"{UPLOAD_SPOOL_PREFIX}*")
+        cutoff = time.time() - max_age_s
+        removed = 0
+        for path in glob.glob(pattern):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+# 全局上传暂存实例
+upload_spool = UploadSpool()
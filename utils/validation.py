@@ -0,0 +1,209 @@
+"""
+数据校验引擎
+导入时对各工作表进行向量化校验：必需列、数值类型、数据完整性、负数金额、名称重复、
+合计行与明细之和、周度数据与月度汇总，生成带工作表、列和 Excel 行号的结构化报告
+"""
+
+import re
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.validation_config import (
+    REQUIRED_COLUMNS, UNIQUE_COLUMNS, TOTAL_ROW_COLUMNS, TOTAL_ROW_LABEL, AMOUNT_COLUMN_PATTERNS,
+    WEEKLY_SUM_COLUMNS, AMOUNT_TOLERANCE, AMOUNT_RELATIVE_TOLERANCE, ISSUE_ROW_LIMIT, CHECK_LABELS
+)
+
+AMOUNT_PATTERNS = [re.compile(pattern) for pattern in AMOUNT_COLUMN_PATTERNS]
+WEEK_NUMBER_PATTERN = re.compile(r'^第(\d+)周')
+
+SEVERITY_ERROR = 'error'
+SEVERITY_WARNING = 'warning'
+
+
+class DataValidator:
+    """数据校验类"""
+
+    @staticmethod
+    def _excel_rows(index) -> List[int]:
+        """行索引转换为 Excel 行号（表头占第1行，数据从第2行开始），最多 ISSUE_ROW_LIMIT 个"""
+        return [int(row) + 2 for row in index[:ISSUE_ROW_LIMIT]]
+
+    @staticmethod
+    def _issue(sheet_name: str, check: str, message: str, column: Optional[str] = None,
+               rows=None, count: Optional[int] = None, severity: str = SEVERITY_WARNING) -> Dict[str, Any]:
+        """生成一条校验问题"""
+        rows = [] if rows is None else DataValidator._excel_rows(rows)
+        return {
+            'sheet': sheet_name,
+            'check': check,
+            'severity': severity,
+            'column': column,
+            'count': int(count if count is not None else len(rows)),
+            'rows': rows,
+            'message': message,
+        }
+
+    @staticmethod
+    def _mismatch(actual: np.ndarray, expected: np.ndarray) -> np.ndarray:
+        """金额核对：超出允许误差的位置（任一侧为空时不比较）"""
+        valid = ~(np.isnan(actual) | np.isnan(expected))
+        close = np.isclose(actual, expected, rtol=AMOUNT_RELATIVE_TOLERANCE, atol=AMOUNT_TOLERANCE)
+        return valid & ~close
+
+    @staticmethod
+    def is_amount_column(column) -> bool:
+        """按列名判断是否为金额列"""
+        name = str(column)
+        return any(pattern.search(name) for pattern in AMOUNT_PATTERNS)
+
+    @staticmethod
+    def validate_sheet(df: Optional[pd.DataFrame], sheet_name: str) -> List[Dict[str, Any]]:
+        """
+        校验单个工作表
+
+        Args:
+            df: 已规范化列名和类型的数据表（数值列中无法识别的单元格记录在 df.attrs['schema_report']）
+            sheet_name: 工作表名称
+
+        Returns:
+            校验问题列表，每项包含 sheet、check、severity（error/warning）、column、count、
+            rows（Excel 行号，最多 ISSUE_ROW_LIMIT 个）和 message
+        """
+        if df is None:
+            return []
+        if df.empty:
+            return [DataValidator._issue(sheet_name, 'missing_values', "工作表没有数据", severity=SEVERITY_ERROR)]
+
+        issues = []
+
+        # 必需列
+        required = [col for col in REQUIRED_COLUMNS.get(sheet_name, []) if col in df.columns]
+        missing = [col for col in REQUIRED_COLUMNS.get(sheet_name, []) if col not in df.columns]
+        if missing:
+            issues.append(DataValidator._issue(
+                sheet_name, 'required_columns', f"缺少必要列: {', '.join(missing)}",
+                column=', '.join(missing), count=len(missing), severity=SEVERITY_ERROR))
+
+        # 合计行不参与逐行校验
+        total_col = TOTAL_ROW_COLUMNS.get(sheet_name)
+        is_total = (df[total_col].astype(object) == TOTAL_ROW_LABEL).to_numpy() \
+            if total_col in df.columns else np.zeros(len(df), dtype=bool)
+        body = df[~is_total]
+
+        # 数值类型（规范化时无法识别的单元格）
+        coercion_errors = (df.attrs.get('schema_report') or {}).get('coercion_errors', {})
+        for column, detail in coercion_errors.items():
+            rows = [sample['row'] - 2 for sample in detail['samples']]
+            issues.append(DataValidator._issue(
+                sheet_name, 'numeric_type', f"{column} 中有 {detail['count']} 个单元格不是数字，已按空值处理",
+                column=column, rows=rows, count=detail['count']))
+
+        # 数据完整性：必需列中的空值
+        if required:
+            nulls = body[required].isna()
+            for column in nulls.columns[nulls.any().to_numpy()]:
+                index = body.index[nulls[column].to_numpy()]
+                issues.append(DataValidator._issue(
+                    sheet_name, 'missing_values', f"{column} 有 {len(index)} 个空值",
+                    column=column, rows=index, count=len(index)))
+
+        # 金额列不能为负数
+        amount_columns = [col for col in df.columns
+                          if DataValidator.is_amount_column(col) and pd.api.types.is_float_dtype(df[col])]
+        if amount_columns:
+            negative = body[amount_columns].to_numpy() < 0
+            for position in np.flatnonzero(negative.any(axis=0)):
+                index = body.index[negative[:, position]]
+                column = amount_columns[position]
+                issues.append(DataValidator._issue(
+                    sheet_name, 'negative_amount', f"{column} 有 {len(index)} 个负数",
+                    column=column, rows=index, count=len(index)))
+
+        # 名称重复
+        unique_columns = UNIQUE_COLUMNS.get(sheet_name, [])
+        if unique_columns and all(col in df.columns for col in unique_columns):
+            names = body[unique_columns]
+            duplicated = (names.duplicated(keep=False) & names.notna().all(axis=1)).to_numpy()
+            if duplicated.any():
+                index = body.index[duplicated]
+                duplicate_names = names[unique_columns[-1]][duplicated].astype(str).unique()
+                issues.append(DataValidator._issue(
+                    sheet_name, 'duplicate_name',
+                    f"{unique_columns[-1]} 重复: {'、'.join(duplicate_names[:ISSUE_ROW_LIMIT])}",
+                    column=unique_columns[-1], rows=index, count=len(index)))
+
+        # 合计行与明细之和
+        if is_total.any() and amount_columns:
+            total_index = df.index[is_total]
+            expected = body[amount_columns].sum().to_numpy()
+            actual = df.loc[total_index[0], amount_columns].to_numpy(dtype=float)
+            for position in np.flatnonzero(DataValidator._mismatch(actual, expected)):
+                column = amount_columns[position]
+                issues.append(DataValidator._issue(
+                    sheet_name, 'total_row',
+                    f"合计行 {column} 为 {actual[position]:,.2f}，明细之和为 {expected[position]:,.2f}",
+                    column=column, rows=total_index[:1]))
+
+        # 周度数据之和与月度汇总
+        weeks = sorted({int(match.group(1)) for col in df.columns if (match := WEEK_NUMBER_PATTERN.match(str(col)))})
+        for monthly_col, weekly_template in WEEKLY_SUM_COLUMNS.get(sheet_name, {}).items():
+            weekly_cols = [weekly_template.format(week=week) for week in weeks]
+            weekly_cols = [col for col in weekly_cols if col in df.columns]
+            if monthly_col not in df.columns or not weekly_cols:
+                continue
+            weekly_sum = df[weekly_cols].sum(axis=1, min_count=1).to_numpy(dtype=float)
+            mismatch = DataValidator._mismatch(df[monthly_col].to_numpy(dtype=float), weekly_sum)
+            if mismatch.any():
+                index = df.index[mismatch]
+                issues.append(DataValidator._issue(
+                    sheet_name, 'weekly_sum', f"{monthly_col} 有 {len(index)} 行与 {len(weekly_cols)} 周数据之和不一致",
+                    column=monthly_col, rows=index, count=len(index)))
+
+        return issues
+
+    @staticmethod
+    def build_report(frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Any]:
+        """
+        汇总各工作表的校验结果
+
+        Args:
+            frames: 工作表名称 -> 数据表；导入时已校验的数据表直接使用 df.attrs['validation_issues']
+
+        Returns:
+            {valid: 没有错误, error_count, warning_count, issues: 校验问题列表, elapsed_ms: 校验耗时}
+        """
+        start = time.perf_counter()
+        issues = []
+        for sheet_name, df in frames.items():
+            if df is None:
+                continue
+            sheet_issues = df.attrs.get('validation_issues')
+            if sheet_issues is None:
+                sheet_issues = DataValidator.validate_sheet(df, sheet_name)
+            issues.extend(sheet_issues)
+
+        error_count = sum(issue['severity'] == SEVERITY_ERROR for issue in issues)
+        return {
+            'valid': error_count == 0,
+            'error_count': error_count,
+            'warning_count': len(issues) - error_count,
+            'issues': issues,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    @staticmethod
+    def format_issue(issue: Dict[str, Any]) -> str:
+        """校验问题转换为一行说明文字"""
+        location = f"【{issue['sheet']}】{CHECK_LABELS.get(issue['check'], issue['check'])}：{issue['message']}"
+        if issue['rows']:
+            rows = "、".join(str(row) for row in issue['rows'])
+            more = "等" if issue['count'] > len(issue['rows']) else ""
+            location += f"（第 {rows} 行{more}）"
+        return location
+
+
+# 全局数据校验器实例
+data_validator = DataValidator()
@@ -0,0 +1,334 @@
+"""
+测试数据生成器
+按指定规模生成可复现的 员工销售回款统计_YYYY年M月.xlsx 文件
+
+用法:
+    python -m utils.workbook_generator --employees 500 --teams 40 --departments 12 --months 3
+"""
+
+import argparse
+import datetime
+import os
+import re
+import zipfile
+from typing import Dict, List, Tuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# 工作表名称
+SCORE_SHEET = '员工积分数据'
+SALES_SHEET = '销售回款数据统计'
+DEPARTMENT_SHEET = '部门销售回款统计'
+RANKING_SHEET = '销售回款超期账款排名'
+
+# 积分构成类别（与积分统计页面一致）
+SCORE_CATEGORIES = ['销售额目标分', '回款额目标分', '超期账款追回分',
+                    '销售排名分', '回款排名分',
+                    '销售进步分', '回款进步分', '基础分', '小组加分']
+
+SURNAMES = list('王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈')
+GIVEN_NAMES = ['伟', '芳', '娜', '敏', '静', '强', '磊', '军', '洋', '勇', '艳', '杰', '涛', '明', '超',
+               '秀英', '霞', '平', '刚', '桂英', '子涵', '浩然', '思远', '雨桐', '欣怡', '俊杰', '文博', '嘉怡']
+TEAM_WORDS = ['猎鹰', '雄狮', '猛虎', '飞龙', '骏马', '苍狼', '海豚', '火凤', '银狐', '金鹏']
+DEPARTMENT_REGIONS = ['华北', '华东', '华南', '华中', '西南', '西北', '东北', '京津', '长三角', '珠三角']
+
+
+class WorkbookGenerator:
+    """测试数据生成器类"""
+
+    def __init__(self, employees: int = 50, teams: int = 8, departments: int = 5,
+                 weeks: int = 4, seed: int = 42):
+        """
+        Args:
+            employees: 员工数量
+            teams: 小组数量
+            departments: 部门数量
+            weeks: 每月周数
+            seed: 随机种子（相同参数和种子生成完全相同的数据）
+        """
+        if employees < 1 or teams < 1 or departments < 1 or weeks < 1:
+            raise ValueError("员工、小组、部门和周数必须大于0")
+
+        self.employees = employees
+        self.teams = min(teams, employees)
+        self.departments = min(departments, employees)
+        self.weeks = weeks
+        self.seed = seed
+
+        # 员工基础信息在各月份之间保持一致
+        rng = np.random.default_rng([seed, 0])
+        self.employee_names = self._build_names(employees)
+        self.team_names = self._build_labels(self.teams, TEAM_WORDS, '队')
+        self.department_names = self._build_labels(self.departments, DEPARTMENT_REGIONS, '销售部')
+        self.employee_teams = np.array(self.team_names)[np.arange(employees) % self.teams]
+        self.employee_departments = np.array(self.department_names)[rng.permutation(employees) % self.departments]
+        # 员工能力水平决定月度业绩的基准
+        self.base_sales = rng.lognormal(mean=12.5, sigma=0.5, size=employees).round(-2)
+
+    @staticmethod
+    def _build_names(count: int) -> List[str]:
+        """生成不重复的员工姓名"""
+        per_round = len(SURNAMES) * len(GIVEN_NAMES)
+        names = []
+        for i in range(count):
+            name = SURNAMES[i % len(SURNAMES)] + GIVEN_NAMES[(i // len(SURNAMES)) % len(GIVEN_NAMES)]
+            if i >= per_round:
+                name += str(i // per_round)
+            names.append(name)
+        return names
+
+    @staticmethod
+    def _build_labels(count: int, words: List[str], suffix: str) -> List[str]:
+        """生成不重复的小组或部门名称"""
+        return [f"{words[i % len(words)]}{suffix}" + (str(i // len(words) + 1) if i >= len(words) else '')
+                for i in range(count)]
+
+    def _monthly_amounts(self, year: int, month: int) -> Dict[str, np.ndarray]:
+        """生成某月每位员工的周度金额（同一月份结果固定）"""
+        rng = np.random.default_rng([self.seed, year, month])
+        n, w = self.employees, self.weeks
+
+        month_factor = rng.uniform(0.8, 1.2, size=n)
+        weekly_sales = (self.base_sales[:, None] * month_factor[:, None] / w
+                        * rng.uniform(0.3, 1.7, size=(n, w))).round(-1)
+        # 部分员工某周没有业绩
+        weekly_sales[rng.random((n, w)) < 0.08] = 0
+
+        weekly_normal = (weekly_sales * rng.uniform(0.4, 0.9, size=(n, w))).round(-1)
+        weekly_overdue = (weekly_sales * rng.uniform(0.0, 0.2, size=(n, w))).round(-1)
+        weekly_uncollected = (self.base_sales[:, None] * rng.uniform(0.0, 0.15, size=(n, w))).round(-1)
+
+        sales_task = (self.base_sales * rng.uniform(0.9, 1.1, size=n)).round(-3)
+        payment_task = (sales_task * 0.8).round(-3)
+
+        return {
+            'weekly_sales': weekly_sales,
+            'weekly_normal': weekly_normal,
+            'weekly_overdue': weekly_overdue,
+            'weekly_uncollected': weekly_uncollected,
+            'sales_task': sales_task,
+            'payment_task': payment_task
+        }
+
+    @staticmethod
+    def _previous_month(year: int, month: int) -> Tuple[int, int]:
+        """获取上一个月份"""
+        return (year - 1, 12) if month == 1 else (year, month - 1)
+
+    def build_sales_df(self, year: int, month: int) -> pd.DataFrame:
+        """生成销售回款数据统计工作表（包含合计行）"""
+        amounts = self._monthly_amounts(year, month)
+        prev_amounts = self._monthly_amounts(*self._previous_month(year, month))
+
+        data = {
+            '员工姓名': self.employee_names,
+            '队名': self.employee_teams,
+            '部门': self.employee_departments,
+            '统计月份': f"{year}年{month}月",
+            '本月销售任务': amounts['sales_task'],
+            '本月回款任务': amounts['payment_task'],
+        }
+        for week in range(self.weeks):
+            week_num = week + 1
+            data[f'第{week_num}周销售额'] = amounts['weekly_sales'][:, week]
+            data[f'第{week_num}周回未超期款'] = amounts['weekly_normal'][:, week]
+            data[f'第{week_num}周回超期款'] = amounts['weekly_overdue'][:, week]
+            data[f'第{week_num}周回款合计'] = amounts['weekly_normal'][:, week] + amounts['weekly_overdue'][:, week]
+            data[f'第{week_num}周逾期未收回额'] = amounts['weekly_uncollected'][:, week]
+
+        df = pd.DataFrame(data)
+        df['本月销售额'] = amounts['weekly_sales'].sum(axis=1)
+        df['本月回未超期款'] = amounts['weekly_normal'].sum(axis=1)
+        df['本月回超期款'] = amounts['weekly_overdue'].sum(axis=1)
+        df['本月回款合计'] = df['本月回未超期款'] + df['本月回超期款']
+        df['月末逾期未收回额'] = amounts['weekly_uncollected'][:, -1]
+        df['上月销售额'] = prev_amounts['weekly_sales'].sum(axis=1)
+        df['上月回款额'] = (prev_amounts['weekly_normal'] + prev_amounts['weekly_overdue']).sum(axis=1)
+        df['销售业绩完成进度'] = (df['本月销售额'] / df['本月销售任务']).round(4)
+        df['回款业绩完成进度'] = (df['本月回款合计'] / df['本月回款任务']).round(4)
+
+        return self._append_total_row(df, '员工姓名', text_columns=['队名', '部门', '统计月份'])
+
+    @staticmethod
+    def _append_total_row(df: pd.DataFrame, label_col: str, text_columns: List[str]) -> pd.DataFrame:
+        """添加合计行（金额求和，完成进度按合计重新计算）"""
+        numeric_cols = [col for col in df.columns if col != label_col and col not in text_columns]
+        total = df[numeric_cols].sum()
+        if '销售业绩完成进度' in total.index:
+            total['销售业绩完成进度'] = round(total['本月销售额'] / total['本月销售任务'], 4)
+            total['回款业绩完成进度'] = round(total['本月回款合计'] / total['本月回款任务'], 4)
+        total_row = total.to_dict()
+        total_row[label_col] = '合计'
+        if '统计月份' in df.columns:
+            total_row['统计月份'] = df['统计月份'].iloc[0]
+        return pd.concat([df, pd.DataFrame([total_row])], ignore_index=True)
+
+    def build_department_df(self, sales_df: pd.DataFrame) -> pd.DataFrame:
+        """根据销售数据汇总部门销售回款统计工作表（包含合计行）"""
+        employee_rows = sales_df[sales_df['员工姓名'] != '合计']
+        value_cols = ['本月销售额', '本月回未超期款', '本月回超期款', '月末逾期未收回额']
+        for week in range(1, self.weeks + 1):
+            value_cols += [f'第{week}周销售额', f'第{week}周回未超期款', f'第{week}周回超期款']
+
+        dept_df = (employee_rows.groupby('部门', sort=False)[value_cols].sum()
+                   .reindex(self.department_names).fillna(0).reset_index())
+        dept_df.insert(1, '统计月份', sales_df['统计月份'].iloc[0])
+        return self._append_total_row(dept_df, '部门', text_columns=['统计月份'])
+
+    def build_ranking_df(self, sales_df: pd.DataFrame) -> pd.DataFrame:
+        """根据销售数据生成销售回款超期账款排名工作表"""
+        employee_rows = sales_df[sales_df['员工姓名'] != '合计']
+        ranking_columns = []
+        for week in range(1, self.weeks + 1):
+            ranking_columns += [f'第{week}周销售额', f'第{week}周回款合计']
+        ranking_columns += ['本月销售额', '本月回款合计', '月末逾期未收回额']
+
+        frames = []
+        for col in ranking_columns:
+            ranked = employee_rows[['员工姓名', col]].sort_values(col, ascending=False, kind='mergesort')
+            frames.append(pd.DataFrame({
+                '排名类型': col,
+                '排名': np.arange(1, len(ranked) + 1),
+                '姓名': ranked['员工姓名'].to_numpy(),
+                '金额': ranked[col].to_numpy()
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def build_score_df(self, sales_df: pd.DataFrame, year: int, month: int) -> pd.DataFrame:
+        """根据销售数据生成员工积分数据工作表"""
+        rng = np.random.default_rng([self.seed, year, month, 1])
+        rows = sales_df[sales_df['员工姓名'] != '合计'].reset_index(drop=True)
+        n = len(rows)
+
+        sales_rank = rows['本月销售额'].rank(ascending=False, method='first').to_numpy()
+        payment_rank = rows['本月回款合计'].rank(ascending=False, method='first').to_numpy()
+
+        df = pd.DataFrame({
+            '员工姓名': rows['员工姓名'],
+            '队名': rows['队名'],
+            '统计月份': rows['统计月份'],
+            '销售额目标分': np.clip(rows['销售业绩完成进度'] * 20, 0, 30).round(1),
+            '回款额目标分': np.clip(rows['回款业绩完成进度'] * 20, 0, 30).round(1),
+            '超期账款追回分': (rows['本月回超期款'] / rows['本月回超期款'].max() * 10).fillna(0).round(1),
+            '销售排名分': ((n - sales_rank) / max(n - 1, 1) * 10).round(1),
+            '回款排名分': ((n - payment_rank) / max(n - 1, 1) * 10).round(1),
+            '销售进步分': np.clip((rows['本月销售额'] - rows['上月销售额']) / rows['上月销售额'].replace(0, np.nan) * 20,
+                             -5, 5).fillna(0).round(1),
+            '回款进步分': np.clip((rows['本月回款合计'] - rows['上月回款额']) / rows['上月回款额'].replace(0, np.nan) * 20,
+                             -5, 5).fillna(0).round(1),
+            '基础分': 10,
+            '小组加分': rng.integers(0, 6, size=n),
+        })
+        df['个人总积分'] = df[SCORE_CATEGORIES].sum(axis=1).round(1)
+        df['加权小组总分'] = df.groupby('队名')['个人总积分'].transform('mean').round(2)
+        return df
+
+    def generate_month(self, year: int, month: int) -> Dict[str, pd.DataFrame]:
+        """生成某月的全部四个工作表"""
+        sales_df = self.build_sales_df(year, month)
+        return {
+            SCORE_SHEET: self.build_score_df(sales_df, year, month),
+            SALES_SHEET: sales_df,
+            DEPARTMENT_SHEET: self.build_department_df(sales_df),
+            RANKING_SHEET: self.build_ranking_df(sales_df),
+        }
+
+    @staticmethod
+    def get_file_name(year: int, month: int) -> str:
+        """获取标准文件名"""
+        return f"员工销售回款统计_{year}年{month}月.xlsx"
+
+    @staticmethod
+    def _pin_timestamps(path: str, timestamp: datetime.datetime):
+        """
+        将工作簿中随写入时间变化的内容固定为指定时间，使相同数据生成的文件逐字节相同
+
+        openpyxl 保存时把当前时间写入 docProps/core.xml 的创建/修改时间，zip 中每个条目也带有写入时间。
+        """
+        stamp = timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')
+        with zipfile.ZipFile(path) as source:
+            entries = [(info, source.read(info.filename)) for info in source.infolist()]
+
+        temp_path = f"{path}.tmp"
+        with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info, data in entries:
+                if info.filename == 'docProps/core.xml':
+                    data = re.sub(rb'(<dcterms:(?:created|modified)[^>]*>)[^<]*', rb'\g<1>' + stamp.encode(), data)
+                pinned = zipfile.ZipInfo(info.filename, date_time=timestamp.timetuple()[:6])
+                pinned.compress_type = zipfile.ZIP_DEFLATED
+                pinned.external_attr = info.external_attr
+                target.writestr(pinned, data)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def write_workbook(path: str, sheets: Dict[str, pd.DataFrame], timestamp: Optional[datetime.datetime] = None):
+        """
+        将工作表写入Excel文件
+
+        Args:
+            path: 文件路径
+            sheets: 工作表名称 -> 数据
+            timestamp: 文件属性和 zip 条目使用的固定时间（指定时生成的文件逐字节可复现）
+        """
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            for sheet_name, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        if timestamp is not None:
+            WorkbookGenerator._pin_timestamps(path, timestamp)
+
+    def generate(self, output_dir: str, start_year: int, start_month: int, months: int = 1) -> List[str]:
+        """
+        生成连续多个月份的数据文件
+
+        Args:
+            output_dir: 输出目录
+            start_year: 起始年份
+            start_month: 起始月份
+            months: 月份数量
+
+        Returns:
+            生成的文件路径列表
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        year, month = start_year, start_month
+        for _ in range(months):
+            path = os.path.join(output_dir, self.get_file_name(year, month))
+            # 文件时间固定为该月1日，相同参数和种子生成的文件逐字节相同
+            self.write_workbook(path, self.generate_month(year, month), timestamp=datetime.datetime(year, month, 1))
+            paths.append(path)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return paths
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="生成员工销售回款统计测试数据文件")
+    parser.add_argument('--output-dir', default='generated_data', help="输出目录（默认 generated_data）")
+    parser.add_argument('--employees', type=int, default=50, help="员工数量（默认 50）")
+    parser.add_argument('--teams', type=int, default=8, help="小组数量（默认 8）")
+    parser.add_argument('--departments', type=int, default=5, help="部门数量（默认 5）")
+    parser.add_argument('--weeks', type=int, default=4, help="每月周数（默认 4）")
+    parser.add_argument('--months', type=int, default=1, help="连续生成的月份数量（默认 1）")
+    parser.add_argument('--start', default='2024-01', help="起始年月，格式 YYYY-MM（默认 2024-01）")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子（默认 42）")
+    args = parser.parse_args()
+
+    try:
+        start_year, start_month = (int(part) for part in args.start.split('-'))
+        if not 1 <= start_month <= 12:
+            raise ValueError
+    except ValueError:
+        parser.error("--start 格式应为 YYYY-MM")
+
+    generator = WorkbookGenerator(
+        employees=args.employees, teams=args.teams, departments=args.departments,
+        weeks=args.weeks, seed=args.seed
+    )
+    for path in generator.generate(args.output_dir, start_year, start_month, args.months):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
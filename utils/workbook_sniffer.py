@@ -0,0 +1,204 @@
+"""
+工作簿快速探测
+只读取 xlsx 压缩包中的工作簿清单和各工作表的表头行，毫秒级获取工作表名称、列名、周数和大致行数，
+无需完整解析工作簿
+"""
+
+import posixpath
+import re
+import time
+import zipfile
+from typing import Optional, Dict, Any, List
+from xml.etree.ElementTree import iterparse
+
+# xlsx 使用的 XML 命名空间
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# 系统识别的工作表
+EXPECTED_SHEETS = ['员工积分数据', '销售回款数据统计', '部门销售回款统计', '销售回款超期账款排名']
+
+# 压缩包安全限制：解压后总大小上限和最大压缩比（防止压缩炸弹）
+MAX_UNCOMPRESSED_BYTES = 1024 * 1024 * 1024
+MAX_COMPRESSION_RATIO = 200
+
+WEEK_COLUMN_PATTERN = re.compile(r'第(\d+)周')
+CELL_REF_PATTERN = re.compile(r'([A-Z]+)(\d+)')
+
+
+class WorkbookSniffError(Exception):
+    """工作簿探测失败（不是有效的 xlsx 文件或压缩包异常）"""
+
+
+def _column_index(letters: str) -> int:
+    """将列字母转换为从0开始的列号"""
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - 64)
+    return index - 1
+
+
+class WorkbookSniffer:
+    """工作簿快速探测类"""
+
+    @staticmethod
+    def sniff(file_obj, sheets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        探测工作簿结构
+
+        Args:
+            file_obj: 文件路径或上传的文件对象（读取后恢复到开头）
+            sheets: 需要读取表头的工作表（默认为系统识别的工作表）
+
+        Returns:
+            {
+                'sheet_names': 全部工作表名称,
+                'expected_sheets': 包含的系统识别工作表,
+                'sheets': {工作表: {'columns': 列名列表, 'approx_rows': 大致数据行数}},
+                'week_count': 销售数据中的周数,
+                'uncompressed_bytes': 解压后总大小,
+                'compression_ratio': 压缩比,
+                'elapsed_ms': 探测耗时
+            }
+
+        Raises:
+            WorkbookSniffError: 文件不是有效的 xlsx 或压缩包超出安全限制
+        """
+        start = time.perf_counter()
+        sheets = EXPECTED_SHEETS if sheets is None else sheets
+        try:
+            with zipfile.ZipFile(file_obj) as archive:
+                infos = archive.infolist()
+                uncompressed = sum(info.file_size for info in infos)
+                compressed = sum(info.compress_size for info in infos) or 1
+                ratio = uncompressed / compressed
+                if uncompressed > MAX_UNCOMPRESSED_BYTES or ratio > MAX_COMPRESSION_RATIO:
+                    raise WorkbookSniffError(
+                        f"文件解压后约 {uncompressed / 1024 / 1024:.0f} MB（压缩比 {ratio:.0f}），超出安全限制")
+
+                sheet_paths = WorkbookSniffer._read_sheet_paths(archive)
+                names = list(sheet_paths)
+                sheet_info = {}
+                shared_indices = set()
+                for name in names:
+                    if name in sheets and sheet_paths[name] in archive.NameToInfo:
+                        info = WorkbookSniffer._read_header(archive, sheet_paths[name])
+                        shared_indices.update(index for kind, index in info['cells'].values() if kind == 's')
+                        sheet_info[name] = info
+
+                shared_strings = WorkbookSniffer._read_shared_strings(archive, shared_indices)
+        except zipfile.BadZipFile as e:
+            raise WorkbookSniffError(f"文件不是有效的 xlsx 文件: {e}")
+        except KeyError as e:
+            raise WorkbookSniffError(f"xlsx 文件结构不完整: {e}")
+        finally:
+            if hasattr(file_obj, 'seek'):
+                file_obj.seek(0)
+
+        result_sheets = {}
+        for name, info in sheet_info.items():
+            cells = info['cells']
+            width = max(cells) + 1 if cells else 0
+            columns = []
+            for col in range(width):
+                kind, value = cells.get(col, ('', None))
+                if kind == 's':
+                    value = shared_strings.get(value)
+                columns.append(value if value not in (None, '') else f"Unnamed: {col}")
+            result_sheets[name] = {'columns': columns, 'approx_rows': info['approx_rows']}
+
+        sales_columns = result_sheets.get('销售回款数据统计', {}).get('columns', [])
+        weeks = {int(match.group(1)) for col in sales_columns if (match := WEEK_COLUMN_PATTERN.match(str(col)))}
+
+        return {
+            'sheet_names': names,
+            'expected_sheets': [sheet for sheet in EXPECTED_SHEETS if sheet in names],
+            'sheets': result_sheets,
+            'week_count': len(weeks),
+            'uncompressed_bytes': uncompressed,
+            'compression_ratio': round(ratio, 1),
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    @staticmethod
+    def _read_sheet_paths(archive: zipfile.ZipFile) -> Dict[str, str]:
+        """读取工作簿清单，返回 工作表名称 -> 压缩包内路径（保持工作表顺序）"""
+        targets = {}
+        with archive.open('xl/_rels/workbook.xml.rels') as f:
+            for _, elem in iterparse(f):
+                if elem.tag == f"{PACKAGE_REL_NS}Relationship":
+                    target = elem.get('Target', '')
+                    path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+                    targets[elem.get('Id')] = path
+
+        sheet_paths = {}
+        with archive.open('xl/workbook.xml') as f:
+            for _, elem in iterparse(f):
+                if elem.tag == f"{MAIN_NS}sheet":
+                    sheet_paths[elem.get('name')] = targets.get(elem.get(f"{REL_NS}id"), '')
+        return sheet_paths
+
+    @staticmethod
+    def _read_header(archive: zipfile.ZipFile, path: str) -> Dict[str, Any]:
+        """
+        读取工作表的尺寸和第一行（表头），读到第一行结束即停止
+
+        Returns:
+            {'cells': 列号 -> (类型, 值), 'approx_rows': 大致数据行数（工作表没有尺寸信息时为None）}
+        """
+        cells = {}
+        approx_rows = None
+        with archive.open(path) as f:
+            for event, elem in iterparse(f, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    if tag == f"{MAIN_NS}dimension":
+                        refs = CELL_REF_PATTERN.findall(elem.get('ref', ''))
+                        if refs:
+                            approx_rows = max(0, int(refs[-1][1]) - 1)
+                    continue
+
+                if tag == f"{MAIN_NS}c":
+                    match = CELL_REF_PATTERN.match(elem.get('r', ''))
+                    col = _column_index(match.group(1)) if match else len(cells)
+                    cell_type = elem.get('t', 'n')
+                    if cell_type == 'inlineStr':
+                        value = ''.join(text.text or '' for text in elem.iter(f"{MAIN_NS}t"))
+                        cells[col] = ('str', value)
+                    else:
+                        value_elem = elem.find(f"{MAIN_NS}v")
+                        value = value_elem.text if value_elem is not None else None
+                        if cell_type == 's' and value is not None:
+                            cells[col] = ('s', int(value))
+                        elif value is not None:
+                            cells[col] = ('str', value)
+                elif tag == f"{MAIN_NS}row":
+                    if cells:
+                        break
+                    elem.clear()
+
+        return {'cells': cells, 'approx_rows': approx_rows}
+
+    @staticmethod
+    def _read_shared_strings(archive: zipfile.ZipFile, indices: set) -> Dict[int, str]:
+        """读取共享字符串表中需要的条目，读到最大序号即停止"""
+        if not indices or 'xl/sharedStrings.xml' not in archive.NameToInfo:
+            return {}
+        strings = {}
+        last_index = max(indices)
+        index = 0
+        with archive.open('xl/sharedStrings.xml') as f:
+            for _, elem in iterparse(f):
+                if elem.tag == f"{MAIN_NS}si":
+                    if index in indices:
+                        strings[index] = ''.join(text.text or '' for text in elem.iter(f"{MAIN_NS}t"))
+                    if index >= last_index:
+                        break
+                    index += 1
+                    elem.clear()
+        return strings
+
+
+# 全局工作簿探测实例
+workbook_sniffer = WorkbookSniffer()